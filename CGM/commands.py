@@ -25,6 +25,7 @@
 # USER LIBRARIES
 import lib
 import logger
+import recorder
 import crc
 import packets
 
@@ -78,50 +79,70 @@ class Command(object):
             [532-533]: CRC
         """
 
-        # Reset response
-        self.response = {"Head": None,
-                         "Payload": None,
-                         "CRC": None}
+        # Execute command (and trace it)
+        with recorder.trace("CGM", self.__class__.__name__, self.code,
+            self.measure):
 
-        # Prepare packet
-        self.packet.build(self.code, self.database, self.page)
+            # Reset response
+            self.response = {"Head": None,
+                             "Payload": None,
+                             "CRC": None}
 
-        # Send packet
-        self.cgm.write(self.packet.bytes)
+            # Prepare packet
+            self.packet.build(self.code, self.database, self.page)
 
-        # Get response data
-        data = self.cgm.read()
+            # Send packet
+            self.cgm.write(self.packet.bytes)
 
-        # Check packet status
-        status = data[0]
+            # Get response data
+            data = self.cgm.read()
 
-        # Packet OK
-        if packets.STATUSES["ACK"] == status:
+            # Check packet status
+            status = data[0]
 
-            # Compute size of packet to receive
-            size = lib.unpack(data[1:3], "<")
+            # Packet OK
+            if packets.STATUSES["ACK"] == status:
 
-            # Until whole data collected
-            while len(data) != size:
+                # Compute size of packet to receive
+                size = lib.unpack(data[1:3], "<")
 
-                # Read more data
-                data.extend(self.cgm.read())
+                # Until whole data collected
+                while len(data) != size:
 
-            # Head
-            self.response["Head"] = data[0:4]
+                    # Read more data
+                    data.extend(self.cgm.read())
 
-            # Payload
-            self.response["Payload"] = data[4:(size - 2)]
+                # Head
+                self.response["Head"] = data[0:4]
 
-            # CRC
-            self.response["CRC"] = data[-2:]
+                # Payload
+                self.response["Payload"] = data[4:(size - 2)]
 
-            # Verify response
-            self.verifyCRC()
+                # CRC
+                self.response["CRC"] = data[-2:]
 
-        # Otherwise
-        else:
-            raise IOError("Packet does not have an ACK status.")
+                # Verify response
+                self.verifyCRC()
+
+            # Otherwise
+            else:
+                raise IOError("Packet does not have an ACK status.")
+
+
+
+    def measure(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            MEASURE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Count bytes sent to/received from CGM.
+        """
+
+        # Count received bytes
+        RX = sum([len(x) for x in self.response.values() if x is not None])
+
+        return (len(self.packet.bytes or []), RX)
 
 
 
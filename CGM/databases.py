@@ -26,6 +26,7 @@
 import lib
 import logger
 import reporter
+import series
 import crc
 import commands
 import records
@@ -253,7 +254,7 @@ class Database(object):
 
             # Show record if it has a string representation
             try:
-                Logger.info(record)
+                Logger.info("%s", record)
             except:
                 pass
 
@@ -312,9 +313,15 @@ class BGDatabase(Database):
             if type(value) is float:
                 values[displayTime] = value
 
+        # Add them to columnar series (while they still match reports)
+        series.store(self.reportType, values)
+
         # Add entries
         reporter.setDatedEntries(self.reportType, [], values)
 
+        # Columns match reports again
+        series.stamp(self.reportType, values)
+
 
 
 class SensorDatabase(Database):
@@ -24,6 +24,7 @@
 
 # LIBRARIES
 import copy
+import bisect
 import datetime
 import numpy as np
 
@@ -32,6 +33,7 @@ import numpy as np
 # USER LIBRARIES
 import logger
 import reporter
+import series
 import calculator
 from dot import DotProfile
 from past import PastProfile
@@ -94,6 +96,47 @@ class PastBG(BG, PastProfile):
 
 
 
+    def load(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            LOAD
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Load BGs from columnar series of covered days, which directly give
+            time and value axes.
+        """
+
+        # Info
+        Logger.debug("Loading data for: " + repr(self))
+
+        # Load data
+        t, y = series.query(self.reportType,
+            datetime.datetime.combine(self.days[0], datetime.time()),
+            datetime.datetime.combine(self.days[-1], datetime.time.max),
+            self.src)
+
+        # Decode axes
+        self.T = series.decode(t)
+        self.y = series.decodeValues(y)
+
+        # Info
+        Logger.debug("Loaded " + str(len(self.T)) + " data point(s).")
+
+
+
+    def decouple(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            DECOUPLE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Nothing to do: axes are already decoupled when loaded.
+        """
+
+        pass
+
+
+
 class FutureBG(BG, FutureProfile):
 
     def __init__(self):
@@ -162,10 +205,15 @@ class FutureBG(BG, FutureProfile):
             # Compute start/end of current step
             [t0, t1] = [self.t[i], self.t[i + 1]]
 
-            # Generate time axis associated with ISF changes over current step
-            t = [t0]
-            t += list(filter(lambda t_: t0 < t_ < t1, futureISF.t))
-            t += [t1]
+            # Find ISF changes over current step
+            a = bisect.bisect_right(futureISF.t, t0)
+            b = bisect.bisect_left(futureISF.t, t1)
+
+            # Generate time axis associated with them
+            t = [t0] + futureISF.t[a:b] + [t1]
+
+            # Get ISFs over current step (ISF changes start their own step)
+            ISFs = [futureISF.f(t0)] + futureISF.y[a:b]
 
             # Loop on ISF changes
             for j in range(len(t) - 1):
@@ -180,7 +228,7 @@ class FutureBG(BG, FutureProfile):
                 IOBs += [IOB]
 
                 # Compute dBG for current step and corresponding expected BG
-                dBG = futureISF.f(t[j]) * dIOB
+                dBG = ISFs[j] * dIOB
                 BG += dBG
 
             # Store BG at end of current step
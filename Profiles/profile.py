@@ -23,6 +23,8 @@
 """
 
 # LIBRARIES
+import copy
+import bisect
 import datetime
 import numpy as np
 import matplotlib.pyplot as plt
@@ -31,6 +33,7 @@ import matplotlib.pyplot as plt
 
 # USER LIBRARIES
 import lib
+import codec
 import logger
 import path
 
@@ -218,10 +221,12 @@ class Profile(object):
         # Info
         Logger.debug("Decoupling components of: " + repr(self))
 
-        # Decouple data, convert string times to datetimes, and sort them in
-        # chronological order
-        [self.T, self.y] = lib.unzip([(lib.formatTime(T), y) for (T, y) in
-            sorted(self.data.items())])
+        # Decouple data and sort it in chronological order
+        keys = sorted(self.data)
+
+        # Convert string times to datetimes
+        self.T = codec.decodeAll(keys)
+        self.y = [self.data[key] for key in keys]
 
 
 
@@ -238,6 +243,38 @@ class Profile(object):
         # Info
         Logger.debug("Cutting: " + repr(self))
 
+        # No start given
+        if a is None:
+            a = self.start
+
+        # No end given
+        if b is None:
+            b = self.end
+
+        # Get steps of profile within limits
+        start, stop = self.window(a, b)
+
+        # Get step value before beginning of profile
+        last = self.y[start - 1] if start > 0 else None
+
+        # Cut-off steps outside of start and end limits
+        self.T = self.T[start:stop]
+        self.y = self.y[start:stop]
+
+        return last
+
+
+
+    def window(self, a = None, b = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            WINDOW
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get indices [start, stop) of the steps of (sorted) profile within
+            [a, b], using binary searches on its time axis.
+        """
+
         # No start given
         if a is None:
             a = self.start
@@ -251,19 +288,34 @@ class Profile(object):
             raise TypeError("Limit times to use while cutting profile have " +
                 "to be datetime objects.")
 
-        # Group axes and filter them
-        data = zip(self.T, self.y)
-        olderData = [x for x in data if x[0] < a]
-        filteredData = [x for x in data if a <= x[0] <= b]
+        # Find steps within limits
+        start = bisect.bisect_left(self.T, a)
+        stop = max(bisect.bisect_right(self.T, b), start)
 
-        # Cut-off steps outside of start and end limits
-        [self.T, self.y] = lib.unzip(filteredData)
+        return (start, stop)
 
-        # Find last value before beginning of profile
-        last = olderData[-1][1] if olderData else None
 
-        # Return step value before beginning of profile
-        return last
+
+    def excerpt(self, a = None, b = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            EXCERPT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get a copy of profile cut within [a, b], without copying the rest
+            of it.
+        """
+
+        # Get steps of profile within limits
+        start, stop = self.window(a, b)
+
+        # Copy profile, then give it its own axes
+        new = copy.copy(self)
+        new.T = self.T[start:stop]
+        new.y = self.y[start:stop]
+        new.t = []
+
+        return new
 
 
 
@@ -383,4 +435,4 @@ class Profile(object):
                 max(ax.get_ylim()[1], self.ylim[1])])
 
         # Return figure and subplot
-        return ax
\ No newline at end of file
+        return ax
@@ -23,8 +23,10 @@
 """
 
 # LIBRARIES
-import copy
+import bisect
+import heapq
 import datetime
+import numpy as np
 import matplotlib.pyplot as plt
 
 
@@ -179,15 +181,18 @@ class StepProfile(Profile):
             FILL
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
             Fill holes in profile y-axis (replace 'None' values with the ones
-            of filler profile).
-
-            TODO: test if filling possible? Not doing it so far, because
-                  computing f(t) for a given t will fail if corresponding step
-                  does not exist in filler.
+            of filler profile). The values of holes, then the filler steps
+            falling within them, are found by walking through both (sorted)
+            time axes together, and taken as is from the filler. If the filler
+            does not cover every hole, a ValueError is raised before the
+            profile is changed.
         """
 
+        # Get holes
+        holes = [i for i, y in enumerate(self.y) if y is None]
+
         # Is filling needed?
-        if any([y is None for y in self.y]):
+        if holes:
 
             # Info
             Logger.debug("Filling: " + repr(self))
@@ -196,36 +201,52 @@ class StepProfile(Profile):
             n = len(self.T)
             m = len(filler.T)
 
+            # Initialize values of holes
+            values = {}
+
+            # Initialize index of last filler step starting before hole
+            k = -1
+
+            # Get values of holes (same as filler.f, without a binary search
+            # for each of them)
+            for i in holes:
+
+                # Move to last filler step starting before (or at) hole
+                while k + 1 < m and filler.T[k + 1] <= self.T[i]:
+                    k += 1
+
+                # Hole is neither within one of the steps, nor at end of last
+                if k < 0 or (k == m - 1 and filler.T[k] != self.T[i]):
+                    raise ValueError("The value of f(" +
+                        lib.formatTime(self.T[i]) + ") does not exist.")
+
+                values[i] = filler.y[k]
+
             # Initialize new profile components
             T, y = [], []
 
+            # Initialize index of next filler step
+            j = 0
+
             # Fill profile
             for i in range(n):
 
-                # Restore step
+                # Restore (or fill) step
                 T += [self.T[i]]
-                y += [self.y[i]]
+                y += [values.get(i, self.y[i])]
 
-                # Filling criteria
-                if y[-1] is None:
+                # Hole before end of profile: add filler steps within it
+                if i in values and i < n - 1:
 
-                    # Fill step value
-                    y[-1] = filler.f(T[-1])
+                    # Skip filler steps before hole
+                    while j < m and filler.T[j] <= self.T[i]:
+                        j += 1
 
-                    # Before end of profile...
-                    if i < n - 1:
-
-                        # ...look for additional steps to fill
-                        for j in range(m):
-
-                            # Filling criteria
-                            if self.T[i] < filler.T[j] < self.T[i + 1]:
-                                T += [filler.T[j]]
-                                y += [filler.y[j]]
-
-                            # Stop looking in filler
-                            elif self.T[i + 1] <= filler.T[j]:
-                                break
+                    # Add filler steps until next profile step
+                    while j < m and filler.T[j] < self.T[i + 1]:
+                        T += [filler.T[j]]
+                        y += [filler.y[j]]
+                        j += 1
 
             # Update profile
             self.T, self.y = T, y
@@ -271,13 +292,14 @@ class StepProfile(Profile):
 
 
 
-    def f(self, t):
+    def getAxis(self, t):
 
         """
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            F
+            GETAXIS
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            Compute profile's value (y) for a given time (t).
+            Get time axis matching type of given time (datetime or normalized
+            time).
         """
 
         # Datetime axis
@@ -292,20 +314,39 @@ class StepProfile(Profile):
         else:
             raise TypeError("Invalid time t to compute f(t) for.")
 
-        # Get number of steps
-        n = len(axis)
-
         # Make sure axes fit
-        if n != len(self.y):
+        if len(axis) != len(self.y):
             raise ArithmeticError("Cannot compute f(t): axes' lengths do not " +
                 "fit.")
 
-        # Compute profile value
-        for i in range(n):
+        return axis
+
 
-            # Either end of last step, or within one of the other steps
-            if i == n - 1 and axis[i] == t or axis[i] <= t < axis[i + 1]:
-                return self.y[i]
+
+    def f(self, t):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            F
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Compute profile's value (y) for a given time (t), using a binary
+            search of the step it falls in. Lists/arrays of times are computed
+            all at once (see F).
+        """
+
+        # Multiple times
+        if isinstance(t, (list, tuple, np.ndarray)):
+            return self.F(t)
+
+        # Get time axis
+        axis = self.getAxis(t)
+
+        # Get last step starting before (or at) given time
+        i = bisect.bisect_right(axis, t) - 1
+
+        # Either within one of the steps, or at end of last one
+        if i >= 0 and (i < len(axis) - 1 or axis[i] == t):
+            return self.y[i]
 
         # Result not found
         raise ValueError("The value of f(" + lib.formatTime(t) + ") does not " +
@@ -313,6 +354,102 @@ class StepProfile(Profile):
 
 
 
+    def F(self, times):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            F
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Vectorized version of f: compute profile's values for an array of
+            times at once. Time axes are converted to datetime64 (us) or float64
+            arrays, and searched using numpy. Since this converts the whole
+            profile on each call, use f within loops over single times.
+        """
+
+        # No times
+        if len(times) == 0:
+            return np.array([])
+
+        # Get time axis (datetime64 times are matched to the datetime one)
+        t = times[0]
+
+        if isinstance(t, np.datetime64):
+            t = np.datetime64(t, "us").astype(datetime.datetime)
+
+        axis = self.getAxis(t)
+
+        # Convert axes to arrays
+        if axis is self.T:
+            x = np.array(axis, "datetime64[us]")
+            t = np.array(times, "datetime64[us]")
+
+        else:
+            x = np.array(axis, np.float64)
+            t = np.array(times, np.float64)
+
+        # Get last step starting before (or at) each time
+        i = np.searchsorted(x, t, "right") - 1
+
+        # Either within one of the steps, or at end of last one
+        isValid = (i >= 0) & ((i < len(x) - 1) | (x[i] == t))
+
+        if not isValid.all():
+            raise ValueError("The value of f(" + str(t[~isValid][0]) + ") " +
+                "does not exist.")
+
+        return np.array(self.y)[i]
+
+
+
+    def sweep(self, profiles):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            SWEEP
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Walk through the steps of profile and given ones all together, in
+            a single pass over their (sorted) time axes. Return the combined
+            time axis, and the values of each profile over it (one list per
+            profile).
+        """
+
+        # Get operands
+        operands = [self] + profiles
+
+        # Initialize combined time axis, and values of each operand over it
+        T = []
+        columns = [[] for _ in operands]
+
+        # Initialize index of current step of each operand
+        steps = [-1] * len(operands)
+
+        # Merge time axes (sorted), skipping duplicate times
+        for t in heapq.merge(*[p.T for p in operands]):
+            if T and T[-1] == t:
+                continue
+
+            T += [t]
+
+            # Move each operand to its last step starting before (or at) t
+            for k, p in enumerate(operands):
+                i, n = steps[k], len(p.T)
+
+                while i + 1 < n and p.T[i + 1] <= t:
+                    i += 1
+
+                steps[k] = i
+
+                # Time out of operand
+                if i < 0 or i == n - 1 and p.T[i] != t:
+                    raise ValueError("The value of f(" + lib.formatTime(t) +
+                        ") does not exist.")
+
+                columns[k] += [p.y[i]]
+
+        return T, columns
+
+
+
     def op(self, op, profiles):
 
         """
@@ -321,7 +458,14 @@ class StepProfile(Profile):
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
             Execute a given operation on profiles, and return the resulting
             profile. Said operation is executed on each step of the combined
-            time axes.
+            time axes, which are swept through once. It can either be a binary
+            function (applied from left to right), or a numpy ufunc (reduced
+            over all profiles at once). The result is a plain step profile,
+            which only keeps the norm and units of this one.
+
+            Note: ufuncs reduce all steps as one array, so as soon as one value
+            is a float, every result is (e.g. 1 + 2 gives 3.0). Use a function
+            instead if integer steps have to stay integers.
         """
 
         # Test profile limits
@@ -329,24 +473,26 @@ class StepProfile(Profile):
             for p in profiles]):
             raise errors.MismatchedLimits
 
-        # Copy profile on which operation is done
-        new = copy.deepcopy(self)
-
-        # Reset its components
-        new.reset()
+        # Create new profile (copying this one would share the state of
+        # subclasses, e.g. caches or components)
+        new = StepProfile()
 
-        # Re-define time references
+        # Define its time references
         new.define(self.start, self.end)
 
+        # Keep norm and units
+        new.norm = self.norm
+        new.units = self.units
+
         # Merge all steps
-        new.T = lib.uniqify(self.T + lib.flatten([p.T for p in profiles]))
+        new.T, columns = self.sweep(profiles)
 
         # Compute each step of new profile
-        for T in new.T:
-            new.y += [self.f(T)]
+        if isinstance(op, np.ufunc):
+            new.y = op.reduce(np.array(columns), axis = 0).tolist()
 
-            for p in profiles:
-                new.y[-1] = op(new.y[-1], p.f(T))
+        else:
+            new.y = [reduce(op, values) for values in zip(*columns)]
 
         # Normalize it
         if new.norm is not None:
@@ -368,7 +514,7 @@ class StepProfile(Profile):
         # Info
         Logger.debug("Adding:")
 
-        return self.op(lambda x, y: x + y, list(args))
+        return self.op(np.add, list(args))
 
 
 
@@ -383,7 +529,7 @@ class StepProfile(Profile):
         # Info
         Logger.debug("Subtracting:")
 
-        return self.op(lambda x, y: x - y, list(args))
+        return self.op(np.subtract, list(args))
 
 
 
@@ -398,7 +544,7 @@ class StepProfile(Profile):
         # Info
         Logger.debug("Multiplying:")
 
-        return self.op(lambda x, y: x * y, list(args))
+        return self.op(np.multiply, list(args))
 
 
 
@@ -413,6 +559,7 @@ class StepProfile(Profile):
         # Info
         Logger.debug("Dividing:")
 
+        # Python division, so that dividing by zero still fails
         return self.op(lambda x, y: x / y, list(args))
 
 
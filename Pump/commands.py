@@ -34,6 +34,7 @@ import lib
 import logger
 import errors
 import reporter
+import recorder
 import packets
 
 
@@ -195,6 +196,20 @@ class Command(object):
 
 
 
+    def measure(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            MEASURE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Count bytes sent to/received from pump.
+        """
+
+        return (sum([len(pkt.bytes["Encoded"]) for pkt in self.packets["TX"]]),
+                sum([len(data) for data in self.data["RX"]]))
+
+
+
     def run(self, *args):
 
         """
@@ -208,17 +223,21 @@ class Command(object):
         # Reset command
         self.reset()
 
-        # Encode parameters
-        self.encode(*args)
+        # Run command (and trace it)
+        with recorder.trace("Pump", self.__class__.__name__, self.code,
+            self.measure):
+
+            # Encode parameters
+            self.encode(*args)
 
-        # Execute command
-        self.execute()
+            # Execute command
+            self.execute()
 
-        # Decode it
-        self.decode()
+            # Decode it
+            self.decode()
 
-        # Store response
-        self.store()
+            # Store response
+            self.store()
 
         # Return it
         return self.response
@@ -422,23 +441,27 @@ class BigCommand(Command):
         # Reset command
         self.reset()
 
-        # Encode parameters
-        self.encode(*args)
+        # Run command (and trace it)
+        with recorder.trace("Pump", self.__class__.__name__, self.code,
+            self.measure):
 
-        # Execute prelude
-        self.prelude()
+            # Encode parameters
+            self.encode(*args)
 
-        # Execute command core
-        self.execute()
+            # Execute prelude
+            self.prelude()
+
+            # Execute command core
+            self.execute()
 
-        # Execute postlude
-        self.postlude()
+            # Execute postlude
+            self.postlude()
 
-        # Decode it
-        self.decode()
+            # Decode it
+            self.decode()
 
-        # Store response
-        self.store()
+            # Store response
+            self.store()
 
         # Return response
         return self.response
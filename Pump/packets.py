@@ -122,7 +122,7 @@ class FromPacket(Packet):
         RSSI = self.RSSI["Hex"]
 
         # Info
-        Logger.debug("RSSI (Byte): " + str(RSSI))
+        Logger.debug("RSSI (Byte): %s", RSSI)
 
         # Bigger than
         if RSSI >= 128:
@@ -139,7 +139,7 @@ class FromPacket(Packet):
         self.RSSI["dBm"] = RSSI
 
         # Info
-        Logger.debug("RSSI (dBm): " + str(RSSI))
+        Logger.debug("RSSI (dBm): %s", RSSI)
 
 
 
@@ -156,7 +156,7 @@ class FromPacket(Packet):
         self.index = bytes[0]
 
         # Info
-        Logger.debug("#: " + str(self.index))
+        Logger.debug("#: %s", self.index)
 
         # Get RSSI reading
         self.RSSI = {"Hex": bytes[1], "dBm": None}
@@ -254,6 +254,10 @@ class PumpPacket(Packet):
             Show encoded bytes.
         """
 
+        # Nothing to show
+        if not Logger.isEnabledFor("DEBUG"):
+            return
+
         # Get size of packet
         size = len(self.bytes["Encoded"])
 
@@ -289,6 +293,10 @@ class PumpPacket(Packet):
             Show decoded bytes in all formats.
         """
 
+        # Nothing to show
+        if not Logger.isEnabledFor("DEBUG"):
+            return
+
         # Get size of packet
         size = len(self.bytes["Decoded"]["Hex"])
 
@@ -335,15 +343,19 @@ class PumpPacket(Packet):
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         """
 
+        # Nothing to show
+        if not Logger.isEnabledFor("DEBUG"):
+            return
+
         # Show characteristics
-        Logger.debug("Type: " + str(self.type))
-        Logger.debug("Recipient: " + str(self.recipient))
+        Logger.debug("Type: %s", self.type)
+        Logger.debug("Recipient: %s", self.recipient)
         Logger.debug("Serial: " + " ".join(self.serial))
-        Logger.debug("Code: " + str(self.code))
-        Logger.debug("Size: " + str(self.size))
-        Logger.debug("Part: " + str(self.part))
+        Logger.debug("Code: %s", self.code)
+        Logger.debug("Size: %s", self.size)
+        Logger.debug("Part: %s", self.part)
         Logger.debug("Payload: " + " ".join(self.payload))
-        Logger.debug("CRC: " + str(self.CRC))
+        Logger.debug("CRC: %s", self.CRC)
 
         # Show its encoded version
         if encoded:
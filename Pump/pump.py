@@ -1251,10 +1251,10 @@ class History(PumpComponent):
         """
 
         # Info
-        Logger.debug("Read page(s) [" + str(len(self.pages)) + " byte(s)]:")
+        Logger.debug("Read page(s) [%s byte(s)]:", len(self.pages))
 
         # Print downloaded history pages
-        Logger.debug(self.pages)
+        Logger.debug("%s", self.pages)
 
 
 
@@ -1272,11 +1272,14 @@ class History(PumpComponent):
         # Initialize pages
         pages = self.pages
 
-        # Go through records
-        for record in self.records:
+        # Store each report touched by records only once
+        with reporter.batch():
 
-            # Find record within pages, decode it, and store remaining data
-            pages = record.find(pages)
+            # Go through records
+            for record in self.records:
+
+                # Find record within pages, decode it, and store remaining data
+                pages = record.find(pages)
 
 
 
@@ -27,6 +27,7 @@
 # USER LIBRARIES
 import lib
 import logger
+import recorder
 
 
 
@@ -158,6 +159,20 @@ class Command(object):
 
 
 
+    def measure(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            MEASURE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Count bytes sent to/received from stick.
+        """
+
+        return tuple([0 if self.data[x] is None else len(self.data[x])
+            for x in ["TX", "RX"]])
+
+
+
     def run(self, *args):
 
         """
@@ -171,17 +186,21 @@ class Command(object):
         # Reset command
         self.reset()
 
-        # Encode parameters
-        self.encode(*args)
+        # Run command (and trace it)
+        with recorder.trace("Stick", self.__class__.__name__, self.code,
+            self.measure):
+
+            # Encode parameters
+            self.encode(*args)
 
-        # Execute command
-        self.execute()
+            # Execute command
+            self.execute()
 
-        # Decode it
-        self.decode()
+            # Decode it
+            self.decode()
 
-        # Store response
-        self.store()
+            # Store response
+            self.store()
 
         # Return it
         return self.response
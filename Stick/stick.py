@@ -579,7 +579,8 @@ class Stick(object):
             RSSIs[f] = np.mean(RSSIs[f])
 
         # Show readings
-        Logger.debug(lib.JSONize(RSSIs))
+        if Logger.isEnabledFor("DEBUG"):
+            Logger.debug(lib.JSONize(RSSIs))
 
         # Check if pump was detected
         if not all(f == -99 for f in RSSIs.values()):
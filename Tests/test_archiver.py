@@ -0,0 +1,153 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    test_archiver
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Notes: To run tests, use command "python -m pytest".
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import os
+import datetime
+import pytest
+
+
+
+# USER LIBRARIES
+import path
+import reporter
+import archiver
+import archives
+import series
+
+
+
+# FIXTURES
+@pytest.fixture
+def setup_and_teardown():
+
+    """
+    Setup and teardown for tests which archive reports.
+    """
+
+    reporter.reset()
+    path.TESTS.touch()
+    yield
+    path.TESTS.delete()
+
+
+
+# TESTS
+def test_archive(setup_and_teardown):
+
+    """
+    Archive old days and read them back transparently.
+    """
+
+    entries = {datetime.datetime(1970, 1, 1, 0, 0, 0): 6.2,
+               datetime.datetime(1970, 1, 2, 0, 0, 0): 6.0,
+               datetime.datetime(1970, 1, 5, 0, 0, 0): 5.8}
+
+    reporter.setDatedEntries(reporter.BGReport, [], entries, path.TESTS)
+
+    # Archive days older than 2 days
+    today = datetime.date(1970, 1, 6)
+
+    assert archiver.archive(path.TESTS, today, 2) == 2
+    assert not os.path.isdir(path.TESTS.path + "1970/01/01")
+    assert os.path.isdir(path.TESTS.path + "1970/01/05")
+
+    # Archived days are still found
+    dates = [datetime.date(1970, 1, d) for d in [1, 2, 5]]
+
+    assert reporter.getReportDates(reporter.BGReport, path.TESTS) == dates
+    assert list(reporter.iterReportDates(reporter.BGReport, path.TESTS)) == (
+        dates[::-1])
+    assert sorted([p.path for p in path.TESTS.scan(reporter.BGReport.name)]) == [
+        path.TESTS.path + "1970/01/0" + str(d) + "/" for d in [1, 2, 5]]
+
+    # Archived reports can be loaded
+    reporter.reset()
+
+    report = reporter.BGReport(datetime.date(1970, 1, 1), path.TESTS)
+    report.load()
+
+    assert report.exists()
+    assert report.get() == {"1970.01.01 - 00:00:00": 6.2}
+
+    t, y = series.query(reporter.BGReport,
+        datetime.datetime(1970, 1, 1, 0, 0, 0),
+        datetime.datetime(1970, 1, 5, 0, 0, 0), path.TESTS)
+
+    assert series.decodeValues(y) == [6.2, 6.0, 5.8]
+
+    # Changing an archived report brings it back as a regular file
+    report.set(7.0, ["1970.01.01 - 00:05:00"])
+    report.store()
+
+    assert os.path.isfile(path.TESTS.path + "1970/01/01/" + report.name)
+    assert [p.path for p in path.TESTS.scan(report.name)].count(
+        path.TESTS.path + "1970/01/01/") == 1
+
+    reporter.reset()
+
+    report = reporter.BGReport(datetime.date(1970, 1, 1), path.TESTS)
+    report.load()
+
+    assert report.get() == {"1970.01.01 - 00:00:00": 6.2,
+                            "1970.01.01 - 00:05:00": 7.0}
+
+
+
+def test_archive_compaction(setup_and_teardown):
+
+    """
+    Archive days again and make sure replaced members do not pile up.
+    """
+
+    date = datetime.date(1970, 1, 1)
+    month = path.TESTS.path + "1970/01/"
+    today = datetime.date(1970, 1, 6)
+
+    # Archive same day several times
+    for i in range(4):
+        reporter.reset()
+        reporter.setDatedEntries(reporter.BGReport, [],
+            {datetime.datetime(1970, 1, 1, 0, i, 0): 6.0 + i}, path.TESTS)
+
+        assert archiver.archive(path.TESTS, today, 2) == 1
+        assert not os.path.isdir(month + "01")
+
+        # Only one archive is left
+        names = [n for n in os.listdir(month) if n in archives.ARCHIVES]
+
+        assert names == [archives.getArchivePath(month)[len(month):]]
+
+        # Archive never holds more than twice its live members
+        index = archives.getIndex(month)
+        live = sum([member[1] for member in index.values()])
+
+        assert os.path.getsize(month + names[0]) <= 2 * live
+
+    # Archived report holds all values
+    reporter.reset()
+
+    report = reporter.BGReport(date, path.TESTS)
+    report.load()
+
+    assert len(report.get()) == 4
+    assert report.get()["1970.01.01 - 00:03:00"] == 9.0
@@ -0,0 +1,110 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    test_benchmark
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Notes: To run tests, use command "python -m pytest". Benchmarks count the
+           operations done on profiles of growing sizes (instead of timing
+           them, which depends on the machine), so that they catch quadratic
+           behaviors.
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import datetime
+
+
+
+# USER LIBRARIES
+from Profiles import step
+
+
+
+# CONSTANTS
+DEFAULT_DATE = datetime.datetime(1970, 1, 1)
+
+
+
+# CLASSES
+class CountingList(list):
+
+    """
+    List counting how many times its items are read.
+    """
+
+    def __init__(self, *args):
+        super(CountingList, self).__init__(*args)
+        self.n = 0
+
+    def __getitem__(self, i):
+        self.n += 1
+        return super(CountingList, self).__getitem__(i)
+
+
+
+# FUNCTIONS
+def getProfiles(nDays):
+
+    """
+    Generate a profile with a hole every other step (5 minutes), and a filler
+    with a step every 2 minutes, over given number of days. Their time axes
+    count how many times they are read.
+    """
+
+    p = step.StepProfile()
+    p.T = CountingList([DEFAULT_DATE + datetime.timedelta(minutes = 5 * i)
+        for i in range(nDays * 288 + 1)])
+    p.y = [None if i % 2 else float(i) for i in range(len(p.T))]
+
+    f = step.StepProfile()
+    f.T = CountingList([DEFAULT_DATE + datetime.timedelta(minutes = 2 * i)
+        for i in range(nDays * 720 + 1)])
+    f.y = [float(i) for i in range(len(f.T))]
+
+    return p, f
+
+
+
+def countFill(nDays):
+
+    """
+    Count reads of time axes while filling profile over given number of days.
+    """
+
+    p, f = getProfiles(nDays)
+    T = p.T
+
+    p.fill(f)
+
+    # Every hole was filled
+    assert all([y is not None for y in p.y])
+
+    return T.n + f.T.n
+
+
+
+# TESTS
+def test_fill():
+
+    """
+    Filling profiles scales linearly with their size (1 to 4 weeks).
+    """
+
+    n1 = countFill(7)
+    n4 = countFill(28)
+
+    # A quadratic fill would read axes about 16 times more
+    assert n4 <= 4 * n1 + 10
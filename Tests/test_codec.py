@@ -0,0 +1,99 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    test_codec
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Notes: To run tests, use command "python -m pytest".
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import calendar
+import datetime
+import numpy as np
+import pytest
+
+
+
+# USER LIBRARIES
+import codec
+
+
+
+# TESTS
+def test_encode_decode():
+
+    """
+    Format and parse times, like strftime/strptime would.
+    """
+
+    T = datetime.datetime(1970, 1, 2, 3, 4, 5)
+    key = "1970.01.02 - 03:04:05"
+
+    assert codec.encode(T) == T.strftime(codec.TIME_FORMAT) == key
+    assert codec.decode(key) == T
+    assert codec.decode(u"1970.01.02 - 03:04:05") == T
+    assert codec.decode("23:30") == datetime.time(23, 30)
+
+    # Unusual keys are still parsed
+    assert codec.decode("1970.1.2 - 3:04:05") == T
+
+    # Invalid keys
+    for key in ["1970.13.02 - 03:04:05", "1970.01.02", "A"]:
+        with pytest.raises(ValueError):
+            codec.decode(key)
+
+
+
+def test_encode_all():
+
+    """
+    Format lists of times at once.
+    """
+
+    times = [datetime.datetime(1970, 1, 1, 0, 0, 0),
+             datetime.datetime(2017, 12, 31, 23, 59, 59)]
+
+    assert codec.encodeAll(times) == ["1970.01.01 - 00:00:00",
+                                      "2017.12.31 - 23:59:59"]
+    assert codec.decodeAll(codec.encodeAll(times)) == times
+
+
+
+def test_to_epochs():
+
+    """
+    Convert lists of formatted times into epochs at once.
+    """
+
+    times = [datetime.datetime(1900, 3, 1, 0, 0, 0),
+             datetime.datetime(1969, 12, 31, 23, 59, 59),
+             datetime.datetime(1970, 1, 1, 0, 0, 0),
+             datetime.datetime(2000, 2, 29, 12, 30, 15),
+             datetime.datetime(2019, 12, 31, 23, 59, 59)]
+
+    epochs = [calendar.timegm(T.timetuple()) for T in times]
+    keys = [codec.encode(T) for T in times]
+
+    assert codec.toEpochs(keys).tolist() == epochs
+    assert codec.toEpochs([unicode(k) for k in keys]).tolist() == epochs
+    assert codec.toEpochs(times).tolist() == epochs
+    assert codec.toEpochs([]).tolist() == []
+    assert codec.toDatetime64(keys[2:3])[0] == np.datetime64("1970-01-01")
+
+    # Invalid day
+    with pytest.raises(ValueError):
+        codec.toEpochs(["2019.02.29 - 00:00:00"])
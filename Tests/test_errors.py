@@ -0,0 +1,117 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    test_errors
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Notes: To run tests, use command "python -m pytest".
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import datetime
+import pytest
+
+
+
+# USER LIBRARIES
+import path
+import reporter
+import errors
+
+
+
+# FIXTURES
+@pytest.fixture
+def setup_and_teardown(monkeypatch):
+
+    """
+    Setup and teardown for tests which count errors.
+    """
+
+    reporter.reset()
+    monkeypatch.setattr(path, "REPORTS", path.TESTS)
+    monkeypatch.setattr(errors, "COUNTER", errors.ErrorCounter())
+    path.TESTS.touch()
+    yield
+    path.TESTS.delete()
+
+
+
+# TESTS
+def test_counter(setup_and_teardown):
+
+    """
+    Count errors in memory, then store them all at once.
+    """
+
+    now = datetime.datetime(1970, 1, 1, 0, 0, 0)
+    counter = errors.ErrorCounter()
+
+    for i in range(10):
+        counter.add(["StickError", "RadioError", "RadioTimeout"], now)
+
+    counter.add(["PumpError", "NoPump"], now)
+
+    # Nothing stored yet, however long it has been
+    later = now + datetime.timedelta(hours = 1)
+    counter.add(["PumpError", "NoPump"], later)
+
+    report = reporter.ErrorsReport(now.date(), path.TESTS)
+
+    assert not report.exists()
+
+    # Store counts when flushing
+    assert counter.flush() == 12
+    assert counter.counts == {}
+
+    report.load()
+
+    assert report.get() == {
+        "StickError": {"RadioError": {"RadioTimeout": 10}},
+        "PumpError": {"NoPump": 2}}
+
+    # Counts are added to existing ones
+    counter.add(["PumpError", "NoPump"], later)
+
+    assert counter.flush() == 1
+
+    report.load()
+
+    assert report.get(["PumpError", "NoPump"]) == 3
+
+
+
+def test_raise(setup_and_teardown):
+
+    """
+    Raising loggable errors only counts them.
+    """
+
+    for i in range(3):
+        with pytest.raises(errors.RadioTimeout):
+            raise errors.RadioTimeout
+
+    today = datetime.date.today()
+    key = (today, ("StickError", "RadioError", "RadioTimeout"))
+
+    assert errors.COUNTER.counts[key] == 3
+
+    errors.flush()
+
+    report = reporter.ErrorsReport(today, path.TESTS)
+    report.load()
+
+    assert report.get(["StickError", "RadioError", "RadioTimeout"]) == 3
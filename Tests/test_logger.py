@@ -0,0 +1,300 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    test_logger
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Notes: To run tests, use command "python -m pytest".
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import os
+import datetime
+import pytest
+
+
+
+# USER LIBRARIES
+import lib
+import path
+import logger
+
+
+
+# FIXTURES
+@pytest.fixture
+def setup_and_teardown(monkeypatch):
+
+    """
+    Setup and teardown for tests which write logs.
+    """
+
+    monkeypatch.setattr(path, "REPORTS", path.TESTS)
+    path.TESTS.touch()
+    yield
+    logger.stop()
+    path.TESTS.delete()
+
+
+
+# HELPERS
+def read(now, name = "test.log"):
+
+    """
+    Read lines of log of given time.
+    """
+
+    with open(path.TESTS.path + lib.formatDate(now) + "/" + name, "r") as f:
+        return f.read().splitlines()
+
+
+
+# TESTS
+def test_writer(setup_and_teardown):
+
+    """
+    Write logs in background.
+    """
+
+    Logger = logger.Logger("test", "test.log")
+
+    logger.start()
+    writer = logger.WRITER
+
+    for i in range(3):
+        Logger.log("INFO", "Message " + str(i), False)
+
+    logger.flush()
+
+    now = datetime.datetime.now()
+    lines = read(now)
+
+    assert len(lines) == 3
+    assert lines[-1].endswith("--- Message 2")
+
+    # Log file is rotated when date changes
+    tomorrow = now + datetime.timedelta(days = 1)
+    writer.put(tomorrow, "test.log", "Tomorrow")
+    logger.flush()
+
+    assert read(tomorrow) == ["Tomorrow"]
+
+    # Stopping writer writes remaining messages, then direct writes resume
+    Logger.log("INFO", "Before stop", False)
+    logger.stop()
+
+    assert logger.WRITER is None
+    assert not writer.is_alive()
+
+    Logger.log("INFO", "After stop", False)
+
+    assert read(now)[-2:][0].endswith("--- Before stop")
+    assert read(now)[-1].endswith("--- After stop")
+
+
+
+def test_writer_errors(setup_and_teardown, monkeypatch):
+
+    """
+    Keep writing logs when messages cannot be written, or when the background
+    writer is gone.
+    """
+
+    Logger = logger.Logger("test", "test.log")
+
+    # Failing message does not kill writer
+    write = logger.Writer.write
+
+    def fail(self, now, report, msg):
+        if msg.endswith("Fail"):
+            raise IOError("Cannot write")
+
+        write(self, now, report, msg)
+
+    monkeypatch.setattr(logger.Writer, "write", fail)
+
+    logger.start()
+    writer = logger.WRITER
+
+    Logger.log("INFO", "Fail", False)
+    Logger.log("INFO", "Success", False)
+    logger.flush()
+
+    assert writer.is_alive()
+    assert read(datetime.datetime.now())[-1].endswith("--- Success")
+
+    logger.stop()
+
+    # Dead writer: messages are written right away, and flushing does not block
+    writer = logger.WRITER = logger.Writer()
+    writer.put(datetime.datetime.now(), "test.log", "Queued")
+    Logger.log("INFO", "Direct", False)
+
+    assert read(datetime.datetime.now())[-1].endswith("--- Direct")
+
+    logger.flush()
+
+    assert read(datetime.datetime.now())[-1] == "Queued"
+
+    logger.WRITER = None
+
+
+
+def test_lazy_formatting(setup_and_teardown):
+
+    """
+    Only format messages of enabled levels, using per-module config.
+    """
+
+    class Counter(object):
+
+        def __init__(self):
+            self.n = 0
+
+        def __str__(self):
+            self.n += 1
+            return "counted"
+
+    Logger = logger.Logger("test", "test.log", "INFO")
+    counter = Counter()
+
+    Logger.debug("Value: %s", counter)
+
+    assert not Logger.isEnabledFor("DEBUG")
+    assert counter.n == 0
+
+    # Enable debug messages for test module only
+    logger.configure({"Levels": {"test": "DEBUG"}})
+
+    try:
+        assert Logger.isEnabledFor("DEBUG")
+
+        Logger.debug("Value: %s", counter)
+
+        assert counter.n == 1
+        assert read(datetime.datetime.now())[-1].endswith("--- Value: counted")
+
+    finally:
+        logger.configure({})
+
+    assert not Logger.isEnabledFor("DEBUG")
+
+
+
+def test_rotation_race(setup_and_teardown, monkeypatch):
+
+    """
+    Rotate logs safely while other processes write or rotate them.
+    """
+
+    monkeypatch.setattr(logger, "MAX_LOG_SIZE", 100)
+
+    now = datetime.datetime(1970, 1, 1)
+    directory = path.TESTS.path + lib.formatDate(now) + "/"
+    filename = directory + "test.log"
+
+    # Writer keeps its file open
+    writer = logger.Writer()
+    writer.write(now, "test.log", "Before")
+
+    # Another process rotates it: writer switches to new file
+    logger.rotate(filename)
+    writer.write(now, "test.log", "After")
+    writer.close()
+
+    assert read(now) == ["After"]
+
+    # Parts are numbered after the highest one (even with gaps)
+    os.rename(directory + "test.log.1.gz", directory + "test.log.3.gz")
+
+    assert logger.rotate(filename)
+    assert os.path.isfile(directory + "test.log.4.gz")
+
+    # Logs already rotated by another process are skipped
+    assert not logger.rotate(filename)
+
+    logger.write(now, "test.log", "Small")
+
+    assert not logger.rotate(filename, logger.MAX_LOG_SIZE)
+    assert read(now) == ["Small"]
+
+
+
+def test_invalid_config(setup_and_teardown, monkeypatch, capsys):
+
+    """
+    Ignore invalid config, and say so on stderr.
+    """
+
+    monkeypatch.setattr(logger, "CONFIGURATION", None)
+
+    with open(path.TESTS.path + logger.CONFIG, "w") as f:
+        f.write("{")
+
+    assert logger.loadConfig() == {}
+
+    out, err = capsys.readouterr()
+
+    assert out == ""
+    assert "Ignoring invalid config" in err
+
+
+
+def test_rotation(setup_and_teardown, monkeypatch):
+
+    """
+    Rotate full logs, compress and remove old ones, then search them.
+    """
+
+    monkeypatch.setattr(logger, "MAX_LOG_SIZE", 100)
+
+    today = datetime.date(1970, 2, 1)
+    days = [datetime.datetime(1970, 1, 1), datetime.datetime(1970, 1, 31),
+            datetime.datetime(1970, 2, 1)]
+
+    # Write 4 messages per part
+    for now in days:
+        for i in range(10):
+            logger.write(now, "test.log", "Message %d %s" % (i, "-" * 20))
+
+    # Full logs were rotated
+    directory = path.TESTS.path + lib.formatDate(days[-1]) + "/"
+    parts = logger.getParts(directory, "test.log")
+
+    assert len(parts) == 3
+    assert parts[-1] == directory + "test.log"
+    assert sum([len(list(logger.read(p))) for p in parts]) == 10
+
+    # Old logs are compressed or removed (only once a day)
+    assert logger.maintain(today, retention = 30) == (1, 3)
+    assert logger.maintain(today, retention = 30) == (0, 0)
+
+    assert logger.listLogDays(path.TESTS) == [
+        (days[1].date(), path.TESTS.path + lib.formatDate(days[1]) + "/"),
+        (days[2].date(), directory)]
+
+    # Search logs
+    matches = list(logger.grep("Message [19] ", name = "test.log",
+        src = path.TESTS))
+
+    assert [date for date, _ in matches] == [days[1].date()] * 2 + \
+        [days[2].date()] * 2
+    assert matches[-1][1] == "Message 9 " + "-" * 20
+
+    matches = list(logger.grep("Message 1 ", today, name = "test.log",
+        src = path.TESTS))
+
+    assert matches == [(today, "Message 1 " + "-" * 20)]
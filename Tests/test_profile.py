@@ -24,6 +24,7 @@
 import datetime
 import copy
 import pytest
+import numpy as np
 
 
 
@@ -458,6 +459,37 @@ def test_cut():
 
 
 
+def test_window():
+
+    """
+    Find steps of profile within limits without copying it.
+    """
+
+    profile = [(getTime("23:30:00", "1970.01.01"), 6.2),
+               (getTime("00:00:00", "1970.01.02"), 6),
+               (getTime("00:30:00", "1970.01.02"), 5.8),
+               (getTime("00:00:00", "1970.01.03"), 5.6)]
+
+    p = Profile()
+    p.T, p.y = lib.unzip(profile)
+
+    assert p.window(profile[1][0], getTime("12:00:00", "1970.01.02")) == (
+        1, 3)
+
+    # Empty windows
+    assert p.window(getTime("00:00:00", "1970.01.01"),
+        getTime("01:00:00", "1970.01.01")) == (0, 0)
+    assert p.window(getTime("01:00:00", "1970.01.03"),
+        getTime("00:00:00", "1970.01.04")) == (4, 4)
+
+    # Excerpts leave profile untouched
+    e = p.excerpt(profile[1][0], profile[2][0])
+
+    assert [e.T, e.y] == [[profile[1][0], profile[2][0]], [6, 5.8]]
+    assert len(p.T) == 4
+
+
+
 def test_pad():
 
     """
@@ -531,6 +563,65 @@ def test_fill_empty():
 
 
 
+def test_fill_uncovered():
+
+    """
+    Refuse filling a step profile with a filler which does not cover its holes.
+    """
+
+    profile = [(getTime("01:00:00"), None),
+               (getTime("02:00:00"), 6),
+               (getTime("03:00:00"), None),
+               (getTime("04:00:00"), 5.8)]
+
+    # Filler starts after first hole
+    filler = [(getTime("01:30:00"), 100),
+              (getTime("04:00:00"), 150)]
+
+    p = StepProfile()
+    p.T, p.y = lib.unzip(profile)
+
+    f = StepProfile()
+    f.T, f.y = lib.unzip(filler)
+
+    with pytest.raises(ValueError):
+        p.fill(f)
+
+    # Profile was left untouched
+    assert zip(p.T, p.y) == profile
+
+
+
+def test_fill_types():
+
+    """
+    Fill a step profile using a filler with integer values, and make sure holes
+    get the filler's values as they are.
+    """
+
+    profile = [(getTime("01:00:00"), None),
+               (getTime("02:00:00"), 6.5),
+               (getTime("03:00:00"), None),
+               (getTime("04:00:00"), 5.8)]
+
+    filler = [(getTime("00:00:00"), 1),
+              (getTime("02:30:00"), 1.5),
+              (getTime("03:00:00"), 2),
+              (getTime("04:00:00"), 3)]
+
+    p = StepProfile()
+    p.T, p.y = lib.unzip(profile)
+
+    f = StepProfile()
+    f.T, f.y = lib.unzip(filler)
+
+    p.fill(f)
+
+    assert p.y == [1, 6.5, 2, 5.8]
+    assert [type(y) for y in p.y] == [int, float, int, float]
+
+
+
 def test_fill_start():
 
     """
@@ -718,6 +809,52 @@ def test_normalize():
 
 
 
+def test_f():
+
+    """
+    Compute values of step profile, one time at a time, or all at once.
+    """
+
+    profile = [(getTime("00:00:00"), 6),
+               (getTime("00:30:00"), 5.8),
+               (getTime("01:00:00"), 5.2),
+               (getTime("02:00:00"), 4.8)]
+
+    p = StepProfile()
+    p.T, p.y = lib.unzip(profile)
+    p.norm = getTime("02:00:00")
+    p.normalize()
+
+    # Start of steps, within steps and end of profile
+    T = [getTime("00:00:00"), getTime("00:29:59"), getTime("00:30:00"),
+         getTime("01:59:59"), getTime("02:00:00")]
+    y = [6, 6, 5.8, 5.2, 4.8]
+
+    assert [p.f(x) for x in T] == y
+    assert p.f(T).tolist() == y
+
+    # Normalized times
+    t = [lib.normalizeTime(x, p.norm) for x in T]
+
+    assert [p.f(x) for x in t] == y
+    assert p.f(t).tolist() == y
+
+    # Datetime64 times (only all at once)
+    assert p.f(np.array(T, "datetime64[us]")).tolist() == y
+
+    with pytest.raises(TypeError):
+        p.f(np.datetime64(T[0]))
+
+    # Out of profile
+    for x in [getTime("23:59:59", "1969.12.31"), getTime("02:00:01")]:
+        with pytest.raises(ValueError):
+            p.f(x)
+
+        with pytest.raises(ValueError):
+            p.f([getTime("00:00:00"), x])
+
+
+
 def test_op():
 
     """
@@ -789,4 +926,62 @@ def test_op():
     do_test_op("+", p1, p2, expectationAdd)
     do_test_op("-", p1, p2, expectationSubtract)
     do_test_op("*", p1, p2, expectationMultiply)
-    do_test_op("/", p1, p2, expectationDivide)
\ No newline at end of file
+    do_test_op("/", p1, p2, expectationDivide)
+
+
+
+def test_op_many():
+
+    """
+    Combine more than two step profiles at once, using a numpy ufunc or a
+    function.
+    """
+
+    start, end = getTime("00:00:00"), getTime("01:00:00")
+
+    profiles = [[(start, 1), (getTime("00:20:00"), 4), (end, 4)],
+                [(start, 2), (getTime("00:40:00"), 0), (end, 0)],
+                [(start, 3), (getTime("00:20:00"), 1), (end, 1)]]
+
+    ps = []
+
+    for profile in profiles:
+        p = StepProfile()
+        p.T, p.y = lib.unzip(profile)
+        p.start, p.end = start, end
+        ps += [p]
+
+    T = [start, getTime("00:20:00"), getTime("00:40:00"), end]
+
+    p = ps[0].op(np.maximum, ps[1:])
+
+    assert p.T == T
+    assert p.y == [3, 4, 4, 4]
+
+    # Result does not share state of operands, but keeps their norm and units
+    class Cached(StepProfile):
+
+        def __init__(self):
+            super(Cached, self).__init__()
+            self.cache = {}
+
+    base = Cached()
+    base.T, base.y = ps[0].T, ps[0].y
+    base.start, base.end = start, end
+    base.norm, base.units = end, "U/h"
+
+    p = base.add(*ps[1:])
+
+    assert not isinstance(p, Cached)
+    assert not hasattr(p, "cache")
+    assert p.norm == end and p.units == "U/h"
+    assert p.y == [6, 7, 5, 5]
+    assert p.t[-1] == 0
+
+    p = ps[0].op(lambda x, y: x - y, ps[1:])
+
+    assert p.T == T
+    assert p.y == [-4, 1, 3, 3]
+
+    # Operands are left untouched
+    assert [[p.T, p.y] for p in ps] == [lib.unzip(x) for x in profiles]
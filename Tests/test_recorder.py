@@ -0,0 +1,104 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    test_recorder
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Notes: To run tests, use command "python -m pytest".
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import pytest
+
+
+
+# USER LIBRARIES
+import path
+import recorder
+
+
+
+# FIXTURES
+@pytest.fixture
+def trace(monkeypatch):
+
+    """
+    Setup and teardown for tests which record events.
+    """
+
+    path.TESTS.touch()
+    r = recorder.Recorder(path.TESTS.path + recorder.TRACE, 4)
+    monkeypatch.setattr(recorder, "RECORDER", r)
+    yield r
+    r.close()
+    path.TESTS.delete()
+
+
+
+# TESTS
+def test_ring(trace):
+
+    """
+    Record more events than trace can hold, then read the last ones back.
+    """
+
+    for i in range(6):
+        trace.record(i, "Pump", "Command " + str(i), "0" + str(i), 0.5, i, 2 * i)
+
+    assert trace.count() == 6
+
+    events = trace.read()
+
+    assert [e["Name"] for e in events] == ["Command " + str(i)
+        for i in range(2, 6)]
+    assert events[-1]["Code"] == 5
+    assert events[-1]["TX"] == 5
+    assert events[-1]["RX"] == 10
+    assert events[-1]["Outcome"] == "OK"
+
+    # Trace survives being opened again
+    trace.close()
+    r = recorder.Recorder(trace.filename, 4)
+
+    assert r.read() == events
+
+    r.close()
+
+
+
+def test_trace(trace):
+
+    """
+    Trace blocks of code, whether they fail or not, then filter them.
+    """
+
+    with recorder.trace("Stick", "ReadName", 0, lambda: (1, 16)):
+        pass
+
+    with pytest.raises(IOError):
+        with recorder.trace("CGM", "ReadDatabase", 17):
+            raise IOError
+
+    events = trace.read()
+
+    assert [(e["Subsystem"], e["Outcome"], e["Error"]) for e in events] == [
+        ("Stick", "OK", None), ("CGM", "Error", "IOError")]
+    assert (events[0]["TX"], events[0]["RX"]) == (1, 16)
+
+    assert recorder.select(events, errors = True) == events[1:]
+    assert recorder.select(events, subsystem = "Stick") == events[:1]
+    assert recorder.select(events, n = 1) == events[1:]
+    assert recorder.select(events, slowest = 60) == []
@@ -22,6 +22,8 @@
 
 # LIBRARIES
 import os
+import json
+import fcntl
 import datetime
 import pytest
 
@@ -207,6 +209,310 @@ def test_store_overwrite_report(setup_and_teardown):
 
 
 
+def test_commit_reports(setup_and_teardown, monkeypatch):
+
+    """
+    Atomically store multiple reports at once.
+    """
+
+    monkeypatch.setattr(reporter, "DURABILITY", "full")
+
+    reports = [DatedReport(datetime.date(1970, 1, 1), json = {"A": 1}),
+               DatedReport(datetime.date(1970, 1, 2), json = {"B": 2})]
+
+    assert reporter.commit(reports) == 2
+    assert reporter.commit(reports) == 0
+
+    # No temporary files left behind (only lock files)
+    for report in reports:
+        assert sorted(os.listdir(report.directory.path)) == [
+            os.path.basename(report.getLockPath()), report.name]
+
+    # Nothing gets written if one report cannot be overwritten
+    reports[0].set(2, ["A"], True)
+
+    with pytest.raises(errors.NoOverwriting):
+        reporter.commit(reports, False)
+
+    report = DatedReport(datetime.date(1970, 1, 1))
+    report.load()
+
+    assert report.get() == {"A": 1}
+
+
+
+def test_journal(setup_and_teardown, monkeypatch):
+
+    """
+    Append changes to journal of journaled report, and compact it once it gets
+    too long.
+    """
+
+    monkeypatch.setattr(reporter, "JOURNAL_SIZE", 3)
+    monkeypatch.setattr(Report, "journal", True)
+
+    report = Report()
+    report.set(0, ["A", "B"])
+    report.store()
+
+    # Changes are journaled
+    report.increment(["A", "B"])
+    report.set(1, ["C"])
+    report.store()
+
+    assert os.path.isfile(report.getJournalPath())
+
+    # Journal is replayed on load
+    report = Report()
+    report.load()
+
+    assert report.get() == {"A": {"B": 1}, "C": 1}
+
+    # Report gets compacted when journal is too long
+    report.delete(["C"])
+    report.increment(["A", "B"])
+    report.store()
+
+    assert not os.path.isfile(report.getJournalPath())
+
+    with open(report.directory.path + report.name, "r") as f:
+        assert json.load(f) == {"A": {"B": 2}, reporter.GENERATION: 2}
+
+
+
+def test_journal_crash(setup_and_teardown, monkeypatch):
+
+    """
+    Crash while compacting journaled report, after its new content was stored
+    but before its journal was discarded.
+    """
+
+    monkeypatch.setattr(reporter, "JOURNAL_SIZE", 1)
+    monkeypatch.setattr(Report, "journal", True)
+
+    report = Report()
+    report.set(0, ["A"])
+    report.store()
+
+    # Journal change
+    report.increment(["A"])
+    report.store()
+
+    # Compact report, but crash before discarding journal
+    discard = Report.discardJournal
+
+    def crash(self):
+        raise IOError("Crash!")
+
+    monkeypatch.setattr(Report, "discardJournal", crash)
+
+    report.increment(["A"])
+    report.set(0, ["B"])
+
+    with pytest.raises(IOError):
+        report.store()
+
+    assert os.path.isfile(report.getJournalPath())
+
+    # Stale journal should not be replayed
+    report = Report()
+    report.load()
+
+    assert report.get() == {"A": 2, "B": 0}
+
+    # It gets discarded on next store
+    monkeypatch.setattr(Report, "discardJournal", discard)
+
+    report.increment(["A"])
+    report.store()
+
+    assert not os.path.isfile(report.getJournalPath())
+
+    # Journaling works again
+    report.increment(["A"])
+    report.store()
+
+    report = Report()
+    report.load()
+
+    assert report.get() == {"A": 4, "B": 0}
+    assert os.path.isfile(report.getJournalPath())
+
+
+
+def test_outdated_report(setup_and_teardown):
+
+    """
+    Reload loaded report when its file gets changed by someone else.
+    """
+
+    date = datetime.date(1970, 1, 1)
+
+    DatedReport(date, json = {"A": 1}).store()
+
+    report = reporter.getReportByType(DatedReport, date, path.TESTS)
+
+    assert not report.isOutdated()
+
+    # Update report's file without going through loaded report
+    DatedReport(date, json = {"A": 2}).store()
+
+    assert report.isOutdated()
+    assert reporter.getReportByType(DatedReport, date, path.TESTS).get() == {
+        "A": 2}
+
+
+
+def test_cache(setup_and_teardown, monkeypatch):
+
+    """
+    Use cached content of unchanged reports.
+    """
+
+    monkeypatch.setattr(reporter, "CACHE", True)
+
+    report = Report(json = {"A": 1})
+    report.store()
+
+    assert os.path.isfile(report.getCachePath())
+
+    # Cached content is used as long as file did not change
+    report.writeCache(report.getStat()[0], {"A": "Cached"})
+    report.load()
+
+    assert report.get() == {"A": "Cached"}
+
+    # File changed: cache is outdated
+    Report(json = {"A": 2}).store()
+    report.writeCache(report.getStat()[0][:-1] + (0, ), {"A": "Cached"})
+    report.load()
+
+    assert report.get() == {"A": 2}
+
+
+
+def test_lock(setup_and_teardown):
+
+    """
+    Lock report files against other processes, reentrantly.
+    """
+
+    report = Report(json = {"A": 1})
+    report.store()
+
+    def isLocked():
+
+        # Another open file description conflicts with held locks
+        fd = os.open(report.getLockPath(), os.O_RDWR)
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            return False
+
+        except IOError:
+            return True
+
+        finally:
+            os.close(fd)
+
+    assert not isLocked()
+
+    with report.lock():
+        assert isLocked()
+
+        # Shared locks are not upgraded
+        with pytest.raises(errors.LockUpgrade):
+            with report.lock(True):
+                pass
+
+        assert not reporter.LOCKS[report.getLockPath()]["exclusive"]
+
+        # Loading reuses held lock
+        report.load()
+
+    with report.lock(True):
+
+        # Nested shared lock reuses exclusive one
+        with report.lock():
+            assert reporter.LOCKS[report.getLockPath()]["exclusive"]
+
+    assert not isLocked()
+    assert reporter.LOCKS == {}
+
+    # Reports within a directory share a single lock file
+    other = reporter.Report("other.json", path.TESTS, {"B": 2})
+    other.store()
+
+    assert other.getLockPath() == report.getLockPath()
+    assert sorted(os.listdir(path.TESTS.path)) == [
+        ".lock", "other.json", report.name]
+
+    # Shared locks do not create lock files
+    dated = DatedReport(datetime.date(1970, 1, 1))
+    dated.directory.touch()
+
+    with dated.lock():
+        assert not os.path.exists(dated.getLockPath())
+
+
+
+def test_lock_error(setup_and_teardown, monkeypatch):
+
+    """
+    Lock errors are not mistaken for loading errors.
+    """
+
+    report = Report(json = {"A": 1})
+    report.store()
+
+    def flock(fd, mode):
+        raise IOError("Lock failure")
+
+    monkeypatch.setattr(fcntl, "flock", flock)
+
+    with pytest.raises(IOError):
+        report.load(False)
+
+    assert report.get() == {"A": 1}
+
+
+
+def test_transaction(setup_and_teardown):
+
+    """
+    Reload report within transaction, so no change made by another process
+    gets lost.
+    """
+
+    report = Report(json = {"A": 1, "B": 1})
+    report.store()
+
+    # Same report as seen by another process
+    other = Report()
+    other.load()
+    other.increment(["B"])
+    other.store()
+
+    with reporter.transaction(report) as r:
+        r.increment(["A"])
+
+    report = Report()
+    report.load()
+
+    assert report.get() == {"A": 2, "B": 2}
+
+    # Failed transactions do not leave changes behind
+    with pytest.raises(ValueError):
+        with reporter.transaction(report) as r:
+            r.increment(["A"])
+            raise ValueError
+
+    assert report.get() == {"A": 2, "B": 2}
+    assert not report.dirty
+
+
+
 def test_get():
 
     """
@@ -355,6 +661,40 @@ def test_increment():
 
 
 
+def test_dirty(setup_and_teardown):
+
+    """
+    Only store reports when their content changed.
+    """
+
+    report = reporter.getReportByType(DatedReport, datetime.date(1970, 1, 1),
+        path.TESTS, False)
+
+    assert not report.dirty
+
+    # Setting an identical value does not change anything
+    report.set({}, [], True)
+    report.set(1, ["A"])
+    report.store()
+    report.set(1, ["A"])
+
+    assert not report.dirty
+
+    # Changes are only written when flushing
+    report.increment(["A"])
+
+    assert report.dirty
+    assert reporter.flush() == 1
+    assert not report.dirty
+    assert reporter.flush() == 0
+
+    report = DatedReport(datetime.date(1970, 1, 1))
+    report.load()
+
+    assert report.get(["A"]) == 2
+
+
+
 def test_get_report_dates(setup_and_teardown):
 
     """
@@ -377,6 +717,37 @@ def test_get_report_dates(setup_and_teardown):
 
 
 
+def test_manifest(setup_and_teardown):
+
+    """
+    Get ranges of dates from manifest, and catch reports created behind its
+    back.
+    """
+
+    dates = [datetime.date(1975, 1, 1),
+             datetime.date(1980, 2, 2),
+             datetime.date(1985, 3, 3)]
+
+    # Store reports (manifest gets updated along the way)
+    for d in dates:
+        DatedReport(d).store()
+
+    manifest = reporter.getManifest(path.TESTS)
+
+    assert manifest.exists()
+    assert manifest.getDates(DatedReport.name) == dates
+    assert reporter.getReportDates(DatedReport, path.TESTS,
+        dates[1], dates[2]) == dates[1:]
+
+    # Create a report file without going through reporter
+    os.makedirs(path.TESTS.path + "1990/04/04")
+    open(path.TESTS.path + "1990/04/04/" + DatedReport.name, "w").close()
+
+    assert reporter.getReportDates(DatedReport, path.TESTS,
+        start = dates[2]) == [dates[2], datetime.date(1990, 4, 4)]
+
+
+
 def test_get_recent(setup_and_teardown):
 
     """
@@ -417,6 +788,28 @@ def test_get_recent(setup_and_teardown):
 
 
 
+def test_iter_report_dates(setup_and_teardown):
+
+    """
+    Lazily get dates for stored dated reports, starting with the latest one.
+    """
+
+    dates = [datetime.date(1975, 1, 1),
+             datetime.date(1980, 2, 2),
+             datetime.date(1980, 2, 20),
+             datetime.date(1985, 3, 3)]
+
+    # Instanciate empty reports and store them
+    for d in dates:
+        DatedReport(d).store()
+
+    assert (list(reporter.iterReportDates(DatedReport, path.TESTS)) ==
+            dates[::-1])
+    assert (list(reporter.iterReportDates(DatedReport, path.TESTS,
+            datetime.date(1980, 2, 10))) == [dates[1], dates[0]])
+
+
+
 def test_get_dated_entries(setup_and_teardown):
 
     """
@@ -493,6 +886,241 @@ def test_set_dated_entries(setup_and_teardown):
 
 
 
+def test_batch(setup_and_teardown, monkeypatch):
+
+    """
+    Store each report touched by a batch of dated entries only once.
+    """
+
+    T1 = datetime.datetime(1970, 1, 1, 0, 0, 0)
+    T2 = datetime.datetime(1970, 1, 2, 0, 0, 0)
+
+    reporter.setDatedEntries(DatedReport, ["A"], {T1: 0, T2: 0}, path.TESTS)
+
+    # Count commits from now on
+    commits = []
+    commit = reporter.commit
+
+    def countingCommit(reports, *args):
+        commits.append(len(reports))
+        return commit(reports, *args)
+
+    monkeypatch.setattr(reporter, "commit", countingCommit)
+
+    with reporter.batch():
+        reporter.setDatedEntries(DatedReport, ["A"], {T1: 1, T2: 2},
+            path.TESTS)
+
+        # Nested batches do not store anything
+        with reporter.batch():
+            reporter.setDatedEntries(DatedReport, ["B"], {T1: 3}, path.TESTS)
+
+        assert commits == []
+
+    assert commits == [2]
+    assert reporter.BATCH is None
+
+    reporter.reset()
+
+    report = DatedReport(T1.date(), path.TESTS)
+    report.load()
+
+    assert report.get() == {"A": {lib.formatTime(T1): 1},
+                            "B": {lib.formatTime(T1): 3}}
+
+
+
+def test_rollup(setup_and_teardown):
+
+    """
+    Keep monthly rollups of dated reports up-to-date as they are stored.
+    """
+
+    d1 = datetime.date(1970, 1, 1)
+    d2 = datetime.date(1970, 1, 2)
+
+    # BGs
+    reporter.setDatedEntries(reporter.BGReport, [], {
+        datetime.datetime(1970, 1, 1, 0, 0, 0): 3.0,
+        datetime.datetime(1970, 1, 1, 0, 5, 0): 5.0,
+        datetime.datetime(1970, 1, 2, 0, 0, 0): 9.0}, path.TESTS)
+
+    # Loops
+    report = reporter.LoopReport(d1, path.TESTS)
+    report.load(False)
+
+    for duration in [10, 20]:
+        report.increment(["Loop", "Start"])
+        report.increment(["Loop", "End"])
+        report.set(duration, ["Loop", "Last Duration"], True)
+        report.increment(["Loop", "Duration"], False, duration)
+        report.store()
+
+    # Errors
+    for date, n in [(d1, 1), (d2, 2)]:
+        report = reporter.ErrorsReport(date, path.TESTS)
+        report.load(False)
+        report.set(n, ["A", "B"], True)
+        report.store()
+
+    # Stored reports only mark their rollup as stale
+    rollup = reporter.Rollup(d1, path.TESTS)
+
+    assert not rollup.exists()
+
+    rollup = reporter.getRollup(d1, path.TESTS)
+
+    assert rollup.exists()
+    assert reporter.getSummaries(d2, d2, path.TESTS) == {
+        d2: {"BG": {"Count": 1, "Mean": 9.0, "TIR": 1.0},
+             "Errors": {"A": {"B": 2}}}}
+    assert rollup.json["Month"] == {
+        "BG": {"Count": 3, "Mean": 5.67, "TIR": 0.667},
+        "Loop": {"Start": 2, "End": 2, "Duration": 30},
+        "Errors": {"A": {"B": 3}}}
+
+    # Rollups are rebuilt from reports when missing
+    os.remove(rollup.directory.path + rollup.name)
+    reporter.reset()
+
+    summaries = reporter.getMonthlySummaries(d1, datetime.date(1970, 12, 31),
+        path.TESTS)
+
+    assert summaries.keys() == [d1]
+    assert summaries[d1]["BG"] == rollup.json["Month"]["BG"]
+    assert summaries[d1]["Loop"]["End"] == 2
+
+    # Monthly errors
+    assert reporter.getMonthlyErrors(d2, 1, path.TESTS) == {
+        "1970/01/01": {"A": {"B": 1}},
+        "1970/01/02": {"A": {"B": 2}}}
+
+    # Errors changed behind rollup's back are still found
+    report = reporter.ErrorsReport(d2, path.TESTS)
+    report.load()
+    report.set(5, ["A", "B"], True)
+    report.store()
+    reporter.STALE_ROLLUPS.clear()
+
+    assert reporter.getMonthlyErrors(d2, 1, path.TESTS) == {
+        "1970/01/01": {"A": {"B": 1}},
+        "1970/01/02": {"A": {"B": 5}}}
+
+    # Reports without summaries are skipped
+    assert reporter.DatedReport("test.json", d1, path.TESTS).summarize() is (
+        None)
+
+
+
+def test_registry_eviction(setup_and_teardown):
+
+    """
+    Evict least recently used dated reports from registry.
+    """
+
+    registry = reporter.Registry(2)
+
+    dates = [datetime.date(1970, 1, 1),
+             datetime.date(1970, 1, 2),
+             datetime.date(1970, 1, 3)]
+
+    reports = [DatedReport(d) for d in dates]
+
+    # Register two reports, then use the oldest one again
+    registry.add(reports[0])
+    registry.add(reports[1])
+    
+    assert registry.get(DatedReport, dates[0]) is reports[0]
+
+    # Registering a third one should evict the least recently used one
+    registry.add(reports[2])
+
+    assert len(registry) == 2
+    assert registry.find(DatedReport, dates[1]) is None
+    assert registry.find(DatedReport, dates[0]) is reports[0]
+    assert registry.find(DatedReport, dates[2]) is reports[2]
+
+    # Evicted report should have been stored before being dropped
+    assert reports[1].exists()
+
+    # Non-dated reports are never evicted
+    report = Report()
+    registry.add(report)
+
+    assert registry.get(Report) is report and len(registry) == 3
+
+    # Reports can be found using their base type
+    assert registry.find(reporter.DatedReport, dates[2]) is reports[2]
+    assert registry.get(reporter.Report) is report
+
+    # Clean reports are dropped without being stored
+    clean = DatedReport(datetime.date(1970, 1, 4))
+    clean.dirty = False
+    registry.add(clean)
+    registry.get(DatedReport, dates[2])
+    registry.add(DatedReport(datetime.date(1970, 1, 5)))
+
+    assert registry.find(DatedReport, clean.date) is None
+    assert not clean.exists()
+
+    # Changed reports waiting for active batch are kept
+    with reporter.batch() as b:
+        b.add([reports[2]])
+        registry.add(DatedReport(datetime.date(1970, 1, 6)))
+
+        assert registry.find(DatedReport, dates[2]) is reports[2]
+        assert registry.find(DatedReport, datetime.date(1970, 1, 5)) is None
+        assert not reports[2].exists()
+
+    assert reports[2].exists()
+
+
+
+def test_evicted_loop_report(setup_and_teardown, monkeypatch):
+
+    """
+    Keep updating loop report after it was evicted from registry in the middle
+    of a loop, by getting it again every time, and make sure all changes get
+    stored.
+    """
+
+    monkeypatch.setattr(reporter, "REPORTS", reporter.Registry(2))
+
+    today = datetime.date(1970, 1, 1)
+
+    def getLoopReport():
+        return reporter.getReportByType(reporter.LoopReport, today,
+            path.TESTS, False)
+
+    # Start loop
+    report = getLoopReport()
+    report.increment(["Loop", "Start"])
+    report.store()
+
+    # Load enough other dated reports (e.g. history) to evict loop report
+    for day in range(2, 5):
+        reporter.getReportByType(DatedReport, datetime.date(1970, 1, day),
+            path.TESTS, False)
+
+    assert reporter.REPORTS.find(reporter.LoopReport, today) is None
+
+    # Update loop report, then stop loop
+    getLoopReport().increment(["CGM", "BG"])
+    getLoopReport().increment(["Loop", "End"])
+
+    assert getLoopReport() is not report
+
+    reporter.flush()
+
+    # All changes were stored
+    report = reporter.LoopReport(today, path.TESTS)
+    report.load()
+
+    assert [report.get(["Loop", "Start"]), report.get(["CGM", "BG"]),
+            report.get(["Loop", "End"])] == [1, 1, 1]
+
+
+
 
 
 
@@ -619,4 +1247,59 @@ def test_merge_bad_types():
         lib.merge("Test", {})
 
     with pytest.raises(TypeError):
-        lib.merge("Test", "Test")
\ No newline at end of file
+        lib.merge("Test", "Test")
+
+
+def test_merged_view():
+
+    """
+    Merge dicts lazily using a view.
+    """
+
+    a = {
+        "A": 0,
+        "B": {
+            "C": 1
+        }
+    }
+    b = {
+        "A": 0,
+        "B": {
+            "D": 2
+        },
+        "E": 3
+    }
+    c = {
+        "A": 1
+    }
+
+    view = lib.MergedView(a, b)
+
+    assert len(view) == 3
+    assert view["B"]["D"] == 2
+    assert view == lib.merge(a, b)
+
+    # Nothing copied, nothing changed
+    assert view["E"] is b["E"]
+    assert a == {"A": 0, "B": {"C": 1}}
+
+    # Materialized dict is independent
+    d = view.materialize()
+    d["B"]["C"] = 4
+
+    assert type(d) is dict
+    assert a["B"]["C"] == 1
+
+    # Conflicts only show up on access
+    view = lib.MergedView(a, c)
+
+    assert view["B"] == {"C": 1}
+
+    with pytest.raises(ValueError):
+        view["A"]
+
+    with pytest.raises(ValueError):
+        view.materialize()
+
+    with pytest.raises(TypeError):
+        lib.MergedView({}, [])
@@ -0,0 +1,148 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    test_series
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Notes: To run tests, use command "python -m pytest".
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import os
+import datetime
+import pytest
+
+
+
+# USER LIBRARIES
+import path
+import reporter
+import series
+
+
+
+# FIXTURES
+@pytest.fixture
+def setup_and_teardown():
+
+    """
+    Setup and teardown for tests which store series.
+    """
+
+    reporter.reset()
+    path.TESTS.touch()
+    yield
+    path.TESTS.delete()
+
+
+
+# TESTS
+def test_store_and_query(setup_and_teardown):
+
+    """
+    Store entries over multiple days and query them back.
+    """
+
+    entries = {datetime.datetime(1970, 1, 1, 23, 55, 0): 6.2,
+               datetime.datetime(1970, 1, 2, 0, 0, 0): 6.0,
+               datetime.datetime(1970, 1, 2, 0, 5, 0): 5.8}
+
+    series.store(reporter.BGReport, entries, path.TESTS)
+
+    t, y = series.query(reporter.BGReport,
+        datetime.datetime(1970, 1, 1, 0, 0, 0),
+        datetime.datetime(1970, 1, 2, 0, 0, 0), path.TESTS)
+
+    assert series.decode(t) == sorted(entries)[:2]
+    assert series.decodeValues(y) == [6.2, 6.0]
+
+    # Overwrite older entry and add a newer one
+    series.store(reporter.BGReport, {
+        datetime.datetime(1970, 1, 2, 0, 0, 0): 7.0,
+        datetime.datetime(1970, 1, 2, 0, 10, 0): 7.2}, path.TESTS)
+
+    t, y = series.query(reporter.BGReport,
+        datetime.datetime(1970, 1, 2, 0, 0, 0),
+        datetime.datetime(1970, 1, 3, 0, 0, 0), path.TESTS)
+
+    assert series.decodeValues(y) == [7.0, 5.8, 7.2]
+
+
+
+def test_rebuild(setup_and_teardown):
+
+    """
+    Rebuild series from its dated report when it is missing.
+    """
+
+    entries = {datetime.datetime(1970, 1, 1, 0, 0, 0): 6.2,
+               datetime.datetime(1970, 1, 1, 0, 5, 0): 6.0}
+
+    reporter.setDatedEntries(reporter.BGReport, [], entries, path.TESTS)
+
+    s = series.Series(reporter.BGReport, datetime.date(1970, 1, 1), path.TESTS)
+
+    assert s.isStale()
+    assert not any([os.path.isfile(p) for p in s.getPaths()])
+
+    t, y = series.query(reporter.BGReport,
+        datetime.datetime(1970, 1, 1, 0, 0, 0),
+        datetime.datetime(1970, 1, 1, 23, 59, 59), path.TESTS)
+
+    assert series.decode(t) == sorted(entries)
+    assert series.decodeValues(y) == [6.2, 6.0]
+    assert not s.isStale()
+
+
+
+def test_stamp(setup_and_teardown, monkeypatch):
+
+    """
+    Store entries in columns and reports, and make sure columns are only
+    appended to as long as they are stamped with the reports' state.
+    """
+
+    day = datetime.date(1970, 1, 1)
+
+    entries = [{datetime.datetime(1970, 1, 1, 0, 0, 0): 6.2},
+               {datetime.datetime(1970, 1, 1, 0, 5, 0): 6.0}]
+
+    s = series.Series(reporter.BGReport, day, path.TESTS)
+
+    # Store first entries
+    series.store(reporter.BGReport, entries[0], path.TESTS)
+    reporter.setDatedEntries(reporter.BGReport, [], entries[0], path.TESTS)
+    series.stamp(reporter.BGReport, entries[0], path.TESTS)
+
+    assert not s.isStale()
+
+    # Storing more entries should not rebuild columns
+    def rebuild(self):
+        raise AssertionError("Series should not be rebuilt.")
+
+    monkeypatch.setattr(series.Series, "rebuild", rebuild)
+
+    series.store(reporter.BGReport, entries[1], path.TESTS)
+    reporter.setDatedEntries(reporter.BGReport, [], entries[1], path.TESTS)
+    series.stamp(reporter.BGReport, entries[1], path.TESTS)
+
+    assert series.decodeValues(s.read()[1]) == [6.2, 6.0]
+
+    # Report changing on its own outdates columns
+    reporter.setDatedEntries(reporter.BGReport, [],
+        {datetime.datetime(1970, 1, 1, 0, 10, 0): 5.8}, path.TESTS)
+
+    assert s.isStale()
@@ -0,0 +1,167 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    test_storage
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Notes: To run tests, use command "python -m pytest".
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import datetime
+import pytest
+
+
+
+# USER LIBRARIES
+import errors
+import path
+import reporter
+import storage
+
+
+
+# FIXTURES
+@pytest.fixture
+def database():
+
+    """
+    Setup and teardown for tests which use a database.
+    """
+
+    reporter.reset()
+    path.TESTS.touch()
+    db = storage.Database(path.TESTS.path + storage.DATABASE)
+    yield db
+    db.close()
+    path.TESTS.delete()
+
+
+
+# TESTS
+def test_store_and_load(database):
+
+    """
+    Store a report in database and load it back.
+    """
+
+    date = datetime.date(1970, 1, 1)
+
+    json = {"A": {"1970.01.01 - 00:00:00": 6.2,
+                  "1970.01.01 - 00:05:00": 6.0},
+            "B": {"C": 1}}
+
+    report = storage.SQLiteReport(reporter.BGReport, date, database, json)
+    report.store()
+
+    # Dated entries were moved out of report's skeleton
+    rows = database.connect().execute("SELECT * FROM entries").fetchall()
+
+    assert len(rows) == 2
+
+    report = storage.SQLiteReport(reporter.BGReport, date, database)
+    report.load()
+
+    assert report.get() == json
+
+    # Branch API still works
+    report.increment(["B", "C"])
+    report.store()
+
+    report = storage.SQLiteReport(reporter.BGReport, date, database)
+    report.load()
+
+    assert report.get(["B", "C"]) == 2
+
+
+
+def test_dated_entries(database):
+
+    """
+    Set dated entries and get them back, over multiple days.
+    """
+
+    entries = {datetime.datetime(1975, 1, 1, 0, 0, 0): 6.2,
+               datetime.datetime(1975, 1, 2, 0, 0, 0): 6.0,
+               datetime.datetime(1975, 1, 4, 0, 0, 0): 5.8}
+
+    branch = ["A", "B"]
+
+    storage.setDatedEntries(reporter.BGReport, branch, entries, database)
+
+    json = storage.getDatedEntries(reporter.BGReport,
+        [datetime.date(1975, 1, 1), datetime.date(1975, 1, 2)], branch,
+        database)
+
+    assert json == {"1975.01.01 - 00:00:00": 6.2,
+                    "1975.01.02 - 00:00:00": 6.0}
+
+    # Parent branch
+    json = storage.getDatedEntries(reporter.BGReport,
+        [datetime.date(1975, 1, 4)], ["A"], database)
+
+    assert json == {"B": {"1975.01.04 - 00:00:00": 5.8}}
+
+    # Recent entries
+    now = datetime.datetime(1975, 1, 5, 0, 0, 0)
+
+    json = storage.getRecentDatedEntries(reporter.BGReport, now, branch, 2,
+        database)
+
+    assert json == {"1975.01.02 - 00:00:00": 6.0,
+                    "1975.01.04 - 00:00:00": 5.8}
+
+    json = storage.getRecentDatedEntries(reporter.BGReport, now, branch, 2,
+        database, True)
+
+    assert json == {"1975.01.04 - 00:00:00": 5.8}
+
+    # Overwriting entries has to be allowed
+    entry = {datetime.datetime(1975, 1, 4, 0, 0, 0): 6.4}
+
+    storage.setDatedEntries(reporter.BGReport, branch,
+        {datetime.datetime(1975, 1, 4, 0, 0, 0): 5.8}, database)
+
+    with pytest.raises(errors.NoOverwriting):
+        storage.setDatedEntries(reporter.BGReport, branch, entry, database)
+
+    storage.setDatedEntries(reporter.BGReport, branch, entry, database, True)
+
+    json = storage.getDatedEntries(reporter.BGReport,
+        [datetime.date(1975, 1, 4)], branch, database)
+
+    assert json == {"1975.01.04 - 00:00:00": 6.4}
+
+
+
+def test_migrate(database):
+
+    """
+    Import JSON reports into database.
+    """
+
+    date = datetime.date(1980, 2, 2)
+
+    report = reporter.BGReport(date, path.TESTS)
+    report.set(6.2, ["1980.02.02 - 00:00:00"])
+    report.store()
+
+    assert storage.migrate(path.TESTS, database) == 1
+
+    report = storage.SQLiteReport(reporter.BGReport, date, database)
+    report.load()
+
+    assert report.get() == {"1980.02.02 - 00:00:00": 6.2}
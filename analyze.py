@@ -23,7 +23,6 @@
 """
 
 # LIBRARIES
-import copy
 import datetime
 import numpy as np
 import matplotlib.pyplot as plt
@@ -71,13 +70,11 @@ def computeExpectedBGDeltas(t, T, Net, IDC, ISFs):
     # Compute expected BG deltas
     for i in range(len(T) - 1):
 
-        # Copy net insulin profile
-        net_ = copy.deepcopy(Net)
-
-        # Cut it for current IOB computation
+        # Get net insulin profile for current IOB computation (only copy
+        # needed part of it)
         start = T[i] - datetime.timedelta(hours = IDC.DIA)
         end = T[i]
-        net_.cut(start, end)
+        net_ = Net.excerpt(start, end)
         net_.normalize()
 
         # Compute corresponding IOB
@@ -121,13 +118,11 @@ def computeIOBs(t, T, Net, IDC):
     # Compute IOB for each BG
     for i in range(len(T)):
 
-        # Copy net insulin profile
-        net_ = copy.deepcopy(Net)
-
-        # Cut it for current IOB computation
+        # Get net insulin profile for current IOB computation (only copy
+        # needed part of it)
         start = T[i] - datetime.timedelta(hours = IDC.DIA)
         end = T[i]
-        net_.cut(start, end)
+        net_ = Net.excerpt(start, end)
         net_.normalize()
 
         # Compute corresponding IOB, store, and show it
@@ -243,6 +238,9 @@ def main():
     ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     """
 
+    # Cache parsed reports, since analyses load the same days over and over
+    reporter.CACHE = True
+
     # Get current time
     now = datetime.datetime.now()
 
@@ -0,0 +1,266 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    archiver
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Overview: Archival tier for old days of dated reports. The files of days
+              older than a given age are packed into compressed per-month
+              archives, and their directories are removed. Archived files can
+              still be read transparently.
+
+    Notes:    - Each month directory (YYYY/MM/) gets an archive made of
+                concatenated gzip members (one per file, so it can still be
+                read using standard tools), and an index of said members (see
+                archives.py, which reads them).
+              - Nothing schedules archiving within the loop: run this script
+                periodically (e.g. using a daily cron job).
+              - Hidden files (caches, journals, series, etc.) are not archived:
+                journals are folded into their reports, and the rest can be
+                rebuilt from the reports.
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import os
+import json
+import zlib
+import shutil
+import datetime
+
+
+
+# USER LIBRARIES
+import path
+import logger
+import reporter
+import archives
+
+
+
+# Define instances
+Logger = logger.Logger("archiver")
+
+
+
+# CONSTANTS
+# Min age of archived days (days)
+MIN_AGE = 90
+
+
+
+# FUNCTIONS
+def compress(data):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        COMPRESS
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Compress data into a standalone gzip member.
+    """
+
+    compressor = zlib.compressobj(9, zlib.DEFLATED, archives.GZIP_WBITS)
+
+    return compressor.compress(data) + compressor.flush()
+
+
+
+def readDayFile(directory, name):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        READDAYFILE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Read file to archive. Reports with a journal get it folded into their
+        content first.
+    """
+
+    # Journaled report: replay its journal
+    if os.path.isfile(directory + "." + name + ".journal"):
+        report = reporter.Report(name, path.Path(directory))
+        report.journal = True
+        report.load()
+
+        return report.dump()
+
+    # Otherwise: read file as is
+    with open(directory + name, "rb") as f:
+        return f.read()
+
+
+
+def archiveMonth(month, days):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ARCHIVEMONTH
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Add files of given days (DD) to archive of given month directory,
+        update its index, then remove days' directories. New members replace
+        old ones: they are appended to the archive, unless replaced members
+        would then outweigh live ones, in which case live members are copied
+        into a new archive. The index is the commit point, so that if
+        interrupted, days are simply archived again on next run.
+    """
+
+    # Info
+    Logger.info("Archiving " + str(len(days)) + " day(s) of: " + month)
+
+    # Get current archive and copy its index
+    archive = archives.getArchivePath(month)
+    index = dict(archives.getIndex(month))
+
+    # Compress files to archive
+    members = []
+
+    for day in days:
+        directory = month + day + os.sep
+
+        for name in sorted(os.listdir(directory)):
+
+            # Skip hidden files and directories
+            if name.startswith(".") or not os.path.isfile(directory + name):
+                continue
+
+            members += [(day + "/" + name,
+                compress(readDayFile(directory, name)))]
+
+    # Measure live and dead parts of archive
+    replaced = set([key for key, data in members])
+    live = sum([index[key][1] for key in index if key not in replaced])
+    size = os.path.getsize(archive) if os.path.isfile(archive) else 0
+
+    # Compact archive if mostly dead
+    compact = size - live > live
+
+    if compact:
+
+        # Alternate between archive names
+        old = archive
+        name = archives.ARCHIVES[1 -
+            archives.ARCHIVES.index(os.path.basename(old))]
+        archive = month + name
+
+        # Read live members
+        kept = []
+
+        with open(old, "rb") as f:
+            for key in sorted(index, key = lambda k: index[k][0]):
+                if key not in replaced:
+                    f.seek(index[key][0])
+                    kept += [(key, f.read(index[key][1]))]
+
+        members = kept + members
+        index = {}
+
+    # Add members to archive
+    with open(archive, "wb" if compact else "ab") as f:
+
+        # Get current end of archive
+        f.seek(0, os.SEEK_END)
+        offset = f.tell()
+
+        for key, data in members:
+            f.write(data)
+
+            # Index member
+            index[key] = [offset, len(data)]
+            offset += len(data)
+
+        # Make sure data reached the disk before index points to it
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Write index
+    tmp = reporter.writeTemporaryFile(month, json.dumps({
+        "Archive": os.path.basename(archive), "Members": index}, indent = 4,
+        separators = (",", ": "), sort_keys = True))
+    os.rename(tmp, month + archives.ARCHIVE_INDEX)
+
+    # Remove previous archive
+    if compact:
+        os.remove(old)
+
+    # Remove archived days
+    for day in days:
+        shutil.rmtree(month + day)
+
+
+
+def archive(src = None, today = None, minAge = MIN_AGE):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ARCHIVE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Archive all days of given source directory which are older than given
+        age (days). Return number of archived days.
+    """
+
+    # Default source directory
+    if src is None:
+        src = path.REPORTS
+
+    # Default date
+    if today is None:
+        today = datetime.date.today()
+
+    # Get first day to keep
+    limit = today - datetime.timedelta(days = minAge)
+
+    # No source directory
+    if not os.path.isdir(src.path):
+        return 0
+
+    # Make sure pending changes are on disk
+    reporter.flush()
+
+    # Initialize number of archived days
+    n = 0
+
+    # Loop on months
+    for year in path.listNumericDirectories(src.path):
+        for month in path.listNumericDirectories(src.path + year):
+            m = src.path + year + os.sep + month + os.sep
+
+            # Get days to archive
+            days = [d for d in path.listNumericDirectories(m)
+                if datetime.date(int(year), int(month), int(d)) < limit]
+
+            # Archive them
+            if days:
+                archiveMonth(m, days)
+                n += len(days)
+
+    return n
+
+
+
+def main():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        MAIN
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    """
+
+    # Archive old days
+    archive()
+
+
+
+# Run this when script is called from terminal
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    archives
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Overview: Read access to the compressed per-month archives of old days of
+              dated reports (see archiver.py, which creates them).
+
+    Notes:    - Each month directory (YYYY/MM/) can hold an archive made of
+                concatenated gzip members (one per file, so it can still be
+                read using standard tools), and an index giving the name of
+                said archive, as well as the location of its members.
+              - This module does not depend on other modules of the project,
+                so that both the reporter and path modules can read archives
+                without importing each other.
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import os
+import json
+import zlib
+
+
+
+# CONSTANTS
+# Names of archive files within month directories, which are alternated
+# between when compacting archives
+ARCHIVES = ["archive.gz", "archive.1.gz"]
+
+# Name of archive index within month directories
+ARCHIVE_INDEX = "archive.json"
+
+# Window bits for gzip members
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+
+# FUNCTIONS
+def loadIndex(month):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        LOADINDEX
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Load index of archive within given month directory, as a dict giving
+        the name of the archive ("Archive") and mapping its members ("DD/name")
+        to their [offset, length] ("Members"). Indexes are only read again when
+        they changed. Return None if there is no archive.
+    """
+
+    # Get index path and state
+    p = month + ARCHIVE_INDEX
+
+    try:
+        s = os.stat(p)
+
+    # No archive
+    except OSError:
+        INDEXES.pop(month, None)
+        return None
+
+    stat = (s.st_ino, s.st_size, s.st_mtime)
+
+    # Read index if needed
+    if month not in INDEXES or INDEXES[month][0] != stat:
+        with open(p, "r") as f:
+            INDEXES[month] = (stat, json.load(f))
+
+    return INDEXES[month][1]
+
+
+
+def getIndex(month):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETINDEX
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get members of archive within given month directory, mapping archived
+        files ("DD/name") to the [offset, length] of their member.
+    """
+
+    index = loadIndex(month)
+
+    return {} if index is None else index["Members"]
+
+
+
+def getArchivePath(month):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETARCHIVEPATH
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get path of archive within given month directory.
+    """
+
+    index = loadIndex(month)
+
+    return month + (ARCHIVES[0] if index is None else index["Archive"])
+
+
+
+def getKey(directory, name):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETKEY
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Split path of file (day directory and name) into its month directory
+        and its key within month's archive.
+    """
+
+    # Get month and day
+    month, day = os.path.split(os.path.normpath(directory))
+
+    return (month + os.sep, day + "/" + name)
+
+
+
+def isArchived(directory, name):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ISARCHIVED
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Check whether file with given name and day directory was archived.
+    """
+
+    month, key = getKey(directory, name)
+
+    return key in getIndex(month)
+
+
+
+def read(directory, name):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        READ
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Read content of archived file with given name and day directory, or
+        None if it was not archived.
+    """
+
+    # Get member location
+    month, key = getKey(directory, name)
+    member = getIndex(month).get(key)
+
+    # Not archived
+    if member is None:
+        return None
+
+    # Read member
+    with open(getArchivePath(month), "rb") as f:
+        f.seek(member[0])
+        data = f.read(member[1])
+
+    # Decompress it
+    return zlib.decompress(data, GZIP_WBITS)
+
+
+
+def listArchivedDays(month, name = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        LISTARCHIVEDDAYS
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        List sorted days (DD) archived within given month directory, which
+        contain a file with given name (if any).
+    """
+
+    return sorted(set([str(key.split("/")[0]) for key in getIndex(month)
+        if name is None or key.split("/")[1] == name]))
+
+
+
+# Initialize indexes
+INDEXES = {}
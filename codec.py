@@ -0,0 +1,297 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    codec
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Overview: Codec for the formatted times used as keys within reports (e.g.
+              "1970.01.01 - 00:00:00"), as well as daily times (e.g. "00:00").
+
+    Notes:    - Formatted times have fixed offsets, so they are parsed by hand
+                instead of using strptime, which is much slower. Parsed keys are
+                memoized, since the same ones are decoded over and over.
+              - Lists of keys can also be converted at once into epoch
+                (seconds) arrays, without creating any datetime object.
+              - Times are naive: epochs are computed as if they were UTC.
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import calendar
+import datetime
+import numpy as np
+
+
+
+# CONSTANTS
+# Formats
+TIME_FORMAT = "%Y.%m.%d - %H:%M:%S"
+DAILY_TIME_FORMAT = "%H:%M"
+
+# Lengths of formatted times
+TIME_LENGTH = 21
+DAILY_TIME_LENGTH = 5
+
+# Max number of memoized keys
+MAX_CACHE_SIZE = 10000
+
+
+
+# FUNCTIONS
+def encode(T):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ENCODE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Format datetime object into a report key.
+    """
+
+    return "%04d.%02d.%02d - %02d:%02d:%02d" % (T.year, T.month, T.day,
+        T.hour, T.minute, T.second)
+
+
+
+def encodeAll(times):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ENCODEALL
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Format list of datetime objects into report keys.
+    """
+
+    return [encode(T) for T in times]
+
+
+
+def decode(key):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        DECODE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Parse formatted time into a datetime object (or daily time into a time
+        object). Raise a ValueError if it cannot be parsed.
+    """
+
+    # Try memoized keys first
+    try:
+        return CACHE[key]
+
+    except KeyError:
+        pass
+
+    # Parse key using fixed offsets
+    T = parse(key)
+
+    # Fall back to strptime for unusual (e.g. unpadded) keys
+    if T is None:
+        T = parseSlowly(key)
+
+    # Memoize key (forget about all of them when there are too many)
+    if len(CACHE) >= MAX_CACHE_SIZE:
+        CACHE.clear()
+
+    CACHE[key] = T
+
+    return T
+
+
+
+def decodeAll(keys):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        DECODEALL
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Parse list of formatted times into datetime (or time) objects.
+    """
+
+    return [decode(key) for key in keys]
+
+
+
+def parse(key):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        PARSE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Parse formatted time with fixed offsets. Return None if it does not
+        have the expected layout.
+    """
+
+    # Formatted time: "YYYY.MM.DD - hh:mm:ss"
+    if (len(key) == TIME_LENGTH and key[4] == "." and key[7] == "." and
+        key[10:13] == " - " and key[15] == ":" and key[18] == ":" and
+        (key[0:4] + key[5:7] + key[8:10] + key[13:15] + key[16:18] +
+         key[19:21]).isdigit()):
+        return datetime.datetime(int(key[0:4]), int(key[5:7]),
+            int(key[8:10]), int(key[13:15]), int(key[16:18]), int(key[19:21]))
+
+    # Daily time: "hh:mm"
+    if (len(key) == DAILY_TIME_LENGTH and key[2] == ":" and
+        (key[0:2] + key[3:5]).isdigit()):
+        return datetime.time(int(key[0:2]), int(key[3:5]))
+
+    return None
+
+
+
+def parseSlowly(key):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        PARSESLOWLY
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Parse formatted time using strptime.
+    """
+
+    # Try formatted time
+    try:
+        return datetime.datetime.strptime(key, TIME_FORMAT)
+
+    except ValueError:
+        pass
+
+    # Try daily time
+    return datetime.datetime.strptime(key, DAILY_TIME_FORMAT).time()
+
+
+
+def toEpochs(times):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        TOEPOCHS
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Convert list of formatted times (or datetime objects) into an array of
+        epochs (s). Formatted times are converted at once, using their digits.
+    """
+
+    # No times
+    if len(times) == 0:
+        return np.empty(0, np.int64)
+
+    # Datetime objects
+    if isinstance(times[0], datetime.datetime):
+        return countSeconds(times)
+
+    # Get formatted times as byte strings
+    keys = np.asarray(times)
+
+    if keys.dtype.kind == "U":
+        keys = keys.astype("S")
+
+    # Only fixed-width formatted times can be converted at once
+    if (keys.dtype.itemsize != TIME_LENGTH or
+        np.char.str_len(keys).min() != TIME_LENGTH):
+        return countSeconds(decodeAll(times))
+
+    # Get characters
+    c = keys.view(np.uint8).reshape(-1, TIME_LENGTH).astype(np.int64) - ord("0")
+
+    # Check layout
+    separators = [4, 7, 10, 11, 12, 15, 18]
+    digits = np.delete(c, separators, axis = 1)
+
+    if ((digits < 0) | (digits > 9)).any():
+        return countSeconds(decodeAll(times))
+
+    if not (c[:, separators] == np.array([ord(x) for x in ".. - ::"]) -
+        ord("0")).all():
+        return countSeconds(decodeAll(times))
+
+    # Get components
+    Y = c[:, 0] * 1000 + c[:, 1] * 100 + c[:, 2] * 10 + c[:, 3]
+    M = c[:, 5] * 10 + c[:, 6]
+    D = c[:, 8] * 10 + c[:, 9]
+    h = c[:, 13] * 10 + c[:, 14]
+    m = c[:, 16] * 10 + c[:, 17]
+    s = c[:, 19] * 10 + c[:, 20]
+
+    # Check components (invalid times are left to decode, which raises)
+    lengths = countDays(Y + (M == 12), M % 12 + 1, 1) - countDays(Y, M, 1)
+
+    if ((M < 1) | (M > 12) | (D < 1) | (D > lengths) | (h > 23) | (m > 59) |
+        (s > 59)).any():
+        return countSeconds(decodeAll(times))
+
+    return countDays(Y, M, D) * 86400 + h * 3600 + m * 60 + s
+
+
+
+def countSeconds(times):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        COUNTSECONDS
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Convert datetime objects one by one into an array of epochs (s).
+    """
+
+    # Test times
+    if not all([isinstance(T, datetime.datetime) for T in times]):
+        raise TypeError("Only datetime objects have epochs.")
+
+    return np.array([calendar.timegm(T.timetuple()) for T in times], np.int64)
+
+
+
+def toDatetime64(times):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        TODATETIME64
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Convert list of formatted times (or datetime objects) into an array of
+        numpy datetimes (s).
+    """
+
+    return toEpochs(times).astype("datetime64[s]")
+
+
+
+def countDays(Y, M, D):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        COUNTDAYS
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Count days since epoch for given (arrays of) years, months and days, in
+        the proleptic Gregorian calendar. Years are shifted so they start in
+        March, which puts leap days at their end.
+    """
+
+    # Shift years and months
+    Y = Y - (M <= 2)
+    M = (M + 9) % 12
+
+    # Get 400-year eras, and year within them
+    era = Y // 400
+    y = Y - era * 400
+
+    # Get day of year, then day of era
+    d = (153 * M + 2) // 5 + D - 1
+    d = y * 365 + y // 4 - y // 100 + d
+
+    # Shift to epoch (1970.01.01)
+    return era * 146097 + d - 719468
+
+
+
+# Initialize memoized keys
+CACHE = {}
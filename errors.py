@@ -18,12 +18,16 @@
     Overview: This is a script that contains all possible errors that can happen
               when running MeinKPS scripts.
 
-    Notes:    ...
+    Notes:    - Loggable errors are counted in memory, and only added to their
+                dated report when the loop ends, or when the process exits.
+                Counting never touches reports, since errors can be raised
+                while reports are being stored.
 
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 """
 
 # LIBRARIES
+import atexit
 import datetime
 import numpy as np
 import matplotlib.pyplot as plt
@@ -33,6 +37,7 @@ import matplotlib.pyplot as plt
 # USER LIBRARIES
 import fmt
 import lib
+import path
 import logger
 import reporter
 
@@ -131,13 +136,6 @@ class LoggableError(BaseError):
                   missing branches) lead to stack overflows.
         """
 
-        # Get current day
-        today = datetime.date.today()
-
-        # Define and load report
-        self.report = reporter.getReportByType(reporter.ErrorsReport, today,
-            strict = False)
-
         # Initialize error
         super(LoggableError, self).__init__(*args)
 
@@ -173,9 +171,92 @@ class LoggableError(BaseError):
         # Log error
         super(LoggableError, self).log()
 
-        # Update error stats
-        self.report.increment(repr(self).split(" | "), False)
-        self.report.store()
+        # Count error (stats are updated later on)
+        COUNTER.add(repr(self).split(" | "))
+
+
+
+class ErrorCounter(object):
+
+    def __init__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Counts of loggable errors, by day and class path, which were not yet
+            added to their errors report.
+        """
+
+        # Initialize counts
+        self.counts = {}
+
+
+
+    def add(self, branch, now = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ADD
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Count error with given class path. Counts are only stored when
+            flushed (see Loop.flush and atexit), never from here: errors are
+            counted while being instanciated, possibly within a store.
+        """
+
+        # Default time
+        if now is None:
+            now = datetime.datetime.now()
+
+        # Count error
+        key = (now.date(), tuple(branch))
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+
+
+    def flush(self, directory = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            FLUSH
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Add error counts to their errors report (one transaction per day).
+            Return number of flushed errors.
+        """
+
+        # Default source directory
+        if directory is None:
+            directory = path.REPORTS
+
+        # Take counts, so that errors raised while flushing are kept for later
+        counts, self.counts = self.counts, {}
+
+        # Group counts by day
+        days = {}
+
+        for (date, branch), n in counts.items():
+            days.setdefault(date, []).append((list(branch), n))
+
+        # Update reports
+        try:
+            for date in sorted(days):
+                report = reporter.getReportByType(reporter.ErrorsReport, date,
+                    directory, False)
+
+                with reporter.transaction(report):
+                    for branch, n in days.pop(date):
+                        report.increment(branch, False, n)
+
+        # Keep counts which could not be stored
+        except:
+            for date, branches in days.items():
+                for branch, n in branches:
+                    key = (date, tuple(branch))
+                    self.counts[key] = self.counts.get(key, 0) + n
+
+            raise
+
+        return sum(counts.values())
 
 
 
@@ -649,6 +730,22 @@ class NoOverwriting(ReporterError):
 
 
 
+class LockUpgrade(ReporterError):
+
+    def define(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            DEFINE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Define error info
+        self.info = ("Cannot lock exclusively (shared lock already held): " +
+            self.args[0])
+
+
+
 class InvalidSFTPReport(ReporterError):
 
     def define(self):
@@ -686,6 +783,19 @@ class MismatchedLimits(ProfileError):
 
 
 # FUNCTIONS
+def flush():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        FLUSH
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Add pending error counts to their errors report.
+    """
+
+    return COUNTER.flush()
+
+
+
 def flattenErrors(errors, result = {}):
 
     """
@@ -790,6 +900,12 @@ def plotMonthlyErrors(errors, nMonths):
 
 
 
+# Initialize error counter, and make sure its counts are stored on exit
+COUNTER = ErrorCounter()
+atexit.register(flush)
+
+
+
 def main():
 
     """
@@ -29,8 +29,10 @@ import datetime
 
 # USER LIBRARIES
 import lib
+import codec
 import logger
 import reporter
+import series
 import idc
 from Profiles import net, bg, targets, isf, csf, iob, cob
 
@@ -107,35 +109,39 @@ class Exporter(object):
 
         # Format and store its data
         self.data["net"] = dict(zip(
-            [lib.formatTime(T) for T in _net.T],
+            codec.encodeAll(_net.T),
             [round(y, 2) for y in _net.y]))
 
         # Get pump data
         self.data["pump"] = reporter.getPumpReport().get()
 
         # Get recent BGs
-        self.data["bgs"] = reporter.getDatedEntries(
+        t, y = series.query(
             reporter.BGReport,
-            [yesterday, today],
-            [])
+            datetime.datetime.combine(yesterday, datetime.time()),
+            datetime.datetime.combine(today, datetime.time.max))
+
+        self.data["bgs"] = dict(zip(
+            codec.encodeAll(series.decode(t)),
+            series.decodeValues(y)))
 
         # Get recent boluses
         self.data["boluses"] = reporter.getDatedEntries(
             reporter.TreatmentsReport,
             [yesterday, today],
-            ["Boluses"])
+            ["Boluses"]).materialize()
 
         # Get recent IOBs
         self.data["iobs"] = reporter.getDatedEntries(
             reporter.TreatmentsReport,
             [yesterday, today],
-            ["IOB"])
+            ["IOB"]).materialize()
 
         # Get recent history
         self.data["history"] = reporter.getDatedEntries(
             reporter.HistoryReport,
             [yesterday, today],
-            [])
+            []).materialize()
 
         # Get recent sensor statuses (last session)
         # With n = 1, only today's history report would be considered, thus + 1
@@ -143,19 +149,19 @@ class Exporter(object):
             reporter.HistoryReport,
             self.now,
             ["CGM", "Sensor Statuses"],
-            MAX_SENSOR_AGE + 1)
+            MAX_SENSOR_AGE + 1).materialize()
 
         # Get recent calibrations
         self.data["calibrations"] = reporter.getDatedEntries(
             reporter.HistoryReport,
             [yesterday, today],
-            ["CGM", "Calibrations"])
+            ["CGM", "Calibrations"]).materialize()
 
         # Get recent errors
         self.data["errors"] = reporter.getDatedEntries(
             reporter.ErrorsReport,
             [today],
-            [])
+            []).materialize()
 
 
 
@@ -34,6 +34,16 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import sys
 
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+
+
+# USER LIBRARIES
+import codec
+
 
 
 # CONSTANTS
@@ -107,6 +117,157 @@ CRC16_TABLE = [0,     4129,  8258,  12387, 16516, 20645, 24774, 28903,
 
 
 
+# CLASSES
+class MergedView(Mapping):
+
+    """
+    Read-only view merging dicts together, without copying them. Same rules
+    as for merging dicts apply (no overwriting of entries), but conflicts are
+    only detected when colliding keys are accessed. Nested dicts sharing a
+    key are merged into views as well.
+    """
+
+    def __init__(self, *dicts):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Check if dicts given as input
+        if not all([isinstance(d, (dict, MergedView)) for d in dicts]):
+            raise TypeError("Only dicts can be merged.")
+
+        # Store them
+        self.dicts = list(dicts)
+
+
+
+    def __getitem__(self, key):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETITEM
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Get values for key
+        values = [d[key] for d in self.dicts if key in d]
+
+        # No value
+        if not values:
+            raise KeyError(key)
+
+        # Single value: no merging needed
+        if len(values) == 1:
+            return values[0]
+
+        # Dicts: merge them
+        if all([isinstance(v, (dict, MergedView)) for v in values]):
+            return MergedView(*values)
+
+        # Type mismatch
+        if not all([type(v) is type(values[0]) for v in values]):
+            raise TypeError("Cannot merge dicts: conflicting types.")
+
+        # Entry mismatch
+        if not all([v == values[0] for v in values]):
+            raise ValueError("Cannot merge dicts: conflicting values.")
+
+        return values[0]
+
+
+
+    def __contains__(self, key):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            CONTAINS
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        return any([key in d for d in self.dicts])
+
+
+
+    def __iter__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ITER
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Iterate over keys of merged dicts, only once each.
+        """
+
+        # Initialize keys already seen
+        seen = set()
+
+        for d in self.dicts:
+            for key in d:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+
+
+    def __len__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            LEN
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Only one dict: no need to look for duplicate keys
+        if len(self.dicts) == 1:
+            return len(self.dicts[0])
+
+        return len(set().union(*self.dicts))
+
+
+
+    def __repr__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            REPR
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        return "MergedView(" + repr(self.dicts) + ")"
+
+
+
+    def materialize(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            MATERIALIZE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Build an actual (independent) dict out of view, checking all
+            keys for conflicts along the way.
+        """
+
+        # Initialize dict
+        d = {}
+
+        # Fill it
+        for key in self:
+            value = self[key]
+
+            # Nested view
+            if isinstance(value, MergedView):
+                d[key] = value.materialize()
+
+            # Otherwise: do not share anything with merged dicts
+            else:
+                d[key] = copy.deepcopy(value)
+
+        return d
+
+
+
 # FUNCTIONS
 def isEqual(x, y, precision):
 
@@ -296,35 +457,20 @@ def formatTime(t):
     ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         FORMATTIME
     ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Format datetime object, or parse formatted time (see codec). Anything
+        else is returned as is.
     """
 
-    # Define time formats
-    f = "%Y.%m.%d - %H:%M:%S"
-    F = "%H:%M"
-
     # If datetime object
     if type(t) is datetime.datetime:
-        t = datetime.datetime.strftime(t, f)
-
-    # Otherwise
-    else:
-
-        # Try first format
-        try:
-            t = datetime.datetime.strptime(t, f)
-
-        except:
-            pass
-
-        # Try second format
-        try:
-            t = datetime.datetime.strptime(t, F).time()
+        return codec.encode(t)
 
-        except:
-            pass
+    # Otherwise: try parsing it
+    try:
+        return codec.decode(t)
 
-    # Return formatted time
-    return t
+    except (TypeError, ValueError):
+        return t
 
 
 
@@ -17,13 +17,45 @@
 
     Overview: This is a script that generates a logging instance.
 
-    Notes:    ...
+    Notes:    - Messages can take printf-style arguments, which are only
+                formatted if their level is enabled.
+              - Levels can be configured per module (and per package) within
+                the logger config report (see CONFIG), e.g.:
+
+                {"Default": "INFO", "Levels": {"Pump": "DEBUG"}}
+
+              - By default, messages are written right away. Long-running
+                processes (e.g. the loop) can instead start a background writer
+                (see start()), which keeps log files open and writes queued
+                messages in batches, so that logging does not block I/O.
+              - Logs are rotated once they reach a given size (see
+                MAX_LOG_SIZE): they are compressed into numbered parts (e.g.
+                loop.log.1.gz). Logs of past days are compressed as well, and
+                removed after a while (see LOG_RETENTION). Compressed logs can
+                be searched without decompressing them to disk, e.g.:
+
+                python logger.py grep "RadioTimeout" 2026.10.01 2026.10.16
 
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 """
 
 # LIBRARIES
+import os
+import re
+import sys
+import gzip
+import json
+import shutil
+import atexit
 import datetime
+import threading
+import Queue
+
+# File locking is only available on Unix
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
 
@@ -37,6 +69,33 @@ import path
 LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
 DEFAULT_LEVEL = "INFO"
 
+# Level indices
+RANKS = dict([(level, i) for i, level in enumerate(LEVELS)])
+
+# Name of config report (within reports directory)
+CONFIG = "logger.json"
+
+# Max number of queued messages written at once by background writer
+BATCH_SIZE = 100
+
+# Max time (s) to wait for background writer to write remaining messages
+STOP_TIMEOUT = 5
+
+# Time (s) between checks of background writer while flushing
+FLUSH_INTERVAL = 0.5
+
+# Max size of a log file before it gets rotated (B)
+MAX_LOG_SIZE = 5 * 1024 * 1024
+
+# Number of days logs are kept for
+LOG_RETENTION = 30
+
+# Name of file remembering last maintenance of logs (within reports directory)
+MAINTENANCE = ".logs"
+
+# Log files (current ones, and their compressed parts)
+LOG_FILE = re.compile(r"^.+\.log(\.\d+\.gz)?$")
+
 
 
 # CLASSES
@@ -53,8 +112,9 @@ class Logger(object):
         # Store logger name
         self.name = name
 
-        # Get level index
-        self.level = LEVELS.index(level)
+        # Get level index (configured one first)
+        self.default = level
+        self.level = RANKS[getConfiguredLevel(name, level)]
 
         # Define logging format
         self.fmt = "[{:%H:%M:%S.%f}] [{:>16}] [{:>8}] --- {}"
@@ -62,32 +122,56 @@ class Logger(object):
         # Define report
         self.report = report
 
+        # Register logger, so it can be configured again
+        LOGGERS.append(self)
+
 
 
-    def log(self, level, msg, show = True):
+    def isEnabledFor(self, level):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ISENABLEDFOR
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Check whether messages of given level are logged, so that costly
+            ones do not need to be built otherwise.
+        """
+
+        return RANKS[level] >= self.level
+
+
+
+    def log(self, level, msg, show = True, args = ()):
 
         """
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
             LOG
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Log message, formatted using given printf-style arguments (if any).
         """
 
         # Does level allow logging?
-        if LEVELS.index(level) >= self.level:
+        if RANKS[level] >= self.level:
 
             # Get current time
             now = datetime.datetime.now()
 
+            # Apply arguments
+            if args:
+                msg = str(msg) % args
+
             # Format message
             msg = self.fmt.format(now, self.name, level, msg)
 
-            # Define log directory and touch it
-            directory = path.Path(path.REPORTS.path + lib.formatDate(now))
-            directory.touch()
+            # Queue message for background writer (if any and still running)
+            writer = WRITER
 
-            # Log message
-            with open(directory.path + self.report, "a") as f:
-                f.write(msg + "\n")
+            if writer is not None and writer.is_alive():
+                writer.put(now, self.report, msg)
+
+            # Otherwise: write it now
+            else:
+                write(now, self.report, msg)
 
             # Print to terminal
             if show:
@@ -95,7 +179,7 @@ class Logger(object):
 
 
 
-    def debug(self, msg):
+    def debug(self, msg, *args):
 
         """
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -104,11 +188,11 @@ class Logger(object):
         """
 
         # Log message
-        self.log("DEBUG", msg)
+        self.log("DEBUG", msg, args = args)
 
 
 
-    def info(self, msg):
+    def info(self, msg, *args):
 
         """
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -117,11 +201,11 @@ class Logger(object):
         """
 
         # Log message
-        self.log("INFO", msg)
+        self.log("INFO", msg, args = args)
 
 
 
-    def warning(self, msg):
+    def warning(self, msg, *args):
 
         """
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -130,11 +214,11 @@ class Logger(object):
         """
 
         # Log message
-        self.log("WARNING", msg)
+        self.log("WARNING", msg, args = args)
 
 
 
-    def error(self, msg):
+    def error(self, msg, *args):
 
         """
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -143,11 +227,11 @@ class Logger(object):
         """
 
         # Log message
-        self.log("ERROR", msg)
+        self.log("ERROR", msg, args = args)
 
 
 
-    def critical(self, msg):
+    def critical(self, msg, *args):
 
         """
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -156,7 +240,677 @@ class Logger(object):
         """
 
         # Log message
-        self.log("CRITICAL", msg)
+        self.log("CRITICAL", msg, args = args)
+
+
+
+class Writer(threading.Thread):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        WRITER
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Background thread writing queued log messages. Log files are kept open
+        (one per log name) until the date of messages changes, and are flushed
+        after each batch of messages, or reopened if another process rotated
+        them meanwhile. Messages which cannot be written are
+        reported on stderr and skipped. If the thread dies anyway, messages are
+        written right away again.
+    """
+
+    def __init__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Initialize thread (do not keep process alive)
+        super(Writer, self).__init__(name = "logger")
+        self.daemon = True
+
+        # Initialize queue of messages
+        self.queue = Queue.Queue()
+
+        # Initialize open files (by log name) and their date
+        self.files = {}
+
+
+
+    def put(self, now, report, msg):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            PUT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Queue message for given log.
+        """
+
+        self.queue.put((now, report, msg))
+
+
+
+    def run(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            RUN
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Write queued messages until a stop request (None) is received. Old
+            logs are taken care of first.
+        """
+
+        # Compress and remove old logs (never at the expense of new ones)
+        try:
+            maintain()
+
+        except Exception as e:
+            warn("Could not maintain logs: " + str(e))
+
+        try:
+            while True:
+
+                # Wait for a message, then get as many others as possible
+                batch = [self.queue.get()]
+
+                while batch[-1] is not None and len(batch) < BATCH_SIZE:
+                    try:
+                        batch += [self.queue.get_nowait()]
+
+                    except Queue.Empty:
+                        break
+
+                # Write messages (a message which cannot be written should
+                # not take the writer down with it)
+                try:
+                    for item in batch:
+                        if item is not None:
+                            try:
+                                self.write(*item)
+
+                            except Exception as e:
+                                warn("Could not write message: " + str(e))
+
+                    # Flush files
+                    for report, (_, f, _) in self.files.items():
+                        try:
+                            f.flush()
+
+                        except Exception as e:
+                            warn("Could not flush " + report + ": " + str(e))
+
+                # Messages were handled (even if they could not be written)
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
+
+                # Stop request
+                if batch[-1] is None:
+                    break
+
+        # Close files
+        finally:
+            self.close()
+
+
+
+    def write(self, now, report, msg):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            WRITE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Write message to log file of its date, which is opened if needed.
+        """
+
+        # Get date of message
+        date = now.date()
+
+        # Get open file
+        (d, f, p) = self.files.get(report, (None, None, None))
+
+        # Date changed, or file was rotated by another process: (re)open it
+        if d != date or isReplaced(f, p):
+            if f is not None:
+                f.close()
+
+            p = getDirectory(now).path + report
+            f = open(p, "a")
+            self.files[report] = (date, f, p)
+
+        # Write message
+        f.write(msg + "\n")
+
+        # Log is full: rotate it (new file is opened on next message)
+        if f.tell() >= MAX_LOG_SIZE:
+            f.close()
+            del self.files[report]
+            rotate(p, MAX_LOG_SIZE)
+
+
+
+    def drain(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            DRAIN
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Write messages left in queue right away, once the thread is no
+            longer running.
+        """
+
+        while True:
+            try:
+                item = self.queue.get_nowait()
+
+            except Queue.Empty:
+                break
+
+            try:
+                if item is not None:
+                    write(*item)
+
+            except Exception as e:
+                warn("Could not write message: " + str(e))
+
+            finally:
+                self.queue.task_done()
+
+
+
+    def close(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            CLOSE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        for _, f, _ in self.files.values():
+            f.close()
+
+        self.files = {}
+
+
+
+# FUNCTIONS
+def warn(msg):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        WARN
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Report problem of logger itself on stderr (it cannot be logged).
+    """
+
+    sys.stderr.write("[logger] " + msg + "\n")
+
+
+
+def loadConfig():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        LOADCONFIG
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Load logger config report (only once). Missing or broken config is
+        ignored.
+    """
+
+    global CONFIGURATION
+
+    # Not loaded yet
+    if CONFIGURATION is None:
+        CONFIGURATION = {}
+
+        p = path.REPORTS.path + CONFIG
+
+        if os.path.isfile(p):
+            try:
+                with open(p, "r") as f:
+                    CONFIGURATION = json.load(f)
+
+            # Loggers cannot log about their own config
+            except ValueError:
+                warn("Ignoring invalid config: " + p)
+
+    return CONFIGURATION
+
+
+
+def getConfiguredLevel(name, default = DEFAULT_LEVEL):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETCONFIGUREDLEVEL
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get configured level of logger with given name (e.g. "Pump.packets"):
+        the level of its module, or else of its closest package, or else the
+        default one.
+    """
+
+    # Get config
+    config = loadConfig()
+    levels = config.get("Levels", {})
+
+    # Look for module, then its packages
+    parts = name.split(".")
+
+    for i in reversed(range(len(parts))):
+        level = levels.get(".".join(parts[:i + 1]))
+
+        if level in RANKS:
+            return str(level)
+
+    # Default level
+    level = config.get("Default")
+
+    return str(level) if level in RANKS else default
+
+
+
+def configure(config = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        CONFIGURE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Apply given config (or reload config report) to all loggers.
+    """
+
+    global CONFIGURATION
+
+    # Set config (None: load it again)
+    CONFIGURATION = config
+
+    # Update loggers
+    for logger in LOGGERS:
+        logger.level = RANKS[getConfiguredLevel(logger.name, logger.default)]
+
+
+
+def getDirectory(now):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETDIRECTORY
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get (and touch) log directory of given time.
+    """
+
+    # Define log directory and touch it
+    directory = path.Path(path.REPORTS.path + lib.formatDate(now))
+    directory.touch()
+
+    return directory
+
+
+
+def write(now, report, msg):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        WRITE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Write message to given log right away, and rotate it if it is full.
+    """
+
+    # Get log file
+    p = getDirectory(now).path + report
+
+    # Write message
+    with open(p, "a") as f:
+        f.write(msg + "\n")
+        size = f.tell()
+
+    # Rotate log if needed
+    if size >= MAX_LOG_SIZE:
+        rotate(p, MAX_LOG_SIZE)
+
+
+
+def getParts(directory, name):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETPARTS
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        List files making up given log within given directory, in chronological
+        order: compressed parts (by number), then current file (if any).
+    """
+
+    # Get compressed parts
+    pattern = re.compile("^" + re.escape(name) + r"\.(\d+)\.gz$")
+    parts = []
+
+    for filename in os.listdir(directory):
+        match = pattern.match(filename)
+
+        if match:
+            parts.append((int(match.group(1)), directory + filename))
+
+    # Sort them
+    parts = [p for (_, p) in sorted(parts)]
+
+    # Add current file
+    if os.path.isfile(directory + name):
+        parts.append(directory + name)
+
+    return parts
+
+
+
+def isReplaced(f, p):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ISREPLACED
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Check whether given open file is no longer the one at given path (e.g.
+        because another process rotated it).
+    """
+
+    # No file
+    if f is None:
+        return False
+
+    try:
+        return os.fstat(f.fileno()).st_ino != os.stat(p).st_ino
+
+    # File is gone
+    except OSError:
+        return True
+
+
+
+def rotate(filename, minSize = 0):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ROTATE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Compress log file into its next numbered part, then remove it. The
+        file is streamed, so it never has to fit in memory. Processes rotate
+        logs of a directory one at a time (the directory itself is locked), and
+        skip files which are gone or smaller than given size by then (i.e.
+        which another process rotated first). Return whether file was rotated.
+    """
+
+    # Get log directory and name
+    directory, name = os.path.split(filename)
+    directory += os.sep
+
+    # Keep other processes from rotating logs meanwhile
+    fd = os.open(directory, os.O_RDONLY)
+
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+
+        # Already rotated
+        if not os.path.isfile(filename) or (
+            os.path.getsize(filename) < minSize):
+            return False
+
+        # Get next part number
+        numbers = [int(p[len(directory + name) + 1:-len(".gz")])
+            for p in getParts(directory, name) if p.endswith(".gz")]
+        part = directory + name + "." + str(max(numbers + [0]) + 1) + ".gz"
+
+        # Take log out of the way, so that new messages go to a new file
+        tmp = directory + "." + name + "." + str(os.getpid()) + ".rotating"
+        os.rename(filename, tmp)
+
+        # Compress it (into a temporary file, so that parts are always
+        # complete)
+        with open(tmp, "rb") as src:
+            with gzip.open(part + ".tmp", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+
+        os.rename(part + ".tmp", part)
+        os.remove(tmp)
+
+        return True
+
+    # Unlock directory
+    finally:
+        os.close(fd)
+
+
+
+def listLogDays(src = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        LISTLOGDAYS
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        List (date, directory) of all days within given source directory, in
+        chronological order.
+    """
+
+    # Default source directory
+    if src is None:
+        src = path.REPORTS
+
+    # Initialize days
+    days = []
+
+    # No source directory
+    if not os.path.isdir(src.path):
+        return days
+
+    # Walk through years, months and days
+    for y in path.listNumericDirectories(src.path):
+        for m in path.listNumericDirectories(src.path + y):
+            for d in path.listNumericDirectories(src.path + y + os.sep + m):
+                try:
+                    date = datetime.date(int(y), int(m), int(d))
+
+                except ValueError:
+                    continue
+
+                days.append((date, src.path + os.sep.join([y, m, d]) + os.sep))
+
+    return days
+
+
+
+def maintain(today = None, src = None, retention = LOG_RETENTION,
+    force = False):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        MAINTAIN
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Compress logs of past days, and remove those older than given retention
+        (days). This is only done once a day, unless forced. Return numbers of
+        compressed and removed logs.
+    """
+
+    # Default date and source directory
+    if today is None:
+        today = datetime.date.today()
+
+    if src is None:
+        src = path.REPORTS
+
+    # No logs
+    if not os.path.isdir(src.path):
+        return (0, 0)
+
+    # Already done today
+    stamp = src.path + MAINTENANCE
+
+    if not force and os.path.isfile(stamp):
+        with open(stamp, "r") as f:
+            if f.read().strip() == str(today):
+                return (0, 0)
+
+    # Get oldest day to keep
+    limit = today - datetime.timedelta(days = retention)
+
+    # Initialize counts
+    nCompressed = 0
+    nRemoved = 0
+
+    # Go through past days
+    for date, directory in listLogDays(src):
+        if date >= today:
+            continue
+
+        # Day too old: remove its logs (and their compressed parts)
+        if date < limit:
+            for f in os.listdir(directory):
+                if LOG_FILE.match(f):
+                    os.remove(directory + f)
+                    nRemoved += 1
+
+            # Remove day if nothing is left
+            if not os.listdir(directory):
+                os.rmdir(directory)
+
+        # Otherwise: compress its logs
+        else:
+            for f in os.listdir(directory):
+                if f.endswith(".log") and rotate(directory + f):
+                    nCompressed += 1
+
+    # Remember maintenance
+    with open(stamp, "w") as f:
+        f.write(str(today))
+
+    return (nCompressed, nRemoved)
+
+
+
+def read(filename):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        READ
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Stream lines of given log file (compressed or not).
+    """
+
+    # Open file according to its type
+    f = gzip.open(filename, "rb") if filename.endswith(".gz") else \
+        open(filename, "r")
+
+    with f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+
+def grep(pattern, start = None, end = None, name = "loop.log", src = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GREP
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Stream (date, line) of given log matching given regular expression,
+        between given dates (included), in chronological order. Compressed
+        parts are decompressed on the fly.
+    """
+
+    # Compile pattern
+    regex = re.compile(pattern)
+
+    # Go through days
+    for date, directory in listLogDays(src):
+
+        # Skip days out of range
+        if ((start is not None and date < start) or
+            (end is not None and date > end)):
+            continue
+
+        # Go through parts of log
+        for p in getParts(directory, name):
+            for line in read(p):
+                if regex.search(line):
+                    yield (date, line)
+
+
+
+def start():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        START
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Start background writer (if not already started). Remaining messages
+        are written when the process exits (even because of an error).
+    """
+
+    global WRITER
+
+    # Already started
+    if WRITER is not None:
+        return
+
+    # Start writer
+    WRITER = Writer()
+    WRITER.start()
+
+    # Stop it on exit
+    atexit.register(stop)
+
+
+
+def flush():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        FLUSH
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Wait until all queued messages are written. If the background writer
+        is no longer running, remaining messages are written right away.
+    """
+
+    # Get writer
+    writer = WRITER
+
+    if writer is None:
+        return
+
+    # Wait for queued messages, as long as writer is running
+    queue = writer.queue
+
+    with queue.all_tasks_done:
+        while queue.unfinished_tasks and writer.is_alive():
+            queue.all_tasks_done.wait(FLUSH_INTERVAL)
+
+    # Writer died: do its job
+    if not writer.is_alive():
+        writer.drain()
+
+
+
+def stop():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        STOP
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Stop background writer once it wrote all queued messages. Messages are
+        written right away again afterwards.
+    """
+
+    global WRITER
+
+    # Not started
+    if WRITER is None:
+        return
+
+    # Switch back to direct writes, then ask writer to stop
+    writer, WRITER = WRITER, None
+    writer.queue.put(None)
+    writer.join(STOP_TIMEOUT)
+
+    # Writer died before writing everything
+    if not writer.is_alive():
+        writer.drain()
 
 
 
@@ -166,13 +920,38 @@ def main():
     ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         MAIN
     ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Usage: python logger.py grep PATTERN [START] [END] [LOG]
+               (dates as YYYY.MM.DD)
     """
 
-    # Instanciate logger
-    logger = Logger(__name__)
+    # Get arguments
+    args = sys.argv[1:]
+
+    # Check them
+    if not 2 <= len(args) <= 5 or args[0] != "grep":
+        print "Usage: python logger.py grep PATTERN [START] [END] [LOG]"
+        sys.exit(1)
+
+    # Parse dates
+    dates = [datetime.datetime.strptime(x, "%Y.%m.%d").date()
+        for x in args[2:4]]
+
+    start = dates[0] if len(dates) > 0 else None
+    end = dates[1] if len(dates) > 1 else None
+
+    # Get log name
+    name = args[4] if len(args) > 4 else "loop.log"
+
+    # Search logs
+    for date, line in grep(args[1], start, end, name):
+        print date.strftime("%Y.%m.%d") + " " + line
+
+
 
-    # Write
-    logger.info("Test")
+# Initialize loggers, their config and background writer
+LOGGERS = []
+CONFIGURATION = None
+WRITER = None
 
 
 
@@ -36,6 +36,7 @@ import fmt
 import errors
 import logger
 import reporter
+import recorder
 import exporter
 import uploader
 import calculator
@@ -80,9 +81,6 @@ class Loop(object):
         # Initialize TB recommendation
         self.recommendation = None
 
-        # Define report
-        self.report = None
-
 
 
     def do(self, task, branch, *args):
@@ -92,15 +90,33 @@ class Loop(object):
             DO
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
             Execute a task and increment its corresponding branch in the loop
-            logs, in order to keep track of loop's performance.
+            logs, in order to keep track of loop's performance. The loop log
+            is only stored once the loop stops. Tasks are also traced.
         """
 
         # Do task
-        task(*args)
+        with recorder.trace("Loop", "/".join(branch)):
+            task(*args)
 
         # Update loop log
-        self.report.increment(branch)
-        self.report.store()
+        self.getReport().increment(branch)
+
+
+
+    def getReport(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETREPORT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get loop log of the day the loop started. It is looked up every
+            time it is updated, since it might have been evicted from the
+            reports registry meanwhile (e.g. while downloading many days of
+            history), in which case changes made to it would never be stored.
+        """
+
+        return reporter.getReportByType(reporter.LoopReport, self.t0.date(),
+            strict = False)
 
 
 
@@ -143,17 +159,13 @@ class Loop(object):
         # Define starting time
         self.t0 = datetime.datetime.now()
 
-        # Get current day
-        today = self.t0.date()
-
         # Get report
-        self.report = reporter.getReportByType(reporter.LoopReport, today,
-            strict = False)
+        report = self.getReport()
 
         # Update loop stats
-        self.report.set(lib.formatTime(self.t0), ["Loop", "Last Time"], True)
-        self.report.increment(["Loop", "Start"])
-        self.report.store()
+        report.set(lib.formatTime(self.t0), ["Loop", "Last Time"], True)
+        report.increment(["Loop", "Start"])
+        report.store()
 
 
 
@@ -171,16 +183,33 @@ class Loop(object):
         # Get loop duration
         duration = (self.t1 - self.t0).seconds
 
+        # Get report
+        report = self.getReport()
+
         # Update loop stats
-        self.report.set(duration, ["Loop", "Last Duration"], True)
-        self.report.increment(["Loop", "End"])
-        self.report.store()
+        report.set(duration, ["Loop", "Last Duration"], True)
+        report.increment(["Loop", "Duration"], False, duration)
+        report.increment(["Loop", "End"])
 
         # Info
         Logger.info("Ended loop.")
 
 
 
+    def flush(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            FLUSH
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Store error counts, then all changed reports (e.g. loop log).
+        """
+
+        errors.flush()
+        reporter.flush()
+
+
+
     def readCGM(self):
 
         """
@@ -409,34 +438,44 @@ class Loop(object):
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         """
 
-        # Start
-        isStarted = {"Loop": self.tryAndCatch(self.start),
-                     "Stick": self.tryAndCatch(self.stick.start),
-                     "CGM": self.tryAndCatch(self.cgm.start),
-                     "Pump": self.tryAndCatch(self.pump.start)}
+        # Run loop, making sure changes it made to reports get stored, even if
+        # it crashes before being stopped
+        try:
+
+            # Start
+            isStarted = {"Loop": self.tryAndCatch(self.start),
+                         "Stick": self.tryAndCatch(self.stick.start),
+                         "CGM": self.tryAndCatch(self.cgm.start),
+                         "Pump": self.tryAndCatch(self.pump.start)}
 
-        # Read
-        isRead = {"CGM": isStarted["CGM"] and self.tryAndCatch(self.readCGM),
-                  "Pump": isStarted["Pump"] and self.tryAndCatch(self.readPump)}
+            # Read
+            isRead = {"CGM": isStarted["CGM"] and
+                             self.tryAndCatch(self.readCGM),
+                      "Pump": isStarted["Pump"] and
+                              self.tryAndCatch(self.readPump)}
 
-        # BG data is always necessary
-        if isRead["CGM"]:
+            # BG data is always necessary
+            if isRead["CGM"]:
 
-            # If pump was successfully read
-            if isRead["Pump"]:
+                # If pump was successfully read
+                if isRead["Pump"]:
 
-                # Compute and enact necessary TB
-                if self.tryAndCatch(self.computeTB, self.t0):
-                    self.tryAndCatch(self.enactTB, self.recommendation)
-                
-            # Export recent treatments
-            self.tryAndCatch(self.export)
+                    # Compute and enact necessary TB
+                    if self.tryAndCatch(self.computeTB, self.t0):
+                        self.tryAndCatch(self.enactTB, self.recommendation)
 
-        # Stop
-        isStopped = {"Pump": self.tryAndCatch(self.pump.stop),
-                     "CGM": self.tryAndCatch(self.cgm.stop),
-                     "Stick": self.tryAndCatch(self.stick.stop),
-                     "Loop": self.tryAndCatch(self.stop)}
+                # Export recent treatments
+                self.tryAndCatch(self.export)
+
+            # Stop
+            isStopped = {"Pump": self.tryAndCatch(self.pump.stop),
+                         "CGM": self.tryAndCatch(self.cgm.stop),
+                         "Stick": self.tryAndCatch(self.stick.stop),
+                         "Loop": self.tryAndCatch(self.stop)}
+
+        # Store changes
+        finally:
+            self.tryAndCatch(self.flush)
 
 
 
@@ -451,6 +490,9 @@ def main():
     # Get current time
     now = datetime.datetime.now()
 
+    # Write logs in background
+    logger.start()
+
     # Instanciate a loop
     loop = Loop()
 
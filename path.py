@@ -30,6 +30,11 @@ import datetime
 
 
 
+# USER LIBRARIES
+import archives
+
+
+
 # CONSTANTS
 # Warning: other modules depend on this file (path.py) being located at the root
 # of the project!
@@ -254,6 +259,16 @@ class Path:
             if os.path.isfile(p) and os.path.basename(p) == filename:
                 results.append(Path(os.path.dirname(p)))
 
+            # If archive index: look for archived days containing file
+            elif (os.path.isfile(p) and
+                  os.path.basename(p) == archives.ARCHIVE_INDEX):
+
+                # Archived days which still exist were rewritten after
+                # archiving and are found when scanning them
+                for day in archives.listArchivedDays(path, filename):
+                    if not os.path.isfile(path + day + os.sep + filename):
+                        results.append(Path(path + day))
+
             # If directory
             elif os.path.isdir(p):
                 self.scan(filename, Path(p).path, results, n + 1)
@@ -299,6 +314,24 @@ def toDate(path):
 
 
 
+def listNumericDirectories(p):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        LISTNUMERICDIRECTORIES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        List sorted subdirectories of given directory, which have numeric names
+        (i.e. year, month and day directories of dated reports and logs).
+    """
+
+    # Make sure path ends with a separator
+    p = os.path.join(p, "")
+
+    return sorted([d for d in os.listdir(p) if d.isdigit() and
+        os.path.isdir(p + d)])
+
+
+
 # Define default paths
 REPORTS = Path(SRC + "Reports")
 EXPORTS = Path(SRC + "Exports")
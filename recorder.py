@@ -0,0 +1,473 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    recorder
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Overview: Flight recorder of the loop. Loop tasks, as well as stick, pump
+              and CGM commands, are traced as structured events within a
+              fixed-size, memory-mapped ring buffer, which can be dumped and
+              filtered from the terminal, e.g.:
+
+                  python recorder.py -s Pump -e -n 20
+
+    Notes:    - Each event holds its time, subsystem, name, command code,
+                duration, numbers of bytes sent/received and outcome (error
+                name if any).
+              - Once the buffer is full, the oldest events are overwritten.
+              - The recorder never gets in the way of what it traces: if the
+                trace cannot be written, events are dropped.
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import os
+import sys
+import mmap
+import time
+import struct
+import datetime
+import argparse
+
+
+
+# USER LIBRARIES
+import path
+import logger
+
+
+
+# Define instances
+Logger = logger.Logger("recorder")
+
+
+
+# CONSTANTS
+# Trace file
+TRACE = "trace.bin"
+
+# Max number of events in trace
+CAPACITY = 4096
+
+# Trace header: magic, capacity, number of events ever recorded
+MAGIC = "MKPSTRC1"
+HEADER = struct.Struct("<8sIQ")
+
+# Event: time, subsystem, outcome, code, duration, bytes sent/received, name
+# and error
+EVENT = struct.Struct("<dBBHfII20s20s")
+
+# Subsystems
+SUBSYSTEMS = ["Loop", "Stick", "Pump", "CGM"]
+
+# Outcomes
+OUTCOMES = ["OK", "Error"]
+
+# Missing command code
+NO_CODE = 0xFFFF
+
+
+
+# CLASSES
+class Recorder(object):
+
+    def __init__(self, filename = None, capacity = CAPACITY):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Trace file defaults to the one within the reports directory (at
+            the time it is opened).
+        """
+
+        # Store trace characteristics
+        self.filename = filename
+        self.capacity = capacity
+
+        # Initialize trace file and its map
+        self.file = None
+        self.map = None
+
+
+
+    def open(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            OPEN
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Map trace file in memory, creating it (or starting it over) if it
+            does not match recorder's capacity.
+        """
+
+        # Already open
+        if self.map is not None:
+            return
+
+        # Default trace file
+        if self.filename is None:
+            path.REPORTS.touch()
+            self.filename = path.REPORTS.path + TRACE
+
+        # Get trace size
+        size = HEADER.size + self.capacity * EVENT.size
+
+        # Open trace file (create it if needed)
+        mode = "r+b" if os.path.isfile(self.filename) else "w+b"
+        self.file = open(self.filename, mode)
+
+        # Read header
+        self.file.seek(0)
+        header = self.file.read(HEADER.size)
+
+        # New or incompatible trace: start over
+        if (len(header) != HEADER.size or
+            HEADER.unpack(header)[0:2] != (MAGIC, self.capacity) or
+            os.fstat(self.file.fileno()).st_size != size):
+            self.file.seek(0)
+            self.file.truncate(size)
+            self.file.write(HEADER.pack(MAGIC, self.capacity, 0))
+            self.file.flush()
+
+        # Map it
+        self.map = mmap.mmap(self.file.fileno(), size)
+
+
+
+    def close(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            CLOSE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Unmap trace
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+        # Close its file
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+
+    def count(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            COUNT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get number of events ever recorded.
+        """
+
+        return HEADER.unpack_from(self.map, 0)[2]
+
+
+
+    def record(self, t, subsystem, name, code = None, duration = 0, TX = 0,
+        RX = 0, error = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            RECORD
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Write event at the end of the ring (overwriting the oldest one if
+            it is full), then count it.
+        """
+
+        # Make sure trace is open
+        self.open()
+
+        # Get event slot
+        n = self.count()
+        offset = HEADER.size + (n % self.capacity) * EVENT.size
+
+        # Write event
+        EVENT.pack_into(self.map, offset, t, SUBSYSTEMS.index(subsystem),
+            int(error is not None), encodeCode(code), duration, TX, RX,
+            name[:20], (error or "")[:20])
+
+        # Count it
+        HEADER.pack_into(self.map, 0, MAGIC, self.capacity, n + 1)
+
+
+
+    def read(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            READ
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Read events still within the ring, from oldest to newest.
+        """
+
+        # Make sure trace is open
+        self.open()
+
+        # Get events' slots
+        n = self.count()
+        slots = [i % self.capacity for i in range(max(n - self.capacity, 0),
+            n)]
+
+        # Decode events
+        return [decodeEvent(EVENT.unpack_from(self.map,
+            HEADER.size + i * EVENT.size)) for i in slots]
+
+
+
+class Span(object):
+
+    def __init__(self, subsystem, name, code = None, measure = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Traced block of code. Measure, if given, is called at the end of
+            the block to get the numbers of bytes sent/received.
+        """
+
+        # Store event characteristics
+        self.subsystem = subsystem
+        self.name = name
+        self.code = code
+        self.measure = measure
+
+        # Initialize start time
+        self.t = None
+
+
+
+    def __enter__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ENTER
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Start timing
+        self.t = time.time()
+
+        return self
+
+
+
+    def __exit__(self, error, *args):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            EXIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Record event, without ever interfering with the traced code.
+        """
+
+        # Get duration
+        duration = time.time() - self.t
+
+        try:
+
+            # Get numbers of bytes sent/received
+            TX, RX = self.measure() if self.measure else (0, 0)
+
+            # Record event
+            RECORDER.record(self.t, self.subsystem, self.name, self.code,
+                duration, TX, RX, error.__name__ if error else None)
+
+        # Drop event
+        except Exception as e:
+            Logger.debug("Could not record event: %s", e)
+
+        # Do not swallow errors
+        return False
+
+
+
+# FUNCTIONS
+def trace(subsystem, name, code = None, measure = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        TRACE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Trace block of code as an event, e.g.:
+
+            with recorder.trace("Pump", "ReadTime", 112):
+                ...
+    """
+
+    return Span(subsystem, name, code, measure)
+
+
+
+def encodeCode(code):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ENCODECODE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Convert command code (int, or hexadecimal string) into an int.
+    """
+
+    # No code
+    if code is None:
+        return NO_CODE
+
+    # Hexadecimal code
+    if isinstance(code, basestring):
+        return int(code, 16)
+
+    return int(code)
+
+
+
+def decodeEvent(values):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        DECODEEVENT
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Convert unpacked event into a dict.
+    """
+
+    # Unpack values
+    t, subsystem, outcome, code, duration, TX, RX, name, error = values
+
+    return {"Time": datetime.datetime.fromtimestamp(t),
+            "Subsystem": SUBSYSTEMS[subsystem],
+            "Outcome": OUTCOMES[outcome],
+            "Code": None if code == NO_CODE else code,
+            "Duration": duration,
+            "TX": TX,
+            "RX": RX,
+            "Name": name.rstrip("\x00"),
+            "Error": error.rstrip("\x00") or None}
+
+
+
+def select(events, subsystem = None, name = None, errors = False,
+    slowest = None, n = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        SELECT
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Filter events by subsystem, name, outcome (errors only) and min
+        duration (s), then keep the n last ones.
+    """
+
+    # Filter events
+    events = [e for e in events
+        if (subsystem is None or e["Subsystem"] == subsystem) and
+           (name is None or e["Name"] == name) and
+           (not errors or e["Outcome"] == "Error") and
+           (slowest is None or e["Duration"] >= slowest)]
+
+    # Keep last ones
+    if n is not None:
+        events = events[-n:] if n > 0 else []
+
+    return events
+
+
+
+def formatEvent(event):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        FORMATEVENT
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    """
+
+    # Format code
+    code = "" if event["Code"] is None else "{:02X}".format(event["Code"])
+
+    return "[{:%Y.%m.%d - %H:%M:%S.%f}] [{:>5}] [{:>20}] [{:>4}] {:>9.1f} ms "\
+        "TX: {:>5} RX: {:>5} {}".format(event["Time"], event["Subsystem"],
+        event["Name"], code, event["Duration"] * 1000, event["TX"],
+        event["RX"], event["Error"] or event["Outcome"])
+
+
+
+def main():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        MAIN
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Dump (filtered) events of trace.
+    """
+
+    # Define arguments
+    parser = argparse.ArgumentParser(description = "Dump loop trace.")
+    parser.add_argument("-f", "--file", help = "trace file")
+    parser.add_argument("-s", "--subsystem", choices = SUBSYSTEMS)
+    parser.add_argument("-c", "--command", help = "task/command name")
+    parser.add_argument("-e", "--errors", action = "store_true",
+        help = "only show failed events")
+    parser.add_argument("-d", "--duration", type = float,
+        help = "only show events lasting at least this long (ms)")
+    parser.add_argument("-n", "--number", type = int,
+        help = "only show last events")
+
+    # Parse them
+    args = parser.parse_args()
+
+    # Get trace file
+    filename = args.file or path.REPORTS.path + TRACE
+
+    if not os.path.isfile(filename):
+        print "No trace found: " + filename
+        sys.exit(1)
+
+    # Read trace header
+    with open(filename, "rb") as f:
+        header = f.read(HEADER.size)
+
+    if len(header) != HEADER.size or HEADER.unpack(header)[0] != MAGIC:
+        print "Invalid trace: " + filename
+        sys.exit(1)
+
+    # Read trace (using its own capacity)
+    capacity = HEADER.unpack(header)[1]
+
+    recorder = Recorder(filename, capacity)
+    events = recorder.read()
+    recorder.close()
+
+    # Filter events
+    slowest = None if args.duration is None else args.duration / 1000.0
+
+    events = select(events, args.subsystem, args.command, args.errors,
+        slowest, args.number)
+
+    # Show them
+    for event in events:
+        print formatEvent(event)
+
+
+
+# Initialize recorder
+RECORDER = Recorder()
+
+
+
+# Run this when script is called from terminal
+if __name__ == "__main__":
+    main()
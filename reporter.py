@@ -30,17 +30,31 @@
 
 # LIBRARIES
 import os
+import copy
 import json
+import time
+import marshal
+import tempfile
+import bisect
 import datetime
+import collections
 from dateutil.relativedelta import relativedelta
 
+# File locking is only available on Unix
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 
 
 # USER LIBRARIES
 import lib
+import codec
 import path
 import logger
 import errors
+import archives
 
 
 
@@ -49,15 +63,50 @@ Logger = logger.Logger("reporter")
 
 
 
+# CONSTANTS
+# Max number of dated reports kept in memory at once (non-dated reports are
+# never evicted)
+MAX_DATED_REPORTS = 50
+
+# Durability of stored reports: "none" (leave it to the OS), "file" (sync
+# report files before renaming them) or "full" (also sync their directories)
+DURABILITY = "file"
+
+# Keep parsed content of reports in hidden sidecar files, so that processes
+# starting cold can skip parsing JSON files which did not change
+CACHE = False
+
+# Max number of journaled changes before a report gets compacted (i.e. its
+# whole content is stored again and its journal is discarded)
+JOURNAL_SIZE = 500
+
+# Key of the generation which tags the stored content of journaled reports
+GENERATION = ".generation"
+
+# Name of the lock file shared by all reports within a directory
+LOCK = ".lock"
+
+# Min age (s) of a directory's modification time before it can be trusted (on
+# some filesystems, a directory can still be modified within the same tick)
+MIN_MTIME_AGE = 2
+
+# BG range (mmol/L) used to compute time in range within rollups
+BG_RANGE = [3.9, 10.0]
+
+
+
 # CLASSES
 class Report(object):
 
     """
-    Report object based on given JSON file.
+    Report object based on given JSON file. Journaled reports append their
+    changes to a journal next to their JSON file, instead of rewriting it.
     """
 
     LOADING_ATTEMPTS = 2
 
+    journal = False
+
     def __init__(self, name, directory = path.REPORTS, json = None):
 
         """
@@ -90,6 +139,22 @@ class Report(object):
         self.json = json
         self.directory = path.Path(directory.path)
 
+        # Content not yet synced with report's file
+        self.dirty = True
+
+        # Initialize pending changes to journal (None: whole content needs to
+        # be stored) and number of changes already in journal
+        self.changes = None
+        self.nJournaledChanges = 0
+
+        # Initialize generation of stored content, and the one of the content
+        # journal applies to (None: no journal)
+        self.generation = 0
+        self.journalGeneration = None
+
+        # Initialize state of report's files when content was last synced
+        self.stat = None
+
 
 
     def __repr__(self):
@@ -167,6 +232,8 @@ class Report(object):
 
         # Erase JSON
         self.json = {}
+        self.dirty = True
+        self.changes = None
 
 
 
@@ -176,27 +243,64 @@ class Report(object):
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
             STORE
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            Store current JSON to report's JSON file.
+            Store current JSON to report's JSON file, unless it did not change
+            since it was last loaded or stored. The file is replaced
+            atomically, so it is never left half-written.
         """
 
-        # Overwrite right check
-        if self.exists() and not overwrite:
-            raise errors.NoOverwriting(repr(self), [])
+        commit([self], overwrite)
 
-        # Info
-        Logger.debug("Storing report: " + repr(self))
 
-        # Make sure report exists
-        self.directory.touch(self.name)
 
-        # Rewrite report
-        with open(self.directory.path + self.name, "w") as f:
+    def dump(self, generation = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            DUMP
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Serialize report's content as it is written to its JSON file.
+        """
+
+        return json.dumps(self.getContent(generation),
+                          indent = 4,
+                          separators = (",", ": "),
+                          sort_keys = True)
+
+
+
+    def getContent(self, generation = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETCONTENT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get report's content as it is written to its JSON file: the one of
+            journaled reports is tagged with given generation.
+        """
+
+        # No tag needed
+        if not self.journal or generation is None:
+            return self.json
+
+        # Tag content (without copying it all)
+        content = dict(self.json)
+        content[GENERATION] = generation
+
+        return content
+
+
+
+    def onStore(self, created):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ONSTORE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Called once report's file was written, with a flag indicating
+            whether the file was just created.
+        """
 
-            # Dump JSON
-            json.dump(self.json, f,
-                      indent = 4,
-                      separators = (",", ": "),
-                      sort_keys = True)
+        pass
 
 
 
@@ -210,7 +314,7 @@ class Report(object):
         """
 
         # Info
-        Logger.debug("Loading report: " + repr(self))
+        Logger.debug("Loading report: %r", self)
 
         # Loading
         for i in range(self.LOADING_ATTEMPTS):
@@ -219,19 +323,35 @@ class Report(object):
             Logger.debug("Loading attempt: " + str(i + 1) + "/" +
                 str(self.LOADING_ATTEMPTS))
 
-            # Try opening report
-            try:
+            # Make sure no other process writes report while reading it (lock
+            # errors are not loading errors: let them through)
+            with self.lock():
 
-                # Open report and load JSON
-                with open(self.directory.path + self.name, "r") as f:
-                    self.json = json.load(f)
+                # Try opening report
+                try:
 
-                # Success
-                Logger.debug("Report loaded.")
-                return
+                    # Get state of report's files before reading them
+                    stat = self.getStat()
+
+                    # Load JSON
+                    self.json = self.read(stat[0])
+
+                    # Get its generation
+                    self.generation = self.json.pop(GENERATION, 0)
 
-            # In case of error
-            except:
+                    # Replay journaled changes
+                    if self.journal:
+                        self.replay()
+
+                    loaded = True
+
+                # In case of missing or unparsable files
+                except (IOError, OSError, ValueError):
+                    loaded = False
+
+            # Loading failed (handled once unlocked, since resetting a report
+            # might store it)
+            if not loaded:
 
                 # Strict loading
                 if strict:
@@ -239,12 +359,187 @@ class Report(object):
 
                 # Reset report
                 self.reset()
+                continue
+
+            # Report is now synced with its file
+            self.dirty = False
+            self.changes = []
+            self.stat = stat
+
+            # Success
+            Logger.debug("Report loaded.")
+            return
 
         # No loading possible
         raise IOError("Could not load " + repr(self))
 
 
 
+    def read(self, stat):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            READ
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Read and parse content of report's JSON file, which has the given
+            state. Use cached content instead, if possible. Reports without a
+            file are read from their archive.
+        """
+
+        # No file: read archived content
+        if stat is None:
+            content = archives.read(self.directory.path, self.name)
+
+            if content is None:
+                raise IOError("No file or archive for: " + repr(self))
+
+            return json.loads(content)
+
+        # Try cached content first
+        if CACHE:
+            content = self.readCache(stat)
+
+            if content is not None:
+                Logger.debug("Using cached content for: %r", self)
+                return content
+
+        # Open report and load JSON
+        with open(self.directory.path + self.name, "r") as f:
+            content = json.load(f)
+
+        # Cache it
+        if CACHE:
+            self.writeCache(stat, content)
+
+        return content
+
+
+
+    def getCachePath(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETCACHEPATH
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        return self.directory.path + "." + self.name + ".cache"
+
+
+
+    def readCache(self, stat):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            READCACHE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Read cached content of report's JSON file, if it corresponds to
+            the given state of said file. Otherwise, return None.
+        """
+
+        # No file: nothing to cache
+        if stat is None:
+            return None
+
+        # Read cache
+        try:
+            with open(self.getCachePath(), "rb") as f:
+                cachedStat, content = marshal.load(f)
+
+        # Cache missing or corrupted
+        except (IOError, EOFError, ValueError, TypeError):
+            return None
+
+        # Cache is only valid if JSON file did not change since
+        if tuple(cachedStat) != stat:
+            return None
+
+        return content
+
+
+
+    def writeCache(self, stat, content):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            WRITECACHE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Cache given content of report's JSON file, along with the state
+            of said file. Caching is only an optimization, so failing to do so
+            is not an error.
+        """
+
+        # No file: nothing to cache
+        if stat is None:
+            return
+
+        # Write cache
+        try:
+            tmp = writeTemporaryFile(self.directory.path,
+                marshal.dumps((stat, content)))
+            os.rename(tmp, self.getCachePath())
+
+        except (IOError, OSError, ValueError) as e:
+            Logger.warning("Could not cache " + repr(self) + ": " + str(e))
+
+
+
+    def getStat(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETSTAT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get current state of report's JSON file (and journal, if any).
+        """
+
+        return (getFileStat(self.directory.path + self.name),
+                getFileStat(self.getJournalPath()) if self.journal else None)
+
+
+
+    def getLockPath(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETLOCKPATH
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get path of lock file of report's directory, which all reports
+            within it share.
+        """
+
+        return self.directory.path + LOCK
+
+
+
+    def lock(self, exclusive = False):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            LOCK
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get a (shared or exclusive) lock on report's files, to be used as a
+            context manager.
+        """
+
+        return Lock([self.getLockPath()], exclusive)
+
+
+
+    def isOutdated(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ISOUTDATED
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Check whether report's files changed on disk (e.g. because of
+            another process) since its content was last synced with them.
+        """
+
+        return self.stat is not None and self.getStat() != self.stat
+
+
+
     def merge(self, report):
 
         """
@@ -263,6 +558,8 @@ class Report(object):
 
         # Update JSON
         self.json = lib.mergeDicts(self.json, json)
+        self.dirty = True
+        self.changes = None
 
 
 
@@ -334,6 +631,8 @@ class Report(object):
 
             # Replace whole content
             self.json = value
+            self.dirty = True
+            self.changes = None
             return
 
         # Initialize JSON
@@ -355,6 +654,7 @@ class Report(object):
                     # Overwrite is possible
                     elif overwrite:
                         json[key] = value
+                        self.record("set", branch, value)
                         return
 
                     # Otherwise
@@ -363,6 +663,7 @@ class Report(object):
                 # Otherwise
                 else:
                     json[key] = value
+                    self.record("set", branch, value)
                     return
 
             # Otherwise
@@ -408,6 +709,8 @@ class Report(object):
         # Empty branch: erase whole report
         if branch == []:
             self.json = {}
+            self.dirty = True
+            self.changes = None
             return
 
         # Initialize JSON
@@ -422,6 +725,7 @@ class Report(object):
                 # Last key of branch (actual key of entry)
                 if key == branch[-1]:
                     del json[key]
+                    self.record("delete", branch)
                     return
 
                 # Key leads to another dict: dive deeper
@@ -433,15 +737,15 @@ class Report(object):
 
 
 
-    def increment(self, branch, strict = True):
+    def increment(self, branch, strict = True, step = 1):
 
         """
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
             INCREMENT
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            Increment the tip of the branch by one. If 'strict' is set to False,
-            it is possible to increment a non-existing entry, by assuming it
-            was set to 0 before the call.
+            Increment the tip of the branch by given step. If 'strict' is set to
+            False, it is possible to increment a non-existing entry, by assuming
+            it was set to 0 before the call.
         """
 
         # Test branch: no empty branch allowed (cannot increment the root of a
@@ -468,7 +772,200 @@ class Report(object):
             raise TypeError("Can only increment integers. Found: " + str(n))
 
         # Update value
-        self.set(n + 1, branch, True)
+        self.set(n + step, branch, True)
+
+
+
+    def record(self, operation, branch, value = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            RECORD
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Mark report as changed and, if it is journaled, keep track of the
+            change ("set" or "delete") made at the tip of given branch.
+        """
+
+        # Report changed
+        self.dirty = True
+
+        # Keep track of change, unless whole content needs to be stored anyway
+        if self.journal and self.changes is not None:
+            change = [operation, branch]
+
+            if operation == "set":
+                change += [value]
+
+            # Serialize it right away, in case value gets modified later on
+            self.changes += [json.dumps(change)]
+
+
+
+    def getJournalPath(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETJOURNALPATH
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        return self.directory.path + "." + self.name + ".journal"
+
+
+
+    def isAppendable(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ISAPPENDABLE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Check whether pending changes can be appended to report's journal,
+            or whether report needs to be compacted (e.g. because its journal
+            is stale).
+        """
+
+        return (self.journal and self.changes is not None and
+                self.nJournaledChanges + len(self.changes) <= JOURNAL_SIZE and
+                self.journalGeneration in [None, self.generation] and
+                self.exists())
+
+
+
+    def append(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            APPEND
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Append pending changes to report's journal (one per line). New
+            journals start with the generation of the stored content they
+            apply to.
+        """
+
+        # Info
+        Logger.debug("Journaling " + str(len(self.changes)) + " change(s) " +
+            "to: " + repr(self))
+
+        # Get lines to append
+        lines = list(self.changes)
+
+        # New journal: get generation of stored content (another process
+        # might have stored a newer one since report was loaded)
+        if not os.path.isfile(self.getJournalPath()):
+            self.journalGeneration = self.generation
+
+            if self.isOutdated():
+                with open(self.directory.path + self.name, "r") as f:
+                    self.journalGeneration = json.load(f).get(GENERATION, 0)
+
+            lines.insert(0, json.dumps(["generation", self.journalGeneration]))
+
+        # Append them
+        with open(self.getJournalPath(), "a") as f:
+            f.write("".join([line + "\n" for line in lines]))
+
+            # Make sure data reached the disk
+            if DURABILITY != "none":
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Report is now synced with its files
+        self.nJournaledChanges += len(self.changes)
+        self.changes = []
+        self.dirty = False
+        self.stat = self.getStat()
+
+
+
+    def replay(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            REPLAY
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Apply changes found in report's journal to its loaded content.
+            Replaying changes again is not harmless (e.g. increments would
+            regress), so a journal which applies to another generation of the
+            content (i.e. which was already folded into it, but could not be
+            discarded) is skipped. It then gets discarded on next store.
+        """
+
+        # Reset number of journaled changes
+        self.nJournaledChanges = 0
+        self.journalGeneration = None
+
+        # No journal
+        if not os.path.isfile(self.getJournalPath()):
+            return
+
+        # Read journal
+        with open(self.getJournalPath(), "r") as f:
+            lines = f.readlines()
+
+        # Journals without generation apply to any content
+        self.journalGeneration = self.generation
+
+        # Apply changes
+        for line in lines:
+
+            # Decode change (last line might be truncated after a crash)
+            try:
+                change = json.loads(line)
+
+            except ValueError:
+                Logger.warning("Skipping corrupted journal entry in: " +
+                    repr(self))
+                continue
+
+            # Get generation of content journal applies to
+            if change[0] == "generation":
+                self.journalGeneration = change[1]
+                continue
+
+            # Stale journal
+            if self.journalGeneration != self.generation:
+                Logger.warning("Skipping stale journal of: " + repr(self))
+                self.nJournaledChanges = 0
+                return
+
+            # Get branch (keys are decoded as unicode strings)
+            branch = [key.encode("utf-8") for key in change[1]]
+
+            # Set entry
+            if change[0] == "set":
+                self.set(change[2], branch, True)
+
+            # Delete entry (might already be gone)
+            elif change[0] == "delete":
+                try:
+                    self.delete(branch)
+                except errors.MissingBranch:
+                    pass
+
+            self.nJournaledChanges += 1
+
+        # Info
+        Logger.debug("Replayed " + str(self.nJournaledChanges) + " journaled " +
+            "change(s) for: " + repr(self))
+
+
+
+    def discardJournal(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            DISCARDJOURNAL
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Discard report's journal, once its changes are part of the stored
+            JSON file.
+        """
+
+        if os.path.isfile(self.getJournalPath()):
+            os.remove(self.getJournalPath())
+
+        # Reset number of journaled changes
+        self.nJournaledChanges = 0
+        self.journalGeneration = None
 
 
 
@@ -478,6 +975,9 @@ class DatedReport(Report):
     Dated report object based on given JSON file.
     """
 
+    # Key of report's daily summary within monthly rollups (if any)
+    summary = None
+
     def __init__(self, name, date, directory = path.REPORTS, json = None):
 
         """
@@ -495,6 +995,9 @@ class DatedReport(Report):
 
         # Define date
         self.date = date
+
+        # Keep track of source directory
+        self.src = path.Path(directory.path)
         
         # Expand path
         self.directory.expand(lib.formatDate(date))
@@ -514,6 +1017,21 @@ class DatedReport(Report):
 
 
 
+    def exists(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            EXISTS
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Check whether file associated with report exists, either on its own
+            or within an archive (only looked up if there is no file).
+        """
+
+        return (super(DatedReport, self).exists() or
+            archives.isArchived(self.directory.path, self.name))
+
+
+
     def __str__(self):
 
         """
@@ -532,30 +1050,92 @@ class DatedReport(Report):
 
 
 
+    def onStore(self, created):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ONSTORE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Add report's date to the manifest of its source directory if its
+            file was just created, and mark its rollup as stale.
+        """
 
+        # Update manifest
+        if created:
+            getManifest(self.src).add(self.name, self.date)
 
+        # Rollup needs to summarize report again (once it is read or flushed)
+        if self.summary is not None:
+            invalidateRollup(self)
 
-class BGReport(DatedReport):
 
-    name = "BG.json"
 
-    def __init__(self, date, directory = path.REPORTS):
+    def summarize(self, previous = None):
 
         """
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            INIT
+            SUMMARIZE
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Summarize report's content for monthly rollups, given its previous
+            summary (if any). Reports without a summary return None, and are
+            skipped by rollups.
         """
 
-        super(BGReport, self).__init__(self.name, date, directory)
+        return None
 
 
 
-class PumpReport(Report):
 
-    name = "pump.json"
 
-    def __init__(self, directory = path.REPORTS):
+
+class BGReport(DatedReport):
+
+    name = "BG.json"
+
+    summary = "BG"
+
+    def __init__(self, date, directory = path.REPORTS):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        super(BGReport, self).__init__(self.name, date, directory)
+
+
+
+    def summarize(self, previous = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            SUMMARIZE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Count BGs, and compute their mean and time in range.
+        """
+
+        # Get BGs
+        BGs = [y for y in self.json.values() if lib.isRealNumber(y)]
+
+        # No BGs
+        if not BGs:
+            return {"Count": 0, "Mean": None, "TIR": None}
+
+        # Count BGs within range
+        n = len([y for y in BGs if BG_RANGE[0] <= y <= BG_RANGE[1]])
+
+        return {"Count": len(BGs),
+                "Mean": round(float(sum(BGs)) / len(BGs), 2),
+                "TIR": round(float(n) / len(BGs), 3)}
+
+
+
+class PumpReport(Report):
+
+    name = "pump.json"
+
+    def __init__(self, directory = path.REPORTS):
 
         """
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -579,7 +1159,7 @@ class PumpReport(Report):
         Logger.debug("Resetting report: " + repr(self))
 
         # Reset to default
-        self.json = {
+        self.set({
             "BG Targets": {},
             "Basal Profile (A)": {},
             "Basal Profile (B)": {},
@@ -601,7 +1181,7 @@ class PumpReport(Report):
                 "Carbs": "g",
                 "TB": "U/h"
             }
-        }
+        }, [], True)
 
         # Store it
         self.store()
@@ -636,12 +1216,12 @@ class CGMReport(Report):
         Logger.debug("Resetting report: " + repr(self))
 
         # Reset to default
-        self.json = {
+        self.set({
             "Clock Mode": "24h",
             "Language": "English",
             "Transmitter ID": "",
             "Units": "mmol/L"
-        }
+        }, [], True)
 
         # Store it
         self.store()
@@ -676,12 +1256,12 @@ class StickReport(Report):
         Logger.debug("Resetting report: " + repr(self))
 
         # Reset to default
-        self.json = {
+        self.set({
             "Frequency": [
                     917.5,
                     "1970.01.01 - 00:00:00"
                 ]
-        }
+        }, [], True)
 
         # Store it
         self.store()
@@ -716,11 +1296,11 @@ class TreatmentsReport(DatedReport):
         Logger.debug("Resetting report: " + repr(self))
 
         # Reset to default
-        self.json = {
+        self.set({
             "Boluses": {},
             "IOB": {},
             "Net Basals": {}
-        }
+        }, [], True)
 
         # Store it
         self.store()
@@ -755,7 +1335,7 @@ class HistoryReport(DatedReport):
         Logger.debug("Resetting report: " + repr(self))
 
         # Reset to default
-        self.json = {
+        self.set({
             "CGM": {
                 "Battery Levels": {},
                 "Calibrations": {},
@@ -765,7 +1345,7 @@ class HistoryReport(DatedReport):
                 "Battery Levels": {},
                 "Reservoir Levels": {}
             }
-        }
+        }, [], True)
 
         # Store it
         self.store()
@@ -776,6 +1356,10 @@ class LoopReport(DatedReport):
 
     name = "loop.json"
 
+    journal = True
+
+    summary = "Loop"
+
     def __init__(self, date, directory = path.REPORTS):
 
         """
@@ -788,6 +1372,37 @@ class LoopReport(DatedReport):
 
 
 
+    def summarize(self, previous = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            SUMMARIZE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Count loop starts/ends and get their total duration. Older reports
+            only know about the last duration, so it is added to the previous
+            total whenever a new loop end is seen.
+        """
+
+        # Get loop stats
+        start = self.json.get("Loop", {}).get("Start", 0)
+        end = self.json.get("Loop", {}).get("End", 0)
+        last = self.json.get("Loop", {}).get("Last Duration", 0)
+        total = self.json.get("Loop", {}).get("Duration")
+
+        # Get total duration
+        if total is not None:
+            duration = total
+        elif previous is None:
+            duration = last if end else 0
+        elif end > previous["End"]:
+            duration = previous["Duration"] + last
+        else:
+            duration = previous["Duration"]
+
+        return {"Start": start, "End": end, "Duration": duration}
+
+
+
     def reset(self):
 
         """
@@ -800,7 +1415,7 @@ class LoopReport(DatedReport):
         Logger.debug("Resetting report: " + repr(self))
 
         # Reset to default
-        self.json = {
+        self.set({
             "CGM": {
                 "BG": 0,
                 "Battery": 0,
@@ -822,10 +1437,11 @@ class LoopReport(DatedReport):
                 "End": 0,
                 "Last Time": "1970.01.01 - 00:00:00",
                 "Last Duration": 0,
+                "Duration": 0,
                 "Export": 0,
                 "Upload": 0
             }
-        }
+        }, [], True)
 
         # Store it
         self.store()
@@ -836,6 +1452,10 @@ class ErrorsReport(DatedReport):
 
     name = "errors.json"
 
+    journal = True
+
+    summary = "Errors"
+
     def __init__(self, date, directory = path.REPORTS):
 
         """
@@ -848,6 +1468,19 @@ class ErrorsReport(DatedReport):
 
 
 
+    def summarize(self, previous = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            SUMMARIZE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get error counts, by class path.
+        """
+
+        return copy.deepcopy(self.json)
+
+
+
 class SFTPReport(Report):
 
     name = "sftp.json"
@@ -876,12 +1509,12 @@ class SFTPReport(Report):
         Logger.debug("Resetting report: " + repr(self))
 
         # Reset to default
-        self.json = {
+        self.set({
             "Host": "",
             "User": "",
             "Password": "",
             "Path": ""
-        }
+        }, [], True)
 
         # Store it
         self.store()
@@ -902,266 +1535,1960 @@ class SFTPReport(Report):
 
 
 
-
-
-# REPORT MANAGEMENT FUNCTIONS
-def reset():
+class Manifest(Report):
 
     """
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        RESET
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        Reset reports in module (re-instanciate and reload default reports).
+    Persistent index of the dates of all dated reports stored within a given
+    source directory. Dates are kept sorted for each report name, and
+    directories are only scanned again when their modification time changed.
+    Reports stored through this module update the manifest directly; files
+    dropped in existing day directories by other means require a rebuild.
     """
 
-    # Reports are defined once in module
-    global REPORTS
+    name = "manifest.json"
 
-    # Instanciate default reports
-    REPORTS = [PumpReport(), StickReport(), CGMReport(), SFTPReport()]
+    def __init__(self, directory = path.REPORTS):
 
-    # Load them
-    for report in REPORTS:
-        report.load(False)
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
 
+        super(Manifest, self).__init__(self.name, directory, {
+            "Dates": {},
+            "Directories": {}
+        })
 
+        # Initialize modification time of manifest file at last sync
+        self.mtime = None
 
-def getReportByType(reportType, date = None, directory = path.REPORTS,
-    strict = True):
 
-    """
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        GETREPORTBYTYPE
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        Check if module already knows about report using its type (class). If
-        yes, return it, otherwise instanciate and load it, then return a
-        reference to it.
 
-        If "strict" is set to "True", then report will be loading strictly.
+    def reset(self):
 
-        # TODO
-        Notes: - Only pre-defined types of reports can be handled so far
-               - Reports are stored in an simple array. Searching is thus in
-                 O(n). This could be optimized.
-    """
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            RESET
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
 
-    # Reports are defined once in module
-    global REPORTS
+        # Info
+        Logger.debug("Resetting report: " + repr(self))
 
-    # Test date
-    if date is not None and type(date) is not datetime.date:
-        raise TypeError("Invalid date.")
+        # Reset to default
+        self.set({
+            "Dates": {},
+            "Directories": {}
+        }, [], True)
 
-    # Try to get report in existing ones
-    for report in REPORTS:
-        if isinstance(report, reportType) and report.date == date:
-            return report
+        # Store it
+        self.store()
 
-    # Instanciate report
-    # Report
-    if date is None:
-        report = reportType(directory)
 
-    # Dated report
-    else:
-        report = reportType(date, directory)
-    
-    # Load it
-    report.load(strict)
 
-    # Store it
-    REPORTS += [report]
+    def sync(self):
 
-    # Return its reference
-    return report
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            SYNC
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Reload manifest if its file was updated (or deleted) since it was
+            last loaded or stored, e.g. by another process.
+        """
 
+        # Get current modification time of manifest file
+        mtime = getModificationTime(self.directory.path + self.name)
 
+        # Nothing changed
+        if mtime == self.mtime:
+            return
 
-def storeReportsByType(reportType, dates = []):
+        # Manifest file is gone: start from scratch
+        if mtime is None:
+            self.json = {
+                "Dates": {},
+                "Directories": {}
+            }
 
-    """
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        STOREREPORTSBYTYPE
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        Store all reports with matching type (class) currently loaded in module.
-    """
+        # Otherwise: reload it
+        else:
+            self.load(False)
 
-    # Reports are defined once in module
-    global REPORTS
+        # Update modification time
+        self.mtime = getModificationTime(self.directory.path + self.name)
 
-    # Test dates
-    if not all([type(date) is datetime.date for date in dates]):
-        raise TypeError("Invalid dates.")
 
-    # Non-dated report
-    if not dates:
-        dates = [None]
 
-    # Loop on loaded dated reports: if type and date match, store them
-    for date in dates:
-        for report in REPORTS:
-            if isinstance(report, reportType) and report.date == date:
-                report.store()
-                break
+    def onStore(self, created):
 
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ONSTORE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
 
+        # Update modification time
+        self.mtime = getModificationTime(self.directory.path + self.name)
 
-def storeReports():
 
-    """
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        STOREREPORTS
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        Store all reports currently loaded in module.
-    """
 
-    # Reports are defined once in module
-    global REPORTS
+    def refresh(self):
 
-    # Store loaded reports
-    for report in REPORTS:
-        report.store()
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            REFRESH
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Make sure manifest reflects the current state of its source
+            directory. Only the directories modified since they were last
+            scanned are listed again.
+        """
 
+        # Reload manifest if needed
+        self.sync()
 
+        # No source directory: nothing to index
+        if not os.path.isdir(self.directory.path):
+            self.json = {
+                "Dates": {},
+                "Directories": {}
+            }
+            return
 
+        # Scan modified directories and store manifest if it changed
+        if self.scan():
+            self.store()
 
 
 
-# GENERAL FUNCTIONS
-def isBranchValid(branch):
+    def rebuild(self):
 
-    """
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        ISBRANCHVALID
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        A branch is a list of keys, which lead to a value in a dict. All its
-        values should be strings.
-    """
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            REBUILD
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Forget about the whole content of manifest and scan its source
+            directory again from scratch.
+        """
 
-    return type(branch) is list and all([type(b) is str for b in branch])
+        # Info
+        Logger.info("Rebuilding manifest of: " + self.directory.path)
 
+        # Forget everything
+        self.json = {
+            "Dates": {},
+            "Directories": {}
+        }
 
+        # Scan everything
+        self.refresh()
 
-def getReportDates(reportType, src = path.REPORTS):
 
-    """
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        GETREPORTDATES
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        Get corresponding date objects for a dated report.
-    """
 
-    # Test report type
-    if not issubclass(reportType, DatedReport):
-        raise TypeError("Dated report type needed.")
+    def scan(self, directory = ""):
 
-    # Scan for reports with same name within given source directory
-    directories = src.scan(reportType.name)
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            SCAN
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Recursively scan given directory (relative to source directory,
+            e.g. "YYYY/MM") if it was modified since it was last scanned.
+            Otherwise, only look into its known subdirectories. Return whether
+            the manifest changed.
+        """
 
-    # Convert paths to dates
-    return [path.toDate(d) for d in directories]
+        # Get depth of directory (0: source, 1: year, 2: month)
+        depth = len(directory.split("/")) if directory else 0
 
+        # Get modification times of directory (recorded and current)
+        recorded = self.json["Directories"].get(directory)
+        current = getModificationTime(self.directory.path + directory)
 
+        # Directory did not change: dive in known subdirectories
+        if current == recorded:
 
-def getRecentDatedEntries(reportType, now, branch, n = 1, src = path.REPORTS,
-    strict = False):
+            # Months do not have any known subdirectories
+            if depth == 2:
+                return False
 
-    """
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        GETRECENTDATEDENTRIES
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        Get, merge, and return the dated entries at the tip of the given branch
-        in the "n" most recent reports, in which said branch exists.
-                
-        If "strict" is set to "True", "n" defines the number of days from today
-        the function will try looking back for content. Otherwise, it will try
-        to find "n" reports, no matter how old they are.
-    """
+            # Scan known subdirectories
+            return any([self.scan(d) for d in self.getSubdirectories(directory)])
 
-    # Test report type
-    if not issubclass(reportType, DatedReport):
-        raise TypeError("Dated report type needed.")
+        # Forget about directory's content
+        self.forget(directory)
 
-    # Get current date
-    today = now.date()
-    
-    # Initialize oldest possible date
-    oldest = datetime.date(1970, 1, 1)
+        # Directory does not exist anymore
+        if current is None:
+            return True
 
-    # Strict search: look up to "n" days before
-    if strict:
-        oldest = today - datetime.timedelta(days = n - 1)
+        # Get prefix of subdirectories
+        prefix = directory + "/" if directory else ""
 
-    # Get dates of reports
-    dates = getReportDates(reportType, src)
-    filteredDates = [d for d in dates if oldest <= d <= today]
+        # Scan subdirectories
+        for d in path.listNumericDirectories(self.directory.path + directory):
 
-    # Initialize dict for merged entries
-    json = {}
+            # Month: index files found in its days
+            if depth == 2:
+                for name in os.listdir(self.directory.path + prefix + d):
 
-    # Initialize number of reports found with given branch
-    nReportsFoundWithBranch = 0
+                    # Skip hidden (e.g. temporary) files
+                    if not name.startswith("."):
+                        self.insert(name, prefix + d)
 
-    # Loop on found dates, starting with the latest one
-    for date in sorted(filteredDates, reverse = True):
+            # Otherwise: dive deeper
+            else:
+                self.scan(prefix + d)
 
-        # Initialize and load report
-        report = getReportByType(reportType, date, src)
+        # Month: index files found in its archive
+        if depth == 2:
+            for key in archives.getIndex(self.directory.path + prefix):
+                day, name = key.encode("utf-8").split("/")
+                self.insert(name, prefix + day)
 
-        # Get and merge new entries
-        try:
-            json = lib.mergeDicts(json, report.get(branch))
-            nReportsFoundWithBranch += 1
+        # Record modification time, unless it is too recent to be trusted
+        if time.time() - current >= MIN_MTIME_AGE:
+            self.json["Directories"][directory] = current
 
-        # Keep going if branch is missing from current report
-        except errors.MissingBranch:
-            pass
+        # Manifest changed
+        return True
 
-        # Enough data found
-        if nReportsFoundWithBranch == n:
-            break
 
-    # Not enough reports
-    if nReportsFoundWithBranch < n:
-        Logger.warning("Could not find " + str(n) + " recent report(s) with " +
-            "given branch. Found: " + str(nReportsFoundWithBranch))
 
-    # Return entries
-    return json
+    def getSubdirectories(self, directory):
 
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETSUBDIRECTORIES
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get known direct subdirectories of given (relative) directory.
+        """
 
+        return sorted([d for d in self.json["Directories"] if d and
+            (d.rsplit("/", 1)[0] if "/" in d else "") == directory])
 
-def getDatedEntries(reportType, dates, branch, src = path.REPORTS,
-    strict = False):
 
-    """
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        GETDATEDENTRIES
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        Try to get dated entries in reports with given dates.
 
-        If "strict" is set to "True", then the given branch HAS to exist within
-        each report.
-    """
+    def forget(self, directory):
 
-    # Test report type
-    if not issubclass(reportType, DatedReport):
-        raise TypeError("Dated report type needed.")
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            FORGET
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Forget about given (relative) directory, its subdirectories and the
+            dates they contain.
+        """
 
-    # Test dates
+        # Get prefix of subdirectories and dates within directory
+        prefix = directory + "/" if directory else ""
+
+        # Manifest is about to change
+        self.dirty = True
+
+        # Forget directories
+        self.json["Directories"] = dict([(d, t) for (d, t) in
+            self.json["Directories"].items() if d != directory and
+            not d.startswith(prefix)])
+
+        # Forget dates
+        for name, dates in self.json["Dates"].items():
+            self.json["Dates"][name] = [d for d in dates
+                if not d.startswith(prefix)]
+
+            # Remove empty date lists
+            if not self.json["Dates"][name]:
+                del self.json["Dates"][name]
+
+
+
+    def insert(self, name, date):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INSERT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Insert formatted date (YYYY/MM/DD) in sorted dates of given report
+            name. Return whether it was missing.
+        """
+
+        # Get dates for report name
+        dates = self.json["Dates"].setdefault(name, [])
+
+        # Find where date should be
+        i = bisect.bisect_left(dates, date)
+
+        # Date already known
+        if i < len(dates) and dates[i] == date:
+            return False
+
+        # Insert date
+        dates.insert(i, date)
+        self.dirty = True
+        return True
+
+
+
+    def add(self, name, date):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ADD
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Add date of a newly created report to manifest, and store it.
+        """
+
+        # Make sure manifest is up-to-date with its file
+        self.sync()
+
+        # Add date and store manifest if it was missing
+        if self.insert(name, lib.formatDate(date)):
+            self.store()
+
+
+
+    def getDates(self, name, start = None, end = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETDATES
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get sorted dates of reports with given name, within [start, end].
+        """
+
+        # Get dates for report name
+        dates = self.json["Dates"].get(name, [])
+
+        # Find limits of range using binary search
+        a = 0 if start is None else bisect.bisect_left(dates,
+            lib.formatDate(start))
+        b = len(dates) if end is None else bisect.bisect_right(dates,
+            lib.formatDate(end))
+
+        # Convert formatted dates to date objects
+        return [datetime.date(*[int(x) for x in d.split("/")])
+            for d in dates[a:b]]
+
+
+
+
+class Rollup(Report):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ROLLUP
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Monthly rollup (stored within month directory: YYYY/MM/), which keeps
+        daily summaries of dated reports (see DatedReport.summarize), as well
+        as their aggregate over the whole month, and the state of the files
+        they were computed from:
+
+        {
+            "Days": {"DD": {"Errors": {...}, "Loop": {...}, "BG": {...}}},
+            "Month": {"Errors": {...}, "Loop": {...}, "BG": {...}},
+            "States": {"DD": {"Errors": [...], "Loop": [...], "BG": [...]}}
+        }
+
+        Stored reports only mark their rollup as stale: it is updated once it
+        is read, or when reports are flushed. Monthly and yearly statistics can
+        then be read from a few rollups, instead of every daily report.
+    """
+
+    name = "rollup.json"
+
+    # Dated report types with summaries
+    reportTypes = [BGReport, LoopReport, ErrorsReport]
+
+    def __init__(self, date, directory = path.REPORTS):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Initialize report
+        super(Rollup, self).__init__(self.name, directory)
+
+        # Define month
+        self.date = date.replace(day = 1)
+
+        # Keep track of source directory
+        self.src = path.Path(directory.path)
+
+        # Expand path
+        self.directory.expand(self.date.strftime("%Y/%m"))
+
+        # Initialize content
+        self.json = {
+            "Days": {},
+            "Month": {},
+            "States": {}
+        }
+
+
+
+    def __repr__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            REPR
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        return "'" + self.name + "' (" + self.date.strftime("%Y/%m") + ")"
+
+
+
+    def update(self, reports):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            UPDATE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Update summaries of given dated reports, then store rollup once.
+        """
+
+        # Info
+        Logger.debug("Updating " + repr(self) + " with: " + repr(reports))
+
+        # Make sure no other process updates rollup meanwhile
+        with transaction(self):
+            for report in reports:
+                self.summarize(report)
+
+
+
+    def check(self, reportType):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            CHECK
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Summarize again reports of given type whose files changed since
+            they were summarized (e.g. by a process which never got to update
+            the rollup). Only file states are compared: reports are loaded only
+            if needed.
+        """
+
+        # Get end of month
+        end = self.date + relativedelta(months = 1) - datetime.timedelta(1)
+
+        # Get states of summarized reports
+        states = self.json.get("States", {})
+
+        # Find changed reports
+        reports = []
+
+        for date in getReportDates(reportType, self.src, self.date, end):
+            state = getState(reportType(date, self.src))
+
+            if states.get("%02d" % date.day, {}).get(reportType.summary) != (
+                state):
+                reports += [getReportByType(reportType, date, self.src)]
+
+        # Update their summaries
+        if reports:
+            self.update(reports)
+
+
+
+    def summarize(self, report):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            SUMMARIZE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Summarize given dated report within its day, and aggregate month
+            again.
+        """
+
+        # Get summaries of report's day
+        dd = "%02d" % report.date.day
+        day = self.json["Days"].setdefault(dd, {})
+
+        # Summarize report
+        summary = report.summarize(day.get(report.summary))
+
+        # Nothing to summarize
+        if summary is None:
+            return
+
+        day[report.summary] = summary
+
+        # Keep track of state of report's files
+        self.json.setdefault("States", {}).setdefault(dd, {})[
+            report.summary] = getState(report)
+
+        # Aggregate days
+        self.json["Month"] = aggregate(self.json["Days"].values())
+
+        # Rollup changed
+        self.dirty = True
+        self.changes = None
+
+
+
+    def rebuild(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            REBUILD
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Summarize all dated reports of month from scratch, then store
+            rollup if there was any. Total loop durations of older loop reports
+            cannot be recovered this way: only last ones are known.
+        """
+
+        # Info
+        Logger.info("Rebuilding rollup: " + repr(self))
+
+        # Forget everything
+        self.json = {
+            "Days": {},
+            "Month": {},
+            "States": {}
+        }
+
+        # Get end of month
+        end = self.date + relativedelta(months = 1) - datetime.timedelta(1)
+
+        # Summarize existing reports
+        for reportType in self.reportTypes:
+            for date in getReportDates(reportType, self.src, self.date, end):
+                self.summarize(getReportByType(reportType, date, self.src))
+
+        # Store rollup
+        if self.json["Days"]:
+            self.store()
+
+
+
+    def getDays(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETDAYS
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get daily summaries, keyed by date objects.
+        """
+
+        return dict([(self.date.replace(day = int(d)), summaries)
+            for d, summaries in self.json["Days"].items()])
+
+
+
+class Registry(object):
+
+    """
+    Registry of reports loaded in module, indexed by type and date. Reports
+    can also be found using one of their base types. Evicted reports are no
+    longer known to the registry: callers should get dated reports again
+    instead of holding on to them, otherwise they might end up changing a
+    different instance than the one later lookups return.
+    """
+
+    def __init__(self, capacity = MAX_DATED_REPORTS):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Non-dated reports are kept for the whole lifetime of the registry,
+            while dated ones are kept in least-recently-used order, so that the
+            oldest ones can be evicted once capacity is exceeded.
+        """
+
+        # Test capacity
+        if type(capacity) is not int or capacity < 1:
+            raise ValueError("Registry capacity should be a positive integer.")
+
+        # Store capacity
+        self.capacity = capacity
+
+        # Initialize reports
+        self.reports = collections.OrderedDict()
+        self.datedReports = collections.OrderedDict()
+
+
+
+    def __len__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            LEN
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        return len(self.reports) + len(self.datedReports)
+
+
+
+    def __iter__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ITER
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Iterate over a snapshot of registered reports, so that they can be
+            stored (or evicted) while looping.
+        """
+
+        return iter(list(self.reports.values()) +
+                    list(self.datedReports.values()))
+
+
+
+    def get(self, reportType, date = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GET
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get report using its type and date, and mark it as recently used.
+            Return None if it is not registered.
+        """
+
+        # Non-dated report
+        if date is None:
+            return self.find(reportType, date)
+
+        # Dated report: pop and re-insert it to move it to the recent end
+        key = self.search(self.datedReports, reportType, date)
+        report = self.datedReports.pop(key, None)
+
+        if report is not None:
+            self.datedReports[key] = report
+
+        # Return it
+        return report
+
+
+
+    def find(self, reportType, date = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            FIND
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Find report using its type and date, without changing its usage
+            order.
+        """
+
+        # Get reports of given kind
+        reports = self.reports if date is None else self.datedReports
+
+        return reports.get(self.search(reports, reportType, date))
+
+
+
+    def search(self, reports, reportType, date):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            SEARCH
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Search given reports for the key of one of given type (or of one
+            of its subclasses) and date. Return None if there is none.
+        """
+
+        # Try exact type first
+        key = (reportType, date)
+
+        if key in reports:
+            return key
+
+        # Otherwise: look for an instance of a subclass
+        for key, report in reports.items():
+            if isinstance(report, reportType) and report.date == date:
+                return key
+
+        return None
+
+
+
+    def add(self, report):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ADD
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Register report, then evict least recently used dated reports if
+            capacity was exceeded.
+        """
+
+        # Test report
+        if not isinstance(report, Report):
+            raise TypeError("Only reports can be registered.")
+
+        # Define key
+        key = (report.__class__, report.date)
+
+        # Non-dated report
+        if report.date is None:
+            self.reports[key] = report
+
+        # Dated report
+        else:
+            self.datedReports.pop(key, None)
+            self.datedReports[key] = report
+
+            # Make sure capacity is respected
+            self.evict()
+
+
+
+    def evict(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            EVICT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Evict least recently used dated reports until capacity is
+            respected. Only clean reports are dropped: changed ones are stored
+            first, unless they wait for the active batch to store them, in
+            which case they are kept (capacity can then be exceeded until the
+            batch exits).
+        """
+
+        # Evict oldest reports first
+        for key, report in list(self.datedReports.items()):
+
+            # Capacity respected
+            if len(self.datedReports) <= self.capacity:
+                break
+
+            # Report changed
+            if report.dirty:
+
+                # Report will be stored by active batch
+                if BATCH is not None and BATCH.holds(report):
+                    continue
+
+                # Store it before dropping it
+                report.store()
+
+                # Could not be stored
+                if report.dirty:
+                    continue
+
+            # Info
+            Logger.debug("Evicting report: " + repr(report))
+
+            # Drop it
+            del self.datedReports[key]
+
+
+
+    def clear(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            CLEAR
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Forget about all registered reports.
+        """
+
+        self.reports.clear()
+        self.datedReports.clear()
+
+
+
+class Lock(object):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        LOCK
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Advisory inter-process lock on a set of lock files, to be used as a
+        context manager. Many processes can share a lock to read reports, but
+        only one can hold it exclusively to write them. Lock files are always
+        acquired in the same order, so that processes cannot deadlock.
+
+        Locks are reentrant within a process: nested locks on the same files
+        reuse the already acquired ones. Shared locks are never upgraded (flock
+        upgrades are not atomic), so writers have to lock exclusively from the
+        start. Only exclusive locks create lock files: missing ones (or missing
+        directories) are skipped, since nothing was written there yet. Without
+        fcntl, locks do nothing.
+    """
+
+    def __init__(self, paths, exclusive = False):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Initialize lock attributes
+        self.paths = sorted(set(paths))
+        self.exclusive = exclusive
+        self.acquired = []
+
+
+
+    def __enter__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ENTER
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        self.acquire()
+
+        return self
+
+
+
+    def __exit__(self, *args):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            EXIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        self.release()
+
+
+
+    def acquire(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ACQUIRE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Block until all lock files are locked.
+        """
+
+        # No locking possible
+        if fcntl is None:
+            return
+
+        # Get locking mode
+        mode = fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH
+
+        try:
+            for p in self.paths:
+
+                # Nothing to protect yet
+                if not os.path.isdir(os.path.dirname(p)):
+                    continue
+
+                # Get lock held by process on file (if any)
+                lock = LOCKS.get(p)
+
+                # Not locked yet: lock file
+                if lock is None:
+
+                    # Only writers create lock files
+                    if self.exclusive:
+                        fd = os.open(p, os.O_RDWR | os.O_CREAT, 0o666)
+
+                    # Nothing to protect yet
+                    elif not os.path.isfile(p):
+                        continue
+
+                    else:
+                        fd = os.open(p, os.O_RDONLY)
+
+                    try:
+                        fcntl.flock(fd, mode)
+
+                    except:
+                        os.close(fd)
+                        raise
+
+                    lock = LOCKS[p] = {"fd": fd, "exclusive": self.exclusive,
+                        "count": 0}
+
+                # Shared lock held, but exclusive one needed
+                elif self.exclusive and not lock["exclusive"]:
+                    raise errors.LockUpgrade(p)
+
+                # Keep track of lock
+                lock["count"] += 1
+                self.acquired += [p]
+
+        # Do not keep partial locks
+        except:
+            self.release()
+            raise
+
+
+
+    def release(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            RELEASE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Release acquired lock files, in reverse order.
+        """
+
+        for p in reversed(self.acquired):
+            lock = LOCKS[p]
+            lock["count"] -= 1
+
+            # Last user of lock: unlock file
+            if lock["count"] == 0:
+                del LOCKS[p]
+
+                try:
+                    fcntl.flock(lock["fd"], fcntl.LOCK_UN)
+
+                finally:
+                    os.close(lock["fd"])
+
+        # Reset acquired locks
+        self.acquired = []
+
+
+
+class Transaction(object):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        TRANSACTION
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Read-modify-write transaction on reports, to be used as a context
+        manager. Reports are exclusively locked, reloaded if another process
+        changed them, and stored once when the context exits. If it exits
+        because of an error, reports are reloaded instead, so that partial
+        changes are dropped.
+    """
+
+    def __init__(self, reports):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Initialize transaction attributes
+        self.reports = reports
+        self.lock = Lock([r.getLockPath() for r in reports], True)
+
+
+
+    def __enter__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ENTER
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Make sure reports' directories exist, so they can be locked
+        for report in self.reports:
+            report.directory.touch()
+
+        # Lock reports
+        self.lock.acquire()
+
+        # Make sure reports are up-to-date
+        try:
+            for report in self.reports:
+                self.sync(report)
+
+        except:
+            self.lock.release()
+            raise
+
+        # Return transaction's reports
+        return self.reports[0] if len(self.reports) == 1 else self.reports
+
+
+
+    def __exit__(self, error, *args):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            EXIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        try:
+
+            # Success: store reports
+            if error is None:
+                commit(self.reports)
+
+            # Otherwise: drop changes
+            else:
+                for report in self.reports:
+                    Logger.warning("Transaction failed: reloading " +
+                        repr(report))
+                    report.load(False)
+
+        finally:
+            self.lock.release()
+
+
+
+    def sync(self, report):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            SYNC
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Reload report if its files changed on disk, or if it was never
+            loaded.
+        """
+
+        # Report is up-to-date
+        if report.stat is not None and not report.isOutdated():
+            return
+
+        # Nothing to load
+        if not report.exists():
+            return
+
+        # Do not discard pending changes
+        if report.dirty and report.stat is not None:
+            Logger.warning(repr(report) + " changed on disk, but has " +
+                "unsaved changes: keeping them.")
+            return
+
+        # Reload report
+        Logger.debug("Reloading report for transaction: " + repr(report))
+        report.load()
+
+
+
+class Batch(object):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        BATCH
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Batch of dated entries, to be used as a context manager. While it is
+        active, dated entries set using setDatedEntries() (whatever their
+        report type or branch) are only applied to their reports, which are
+        then stored together, exactly once, when the outermost batch exits
+        (even if it exits because of an error, since applied entries are
+        valid on their own).
+    """
+
+    def __init__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Initialize touched reports (in order)
+        self.reports = []
+
+        # Initialize whether batch is nested within another one
+        self.nested = False
+
+
+
+    def __enter__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ENTER
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        global BATCH
+
+        # Nested batch: let outermost one store reports
+        if BATCH is not None:
+            self.nested = True
+
+        # Otherwise: activate batch
+        else:
+            BATCH = self
+
+        return self
+
+
+
+    def __exit__(self, *args):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            EXIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        global BATCH
+
+        # Nested batch: nothing to do
+        if self.nested:
+            return
+
+        # Deactivate batch
+        BATCH = None
+
+        # Info
+        Logger.debug("Storing " + str(len(self.reports)) + " report(s) " +
+            "touched by batch.")
+
+        # Store touched reports at once
+        commit(self.reports)
+
+
+
+    def add(self, reports):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ADD
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Keep track of given touched reports.
+        """
+
+        for report in reports:
+            if not self.holds(report):
+                self.reports += [report]
+
+
+
+    def holds(self, report):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            HOLDS
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Check whether batch touched given report.
+        """
+
+        return any([r is report for r in self.reports])
+
+
+
+
+
+
+# REPORT MANAGEMENT FUNCTIONS
+def reset():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        RESET
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Reset reports in module (re-instanciate and reload default reports).
+    """
+
+    # Forget about previously loaded reports, manifests and rollups
+    REPORTS.clear()
+    MANIFESTS.clear()
+    ROLLUPS.clear()
+    STALE_ROLLUPS.clear()
+
+    # Instanciate default reports, load them, and register them
+    for report in [PumpReport(), StickReport(), CGMReport(), SFTPReport()]:
+        report.load(False)
+        REPORTS.add(report)
+
+
+
+def getReportByType(reportType, date = None, directory = path.REPORTS,
+    strict = True):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETREPORTBYTYPE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Check if module already knows about report using its type (class). If
+        yes, return it, otherwise instanciate and load it, then return a
+        reference to it.
+
+        If "strict" is set to "True", then report will be loading strictly.
+
+        # TODO
+        Notes: - Only pre-defined types of reports can be handled so far
+    """
+
+    # Test date
+    if date is not None and type(date) is not datetime.date:
+        raise TypeError("Invalid date.")
+
+    # Try to get report in existing ones
+    report = REPORTS.get(reportType, date)
+
+    if report is not None:
+
+        # Report's file changed on disk: reload it, unless that would discard
+        # pending changes
+        if report.isOutdated():
+            if report.dirty:
+                Logger.warning(repr(report) + " changed on disk, but has " +
+                    "unsaved changes: keeping them.")
+            else:
+                Logger.debug("Reloading outdated report: " + repr(report))
+                report.load(strict)
+
+        return report
+
+    # Instanciate report
+    # Report
+    if date is None:
+        report = reportType(directory)
+
+    # Dated report
+    else:
+        report = reportType(date, directory)
+    
+    # Load it
+    report.load(strict)
+
+    # Register it
+    REPORTS.add(report)
+
+    # Return its reference
+    return report
+
+
+
+def storeReportsByType(reportType, dates = []):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        STOREREPORTSBYTYPE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Store all reports with matching type (class) currently loaded in module.
+    """
+
+    # Test dates
+    if not all([type(date) is datetime.date for date in dates]):
+        raise TypeError("Invalid dates.")
+
+    # Non-dated report
+    if not dates:
+        dates = [None]
+
+    # Get loaded reports with matching type and date
+    reports = [REPORTS.find(reportType, date) for date in dates]
+
+    # Store them together
+    commit([report for report in reports if report is not None])
+
+
+
+def storeReports():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        STOREREPORTS
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Store all reports currently loaded in module.
+    """
+
+    # Only changed reports need to be stored
+    flush()
+
+
+
+def flush():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        FLUSH
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Store all loaded reports which changed since they were last loaded or
+        stored, in one pass. Return number of stored reports.
+    """
+
+    # Get changed reports
+    reports = [report for report in REPORTS if report.dirty]
+
+    # Info
+    Logger.debug("Flushing %s report(s).", len(reports))
+
+    # Store them together
+    n = commit(reports)
+
+    # Update stale rollups
+    for src, year, month in STALE_ROLLUPS.keys():
+        getRollup(datetime.date(year, month, 1), path.Path(src))
+
+    return n
+
+
+
+def transaction(*reports):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        TRANSACTION
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get a read-modify-write transaction on given reports, e.g.:
+
+            with reporter.transaction(report) as report:
+                report.increment(["A", "B"])
+
+        Reports are reloaded under lock if needed, then stored once.
+    """
+
+    return Transaction(list(reports))
+
+
+
+def batch():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        BATCH
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get a batch of dated entries, e.g.:
+
+            with reporter.batch():
+                reporter.setDatedEntries(TreatmentsReport, ["A"], entries)
+                reporter.setDatedEntries(HistoryReport, ["B"], entries)
+
+        Each touched report is stored once, when the batch exits.
+    """
+
+    return Batch()
+
+
+
+def commit(reports, overwrite = True):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        COMMIT
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Atomically store given reports: their content is first written to
+        temporary files within their directories, which then replace the
+        actual report files. Directories are synced once, after all renames,
+        if full durability is required. Unchanged reports are skipped, and
+        journaled reports only append their changes, unless they need to be
+        compacted. Reports are exclusively locked meanwhile. Return number of
+        stored reports.
+    """
+
+    # Make sure reports' directories exist, so they can be locked
+    for report in reports:
+        report.directory.touch()
+
+    # Keep other processes from reading or writing reports meanwhile
+    with Lock([r.getLockPath() for r in reports], True):
+        stored = write(reports, overwrite)
+
+    # Notify stored reports (once unlocked, since they might need other ones)
+    for report, created in stored:
+        report.onStore(created)
+
+    return len(stored)
+
+
+
+def write(reports, overwrite):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        WRITE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Store given reports, which are already locked (see commit). Return
+        stored reports, with a flag indicating whether their file was created.
+    """
+
+    # Overwrite right check (before touching anything)
+    if not overwrite:
+        for report in reports:
+            if report.exists():
+                raise errors.NoOverwriting(repr(report), [])
+
+    # Initialize pending writes and journal appends
+    pending = []
+    appends = []
+
+    # Write temporary files
+    try:
+        for report in reports:
+
+            # Nothing changed
+            if not report.dirty and report.exists():
+                Logger.debug("Report unchanged: %r", report)
+                continue
+
+            # Journaled report: only append changes
+            if report.isAppendable():
+                appends += [report]
+                continue
+
+            # Info
+            Logger.debug("Storing report: %r", report)
+
+            # Another process changed report since it was loaded
+            if report.isOutdated():
+                Logger.warning(repr(report) + " changed on disk since it " +
+                    "was loaded: overwriting it (use a transaction to " +
+                    "avoid this).")
+
+            # Write content to temporary file (with a new generation)
+            tmp = writeTemporaryFile(report.directory.path,
+                report.dump(report.generation + 1))
+            pending += [(report, tmp, not report.exists())]
+
+    # Do not leave temporary files behind
+    except:
+        for _, tmp, _ in pending:
+            os.remove(tmp)
+        raise
+
+    # Replace report files
+    for report, tmp, _ in pending:
+        os.rename(tmp, report.directory.path + report.name)
+
+        # Report is now synced with its file
+        report.dirty = False
+        report.changes = []
+
+        # Journal is now folded into report's file, which has a new
+        # generation: should a crash keep journal from being discarded, it
+        # will not be replayed on top of said file
+        report.generation += 1
+
+        if report.journal:
+            report.discardJournal()
+
+        # Keep track of state of report's files
+        report.stat = report.getStat()
+
+        # Cache stored content
+        if CACHE:
+            report.writeCache(report.stat[0],
+                report.getContent(report.generation))
+
+    # Append journaled changes
+    for report in appends:
+        report.append()
+
+    # Sync directories once
+    if DURABILITY == "full":
+        for directory in set([r.directory.path for r, _, _ in pending]):
+            syncDirectory(directory)
+
+    return ([(report, created) for report, _, created in pending] +
+            [(report, False) for report in appends])
+
+
+
+def writeTemporaryFile(directory, data):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        WRITETEMPORARYFILE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Write data to a new hidden temporary file within given directory (so
+        it can be renamed atomically), and return its path.
+    """
+
+    # Create temporary file
+    fd, tmp = tempfile.mkstemp(prefix = ".", suffix = ".tmp", dir = directory)
+
+    # Write data
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+
+            # Make sure data reached the disk
+            if DURABILITY != "none":
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Give permissions (same as other report files)
+        os.chmod(tmp, 0o777)
+
+    # Do not leave it behind
+    except:
+        os.remove(tmp)
+        raise
+
+    return tmp
+
+
+
+def syncDirectory(directory):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        SYNCDIRECTORY
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Sync given directory, so that renames within it survive power losses.
+    """
+
+    fd = os.open(directory, os.O_RDONLY)
+
+    try:
+        os.fsync(fd)
+
+    finally:
+        os.close(fd)
+
+
+
+
+
+
+# GENERAL FUNCTIONS
+def isBranchValid(branch):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ISBRANCHVALID
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        A branch is a list of keys, which lead to a value in a dict. All its
+        values should be strings.
+    """
+
+    return type(branch) is list and all([type(b) is str for b in branch])
+
+
+
+def getReportDates(reportType, src = path.REPORTS, start = None, end = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETREPORTDATES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get corresponding sorted date objects for a dated report, eventually
+        limited to [start, end], using the manifest of the source directory.
+    """
+
+    # Test report type
+    if not issubclass(reportType, DatedReport):
+        raise TypeError("Dated report type needed.")
+
+    # Get manifest of source directory and make sure it is up-to-date
+    manifest = getManifest(src)
+    manifest.refresh()
+
+    # Get dates
+    return manifest.getDates(reportType.name, start, end)
+
+
+
+def iterReportDates(reportType, src = path.REPORTS, end = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ITERREPORTDATES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Generate date objects of existing dated reports in reverse
+        chronological order, starting from given end date (if any). Year, month
+        and day directories are only listed once the generator reaches them.
+    """
+
+    # Test report type
+    if not issubclass(reportType, DatedReport):
+        raise TypeError("Dated report type needed.")
+
+    # No source directory: no reports
+    if not os.path.isdir(src.path):
+        return
+
+    # Get limits to skip directories newer than end date
+    if end is not None:
+        limits = [str(end.year), "%02d" % end.month, "%02d" % end.day]
+    else:
+        limits = [None, None, None]
+
+    # Loop on years, starting with the latest one
+    for year in reversed(path.listNumericDirectories(src.path)):
+
+        # Skip years after end
+        if limits[0] is not None and int(year) > int(limits[0]):
+            continue
+
+        # Define year path
+        y = src.path + year + os.sep
+
+        # Loop on months
+        for month in reversed(path.listNumericDirectories(y)):
+
+            # Skip months after end
+            if year == limits[0] and int(month) > int(limits[1]):
+                continue
+
+            # Define month path
+            m = y + month + os.sep
+
+            # Get archived days
+            archived = archives.listArchivedDays(m, reportType.name)
+
+            # Loop on days
+            for day in sorted(set(path.listNumericDirectories(m) + archived),
+                reverse = True):
+
+                # Skip days after end
+                if (year == limits[0] and int(month) == int(limits[1]) and
+                    int(day) > int(limits[2])):
+                    continue
+
+                # Report exists: generate its date
+                if (day in archived or
+                    os.path.isfile(m + day + os.sep + reportType.name)):
+                    yield datetime.date(int(year), int(month), int(day))
+
+
+
+def getManifest(src = path.REPORTS):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETMANIFEST
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get manifest of given source directory. Only one manifest is
+        instanciated per source directory.
+    """
+
+    # Instanciate manifest if needed
+    if src.path not in MANIFESTS:
+        MANIFESTS[src.path] = Manifest(src)
+
+    # Return it
+    return MANIFESTS[src.path]
+
+
+
+def getRollup(date, src = path.REPORTS):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETROLLUP
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get rollup of month of given date within given source directory. Only
+        one rollup is instanciated per month. Missing rollups are built from
+        existing reports, and stale ones are updated.
+    """
+
+    # Get rollup
+    key = (src.path, date.year, date.month)
+    rollup = ROLLUPS.get(key)
+
+    # Instanciate rollup if needed
+    if rollup is None:
+        rollup = ROLLUPS[key] = Rollup(date, src)
+
+        # Load or build it
+        if rollup.exists():
+            rollup.load()
+        else:
+            rollup.rebuild()
+
+    # Reload it if another process changed it
+    elif rollup.isOutdated() and not rollup.dirty:
+        rollup.load()
+
+    # Summarize reports stored since it was last updated
+    stale = STALE_ROLLUPS.get(key)
+
+    if stale:
+        rollup.update([getReportByType(reportType, date, src)
+            for reportType, date in stale])
+        del STALE_ROLLUPS[key]
+
+    # Return it
+    return rollup
+
+
+
+def invalidateRollup(report):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        INVALIDATEROLLUP
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Mark rollup of given stored dated report as stale, so that the report
+        gets summarized again the next time the rollup is needed.
+    """
+
+    key = (report.src.path, report.date.year, report.date.month)
+
+    STALE_ROLLUPS.setdefault(key, set()).add((type(report), report.date))
+
+
+
+def getSummaries(start, end, src = path.REPORTS):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETSUMMARIES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get daily summaries of reports within [start, end], keyed by date
+        objects, using monthly rollups.
+    """
+
+    # Initialize summaries
+    summaries = {}
+
+    # Loop on months
+    month = start.replace(day = 1)
+
+    while month <= end:
+        for date, summary in getRollup(month, src).getDays().items():
+            if start <= date <= end:
+                summaries[date] = summary
+
+        month += relativedelta(months = 1)
+
+    return summaries
+
+
+
+def getMonthlySummaries(start, end, src = path.REPORTS):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETMONTHLYSUMMARIES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get aggregated summaries of months within [start, end] (dates), keyed
+        by their first day. Months without reports are skipped. Use aggregate()
+        to get yearly summaries out of them.
+    """
+
+    # Initialize summaries
+    summaries = {}
+
+    # Loop on months
+    month = start.replace(day = 1)
+
+    while month <= end:
+        rollup = getRollup(month, src)
+
+        if rollup.json["Days"]:
+            summaries[month] = rollup.json["Month"]
+
+        month += relativedelta(months = 1)
+
+    return summaries
+
+
+
+def aggregate(summaries):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        AGGREGATE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Aggregate given (daily or monthly) summaries: errors and loop stats are
+        added up, while BG means and times in range are weighted using BG
+        counts.
+    """
+
+    # Initialize aggregate
+    result = {}
+
+    # Add up error counts
+    errors = [s["Errors"] for s in summaries if "Errors" in s]
+
+    if errors:
+        result["Errors"] = reduce(addCounts, errors, {})
+
+    # Add up loop stats
+    loops = [s["Loop"] for s in summaries if "Loop" in s]
+
+    if loops:
+        result["Loop"] = dict([(k, sum([l[k] for l in loops]))
+            for k in ["Start", "End", "Duration"]])
+
+    # Weigh BG stats
+    BGs = [s["BG"] for s in summaries if "BG" in s]
+
+    if BGs:
+        n = sum([b["Count"] for b in BGs])
+        result["BG"] = {"Count": n, "Mean": None, "TIR": None}
+
+        if n:
+            for k, precision in [("Mean", 2), ("TIR", 3)]:
+                result["BG"][k] = round(sum([b[k] * b["Count"] for b in BGs
+                    if b["Count"]]) / n, precision)
+
+    return result
+
+
+
+def addCounts(a, b):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ADDCOUNTS
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Add counts of second (nested) dict to first one, and return it.
+    """
+
+    for key, value in b.items():
+        if type(value) is dict:
+            addCounts(a.setdefault(key, {}), value)
+        else:
+            a[key] = a.get(key, 0) + value
+
+    return a
+
+
+
+def getModificationTime(p):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETMODIFICATIONTIME
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get modification time of given file/directory, or None if it does not
+        exist.
+    """
+
+    try:
+        return os.stat(p).st_mtime
+
+    except OSError:
+        return None
+
+
+
+def getFileStat(p):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETFILESTAT
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get state of given file (inode, size and modification time), or None
+        if it does not exist. Since files are replaced atomically when stored,
+        their inode changes on each write.
+    """
+
+    try:
+        s = os.stat(p)
+
+    except OSError:
+        return None
+
+    return (s.st_ino, s.st_size, s.st_mtime)
+
+
+
+def getState(report):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETSTATE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get state of given report's files, as stored within JSON files (i.e.
+        using lists instead of tuples).
+    """
+
+    return [None if s is None else list(s) for s in report.getStat()]
+
+
+
+def getRecentDatedEntries(reportType, now, branch, n = 1, src = path.REPORTS,
+    strict = False):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETRECENTDATEDENTRIES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get, merge, and return the dated entries at the tip of the given branch
+        in the "n" most recent reports, in which said branch exists.
+        Entries are returned as a read-only merged view (see getDatedEntries).
+                
+        If "strict" is set to "True", "n" defines the number of days from today
+        the function will try looking back for content. Otherwise, it will try
+        to find "n" reports, no matter how old they are.
+    """
+
+    # Test report type
+    if not issubclass(reportType, DatedReport):
+        raise TypeError("Dated report type needed.")
+
+    # Get current date
+    today = now.date()
+    
+    # Initialize oldest possible date
+    oldest = datetime.date(1970, 1, 1)
+
+    # Strict search: look up to "n" days before
+    if strict:
+        oldest = today - datetime.timedelta(days = n - 1)
+
+    # Strict search: get dates of reports within search range, starting with
+    # the latest one
+    if strict:
+        dates = reversed(getReportDates(reportType, src, oldest, today))
+
+    # Otherwise: lazily walk back in time, so that only the directories needed
+    # to find enough reports are visited
+    else:
+        dates = iterReportDates(reportType, src, today)
+
+    # Initialize entries of each report
+    layers = []
+
+    # Initialize number of reports found with given branch
+    nReportsFoundWithBranch = 0
+
+    # Loop on found dates
+    for date in dates:
+
+        # Initialize and load report
+        report = getReportByType(reportType, date, src)
+
+        # Get new entries
+        try:
+            layers += [report.get(branch)]
+            nReportsFoundWithBranch += 1
+
+        # Keep going if branch is missing from current report
+        except errors.MissingBranch:
+            pass
+
+        # Enough data found
+        if nReportsFoundWithBranch == n:
+            break
+
+    # Not enough reports
+    if nReportsFoundWithBranch < n:
+        Logger.warning("Could not find " + str(n) + " recent report(s) with " +
+            "given branch. Found: " + str(nReportsFoundWithBranch))
+
+    # Return merged view of entries
+    return lib.MergedView(*layers)
+
+
+
+def getDatedEntries(reportType, dates, branch, src = path.REPORTS,
+    strict = False):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETDATEDENTRIES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Try to get dated entries in reports with given dates.
+
+        If "strict" is set to "True", then the given branch HAS to exist within
+        each report.
+
+        Entries are returned as a read-only merged view of the reports' content,
+        which can be turned into an actual dict using its 'materialize' method.
+    """
+
+    # Test report type
+    if not issubclass(reportType, DatedReport):
+        raise TypeError("Dated report type needed.")
+
+    # Test dates
     if not all([type(d) is datetime.date for d in dates]):
         raise TypeError("Can only find dated reports with date objects.")
 
-    # Initialize dict for merged entries
-    json = {}
+    # Initialize entries of each report
+    layers = []
 
     # Loop on given dates
     for date in dates:
 
-        # Get entries for given date and merge them to previously gathered ones
+        # Get entries for given date
         try:
             report = getReportByType(reportType, date, src, strict)
-            json = lib.mergeDicts(json, report.get(branch))
+            layers += [report.get(branch)]
 
         # Branch does not exist
         except errors.MissingBranch:
@@ -1170,8 +3497,8 @@ def getDatedEntries(reportType, dates, branch, src = path.REPORTS,
             if strict:
                 raise
 
-    # Return entries
-    return json
+    # Return merged view of entries
+    return lib.MergedView(*layers)
 
 
 
@@ -1181,7 +3508,8 @@ def setDatedEntries(reportType, branch, entries, src = path.REPORTS):
     ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         SETDATEDENTRIES
     ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        Store a set of dated entries in their corresponding dated reports.
+        Store a set of dated entries in their corresponding dated reports. If
+        a batch is active, reports are only stored once it exits.
     """
 
     # Test report type
@@ -1204,15 +3532,22 @@ def setDatedEntries(reportType, branch, entries, src = path.REPORTS):
             strict = False)
 
     # Add values to reports
-    for key, value in entries.items():
-        reports[key.date()].set(value, branch + [lib.formatTime(key)], True)
+    times = entries.keys()
+
+    for T, key in zip(times, codec.encodeAll(times)):
+        reports[T.date()].set(entries[T], branch + [key], True)
 
-    # Store reports
-    storeReportsByType(reportType, dates)
+    # Batch: store reports later
+    if BATCH is not None:
+        BATCH.add([reports[date] for date in dates])
+
+    # Otherwise: store reports now
+    else:
+        storeReportsByType(reportType, dates)
 
 
 
-def getMonthlyErrors(today, nMonths):
+def getMonthlyErrors(today, nMonths, src = path.REPORTS):
 
     """
     ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -1220,7 +3555,8 @@ def getMonthlyErrors(today, nMonths):
     ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         Get all reported errors over the last "n" months and merge them into a
         single JSON object, in which every error report's content is stored
-        under its corresponding date as a key.
+        under its corresponding date as a key. Errors are read from monthly
+        rollups, once they were checked against the error reports' files.
     """
 
     # Type check date
@@ -1238,22 +3574,25 @@ def getMonthlyErrors(today, nMonths):
     # Define first month day
     start = today.replace(day = 1) - relativedelta(months = nMonths - 1)
 
-    # Get all dates of error reports, and keep the ones that are within current
-    # month
-    dates = getReportDates(ErrorsReport)
-    filteredDates = [d for d in dates if start <= d]
+    # Define last month day
+    end = today.replace(day = 1) + relativedelta(months = 1, days = -1)
 
     # Initialize dict for merged errors
     json = {}
 
-    # Loop on found dates
-    for date in sorted(filteredDates):
+    # Make sure rollups know about latest errors
+    month = start
 
-        # Initialize and load report
-        report = getReportByType(ErrorsReport, date)
+    while month <= end:
+        getRollup(month, src).check(ErrorsReport)
+        month += relativedelta(months = 1)
+
+    # Loop on summarized days
+    for date, summary in getSummaries(start, end, src).items():
 
         # Add error entries
-        json[lib.formatDate(date)] = report.get()
+        if "Errors" in summary:
+            json[lib.formatDate(date)] = copy.deepcopy(summary["Errors"])
 
     # Return merged errors
     return json
@@ -1281,8 +3620,16 @@ def getSFTPReport():
 
 
 
-# Initialize reports (for external imports)
-REPORTS = None
+# Initialize reports, manifests, rollups and locks held by process (for external
+# imports)
+REPORTS = Registry()
+MANIFESTS = {}
+ROLLUPS = {}
+STALE_ROLLUPS = {}
+LOCKS = {}
+
+# Initialize active batch
+BATCH = None
 
 # Reset them
 reset()
@@ -0,0 +1,553 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    series
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Overview: Columnar time series store for dated entries (e.g. BGs). Each day
+              of data is kept next to its dated report, as two binary columns:
+              times (int64 epoch seconds) and values (float32). Columns are
+              read through memory maps, so no parsing is needed.
+
+    Notes:    - Naive datetimes are encoded as if they were in UTC, which makes
+                encoding reversible without any timezone information.
+              - Dated reports remain the source of truth: a day is rebuilt from
+                its report whenever its columns are missing or outdated, i.e.
+                when the state of the report's files differs from the one
+                stamped on the columns.
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import os
+import marshal
+import datetime
+import numpy as np
+
+
+
+# USER LIBRARIES
+import lib
+import path
+import codec
+import logger
+import reporter
+import archives
+
+
+
+# Define instances
+Logger = logger.Logger("series")
+
+
+
+# CONSTANTS
+# Column types (little-endian)
+T_TYPE = np.dtype("<i8")
+Y_TYPE = np.dtype("<f4")
+
+# Number of decimals kept when converting values back to floats (float32
+# values are not exact)
+PRECISION = 2
+
+
+
+# CLASSES
+class Series(object):
+
+    """
+    One day of dated entries of a given dated report type, stored as two
+    binary columns within the report's directory.
+    """
+
+    def __init__(self, reportType, date, src = path.REPORTS):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Test report type
+        if not issubclass(reportType, reporter.DatedReport):
+            raise TypeError("Dated report type needed.")
+
+        # Test date
+        if type(date) is not datetime.date:
+            raise TypeError("Date object needed.")
+
+        # Initialize series attributes
+        self.reportType = reportType
+        self.date = date
+        self.src = src
+        self.directory = path.Path(src.path)
+        self.directory.expand(lib.formatDate(date))
+
+
+
+    def __repr__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            REPR
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        return ("'" + self.reportType.name + "' (" +
+            lib.formatDate(self.date) + ")")
+
+
+
+    def getPaths(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETPATHS
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get paths of time and value columns (hidden files named after the
+            report).
+        """
+
+        p = self.directory.path + "." + self.reportType.name
+
+        return (p + ".t", p + ".y")
+
+
+
+    def getStampPath(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETSTAMPPATH
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get path of stamp, which holds the state of the report's files
+            columns are up-to-date with.
+        """
+
+        return self.directory.path + "." + self.reportType.name + ".stamp"
+
+
+
+    def getReportState(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETREPORTSTATE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get current state of the report's files (without loading it).
+        """
+
+        return self.reportType(self.date, self.src).getStat()
+
+
+
+    def readStamp(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            READSTAMP
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Read state of the report's files stamped on columns, or None if
+            there is none.
+        """
+
+        try:
+            with open(self.getStampPath(), "rb") as f:
+                return marshal.load(f)
+
+        except (IOError, EOFError, ValueError, TypeError):
+            return None
+
+
+
+    def stamp(self, state = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            STAMP
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Stamp columns with given state of the report's files (current one
+            by default), meaning they are up-to-date with it.
+        """
+
+        # Default state
+        if state is None:
+            state = self.getReportState()
+
+        # Make sure directory exists
+        self.directory.touch()
+
+        # Write stamp atomically
+        tmp = reporter.writeTemporaryFile(self.directory.path,
+            marshal.dumps(state))
+        os.rename(tmp, self.getStampPath())
+
+
+
+    def getSize(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETSIZE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get number of entries in columns, or None if they are missing or
+            inconsistent.
+        """
+
+        # Get column paths
+        tPath, yPath = self.getPaths()
+
+        # Get their sizes
+        try:
+            tSize = os.path.getsize(tPath)
+            ySize = os.path.getsize(yPath)
+
+        except OSError:
+            return None
+
+        # Get number of entries
+        n = tSize // T_TYPE.itemsize
+
+        # Check consistency
+        if tSize % T_TYPE.itemsize or ySize != n * Y_TYPE.itemsize:
+            return None
+
+        return n
+
+
+
+    def isStale(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            ISSTALE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Check whether columns are missing, broken, or not up-to-date with
+            the report they are based on (i.e. report's files changed since
+            columns were stamped).
+        """
+
+        # Get state of report's files
+        state = self.getReportState()
+
+        # No report: nothing to rebuild columns from
+        if state[0] is None:
+            return False
+
+        # Columns are missing, broken, or outdated
+        return self.getSize() is None or self.readStamp() != state
+
+
+
+    def rebuild(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            REBUILD
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Rebuild columns from the dated report they are based on.
+        """
+
+        # Info
+        Logger.debug("Rebuilding series: " + repr(self))
+
+        # Get state of report's files before reading it
+        state = self.getReportState()
+
+        # Write columns, then stamp them
+        self.write(*self.convert())
+        self.stamp(state)
+
+
+
+    def convert(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            CONVERT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Convert numeric entries of the dated report series is based on into
+            columns.
+        """
+
+        # Load report
+        report = self.reportType(self.date, self.src)
+        report.load()
+
+        # Keep numeric entries only
+        entries = dict([(T, y) for (T, y) in report.get().items()
+            if lib.isRealNumber(y)])
+
+        return encode(entries)
+
+
+
+    def update(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            UPDATE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Make sure columns are up-to-date with their report.
+        """
+
+        if self.isStale():
+            self.rebuild()
+
+
+
+    def read(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            READ
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get (read-only) memory maps of time and value columns, sorted by
+            time.
+        """
+
+        # Get number of entries
+        n = self.getSize()
+
+        # Archived report: convert it on the fly instead of recreating its day
+        if n is None and archives.isArchived(self.directory.path,
+            self.reportType.name):
+            return self.convert()
+
+        # No entries (empty files cannot be memory mapped)
+        if not n:
+            return (np.empty(0, T_TYPE), np.empty(0, Y_TYPE))
+
+        # Map columns
+        tPath, yPath = self.getPaths()
+
+        return (np.memmap(tPath, T_TYPE, "r", shape = (n, )),
+                np.memmap(yPath, Y_TYPE, "r", shape = (n, )))
+
+
+
+    def write(self, t, y):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            WRITE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Replace columns with given (sorted) ones.
+        """
+
+        # Make sure directory exists
+        self.directory.touch()
+
+        # Write columns atomically
+        for p, column, dtype in zip(self.getPaths(), [t, y], [T_TYPE, Y_TYPE]):
+            tmp = reporter.writeTemporaryFile(self.directory.path,
+                np.asarray(column, dtype).tostring())
+            os.rename(tmp, p)
+
+
+
+    def append(self, t, y):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            APPEND
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Add given (sorted) entries to columns. Entries which are newer than
+            the stored ones are simply appended. Otherwise, both are merged
+            (new values win on identical times) and columns are rewritten.
+        """
+
+        # Nothing to add
+        if len(t) == 0:
+            return
+
+        # Read current columns (as regular arrays, since files get replaced)
+        T, Y = [np.array(column) for column in self.read()]
+
+        # Only newer entries: append them
+        if len(T) == 0 or t[0] > T[-1]:
+
+            # Make sure directory exists
+            self.directory.touch()
+
+            for p, column, dtype in zip(self.getPaths(), [t, y],
+                [T_TYPE, Y_TYPE]):
+                with open(p, "ab") as f:
+                    f.write(np.asarray(column, dtype).tostring())
+
+        # Otherwise: merge them, keeping last value for each time
+        else:
+            T = np.concatenate([T, np.asarray(t, T_TYPE)])
+            Y = np.concatenate([Y, np.asarray(y, Y_TYPE)])
+
+            # Find last occurence of each time
+            T, indices = np.unique(T[::-1], return_index = True)
+            Y = Y[::-1][indices]
+
+            self.write(T, Y)
+
+
+
+# FUNCTIONS
+def encode(entries):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ENCODE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Convert dated entries (keyed by datetime objects or formatted times)
+        into sorted time (epoch seconds) and value columns.
+    """
+
+    # Convert times (all at once)
+    t = codec.toEpochs(entries.keys())
+    y = entries.values()
+
+    # Sort columns
+    order = np.argsort(t, kind = "mergesort")
+
+    return (np.asarray(t, T_TYPE)[order], np.asarray(y, Y_TYPE)[order])
+
+
+
+def encodeTime(T):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ENCODETIME
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Convert datetime object (or formatted time) to epoch seconds.
+    """
+
+    return codec.toEpochs([T])[0]
+
+
+
+def decode(t):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        DECODE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Convert time column back to datetime objects.
+    """
+
+    return [datetime.datetime.utcfromtimestamp(T) for T in t.tolist()]
+
+
+
+def decodeValues(y):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        DECODEVALUES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Convert value column back to floats.
+    """
+
+    return np.round(np.asarray(y, np.float64), PRECISION).tolist()
+
+
+
+def store(reportType, entries, src = path.REPORTS):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        STORE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Add dated entries (keyed by datetime objects) to their corresponding
+        daily series. Meant to be called right before entries are stored in
+        their dated reports, so that columns can still be checked against
+        them, then followed by stamp() once they were.
+    """
+
+    # Test values
+    if not all([type(T) is datetime.datetime for T in entries]):
+        raise TypeError("Cannot add non dated values to series.")
+
+    # Group entries by day
+    days = {}
+
+    for T, y in entries.items():
+        days.setdefault(T.date(), {})[T] = y
+
+    # Add them to series
+    for date, dayEntries in sorted(days.items()):
+        series = Series(reportType, date, src)
+
+        # Make sure series is up-to-date before appending to it
+        series.update()
+        series.append(*encode(dayEntries))
+
+
+
+def stamp(reportType, entries, src = path.REPORTS):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        STAMP
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Stamp daily series of given dated entries (see store), once they were
+        stored in their dated reports.
+    """
+
+    for date in set([T.date() for T in entries]):
+        Series(reportType, date, src).stamp()
+
+
+
+def query(reportType, start, end, src = path.REPORTS):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        QUERY
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get time (epoch seconds) and value arrays of entries within [start,
+        end], sorted by time.
+    """
+
+    # Test limits
+    if type(start) is not datetime.datetime or type(start) is not type(end):
+        raise TypeError("Start/end times have to be datetime objects.")
+
+    # Initialize columns
+    ts = []
+    ys = []
+
+    # Loop on days
+    date = start.date()
+
+    while date <= end.date():
+        series = Series(reportType, date, src)
+
+        # Make sure series is up-to-date
+        series.update()
+
+        # Read it
+        t, y = series.read()
+        ts += [t]
+        ys += [y]
+
+        date += datetime.timedelta(days = 1)
+
+    # Merge days
+    t = np.concatenate(ts)
+    y = np.concatenate(ys)
+
+    # Keep entries within limits
+    a = np.searchsorted(t, encodeTime(start), "left")
+    b = np.searchsorted(t, encodeTime(end), "right")
+
+    return (t[a:b], y[a:b])
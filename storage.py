@@ -0,0 +1,762 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Title:    storage
+
+    Author:   David Leclerc
+
+    Version:  0.1
+
+    Date:     16.10.2026
+
+    License:  GNU General Public License, Version 3
+              (http://www.gnu.org/licenses/gpl.html)
+
+    Overview: SQLite storage engine for reports. Reports keep the same branch
+              API as the JSON ones, but their timestamp-keyed entries live in
+              an indexed table, so that dated entries can be queried across
+              multiple days at once.
+
+    Notes:    Usage: python storage.py migrate [SRC] [DATABASE]
+
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+# LIBRARIES
+import os
+import re
+import sys
+import json
+import sqlite3
+import datetime
+
+
+
+# USER LIBRARIES
+import lib
+import codec
+import path
+import logger
+import errors
+import reporter
+
+
+
+# Define instances
+Logger = logger.Logger("storage")
+
+
+
+# CONSTANTS
+DATABASE = "reports.db"
+
+# Format of timestamp keys of dated entries
+TIMESTAMP = re.compile(r"^\d{4}\.\d{2}\.\d{2} - \d{2}:\d{2}:\d{2}$")
+
+# Report types to migrate
+REPORT_TYPES = [reporter.BGReport,
+                reporter.PumpReport,
+                reporter.CGMReport,
+                reporter.StickReport,
+                reporter.TreatmentsReport,
+                reporter.HistoryReport,
+                reporter.LoopReport,
+                reporter.ErrorsReport,
+                reporter.SFTPReport]
+
+
+
+# CLASSES
+class Database(object):
+
+    """
+    SQLite database holding reports. Each report's content is split in two:
+    the timestamp-keyed entries go in the 'entries' table, indexed by type,
+    branch and timestamp, while the rest of the JSON goes in 'reports'.
+    """
+
+    def __init__(self, filename = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Default database file
+        if filename is None:
+            filename = path.REPORTS.path + DATABASE
+
+        # Initialize database attributes
+        self.filename = filename
+        self.connection = None
+
+
+
+    def __repr__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            REPR
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        return "'" + self.filename + "'"
+
+
+
+    def connect(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            CONNECT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Open connection to database (if needed) and make sure its tables
+            exist. Return connection.
+        """
+
+        # Already connected
+        if self.connection is not None:
+            return self.connection
+
+        # Info
+        Logger.debug("Connecting to database: " + repr(self))
+
+        # Make sure database's directory exists
+        path.Path(os.path.dirname(self.filename)).touch()
+
+        # Connect
+        self.connection = sqlite3.connect(self.filename)
+
+        # Create tables
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS reports (" +
+                "type TEXT NOT NULL, " +
+                "date TEXT NOT NULL, " +
+                "json TEXT NOT NULL, " +
+                "PRIMARY KEY (type, date))")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS entries (" +
+                "type TEXT NOT NULL, " +
+                "date TEXT NOT NULL, " +
+                "branch TEXT NOT NULL, " +
+                "timestamp TEXT NOT NULL, " +
+                "value TEXT NOT NULL, " +
+                "PRIMARY KEY (type, date, branch, timestamp))")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS " +
+                "entries_branch ON entries (type, branch, timestamp)")
+
+        return self.connection
+
+
+
+    def close(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            CLOSE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+
+class SQLiteReport(reporter.Report):
+
+    """
+    Report stored in a SQLite database, based on a given report type. Its
+    content is handled through the same branch API as JSON reports.
+    """
+
+    def __init__(self, reportType, date = None, database = None, json = None):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            INIT
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        # Test report type
+        if not issubclass(reportType, reporter.Report):
+            raise TypeError("Report type needed.")
+
+        # Dated report types need a date
+        if issubclass(reportType, reporter.DatedReport):
+            if type(date) is not datetime.date:
+                raise TypeError("Dated report type needs a date object.")
+
+        # Others do not
+        elif date is not None:
+            raise TypeError("Non-dated report type cannot have a date.")
+
+        # Default database
+        if database is None:
+            database = getDatabase()
+
+        super(SQLiteReport, self).__init__(reportType.name, path.REPORTS, json)
+
+        # Initialize report attributes
+        self.type = reportType
+        self.date = date
+        self.database = database
+
+
+
+    def __repr__(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            REPR
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        """
+
+        return "'" + self.name + "' (" + self.getKey()[1] + ")"
+
+
+
+    def getKey(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            GETKEY
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Get type and date of report, as stored in database.
+        """
+
+        return (self.name, formatDate(self.date))
+
+
+
+    def exists(self):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            EXISTS
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Check whether report exists in database.
+        """
+
+        return self.database.connect().execute("SELECT 1 FROM reports " +
+            "WHERE type = ? AND date = ?", self.getKey()).fetchone() is not None
+
+
+
+    def store(self, overwrite = True):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            STORE
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Store report's content in database, within a single transaction.
+        """
+
+        # Overwrite right check
+        if not overwrite and self.exists():
+            raise errors.NoOverwriting(repr(self), [])
+
+        # Nothing changed
+        if not self.dirty and self.exists():
+            Logger.debug("Report unchanged: " + repr(self))
+            return
+
+        # Info
+        Logger.debug("Storing report: " + repr(self))
+
+        # Split report's content
+        skeleton, entries = split(self.json)
+
+        # Get report's type and date
+        key = self.getKey()
+
+        # Replace report's rows
+        connection = self.database.connect()
+
+        with connection:
+            connection.execute("DELETE FROM entries WHERE type = ? AND " +
+                "date = ?", key)
+            connection.execute("INSERT OR REPLACE INTO reports " +
+                "(type, date, json) VALUES (?, ?, ?)", key + (skeleton, ))
+            connection.executemany("INSERT INTO entries " +
+                "(type, date, branch, timestamp, value) VALUES (?, ?, ?, ?, ?)",
+                [key + entry for entry in entries])
+
+        # Report is now synced with database
+        self.dirty = False
+
+
+
+    def load(self, strict = True):
+
+        """
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            LOAD
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            Load report's content from database. If it is missing and loading
+            is not strict, start with an empty report.
+        """
+
+        # Info
+        Logger.debug("Loading report: " + repr(self))
+
+        # Get report's type and date
+        key = self.getKey()
+
+        # Get report's rows
+        connection = self.database.connect()
+        row = connection.execute("SELECT json FROM reports WHERE type = ? " +
+            "AND date = ?", key).fetchone()
+
+        # Report is missing
+        if row is None:
+
+            # Strict loading
+            if strict:
+                raise IOError("Could not load " + repr(self))
+
+            # Start from scratch
+            self.erase()
+            return
+
+        # Rebuild report's content
+        self.json = merge(row[0], connection.execute("SELECT branch, " +
+            "timestamp, value FROM entries WHERE type = ? AND date = ?", key))
+
+        # Report is now synced with database
+        self.dirty = False
+
+
+
+# FUNCTIONS
+def getDatabase(filename = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETDATABASE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get database stored in given file. Only one database is instanciated
+        per file, so its connection can be shared.
+    """
+
+    # Default database file
+    if filename is None:
+        filename = path.REPORTS.path + DATABASE
+
+    # Instanciate database if needed
+    if filename not in DATABASES:
+        DATABASES[filename] = Database(filename)
+
+    # Return it
+    return DATABASES[filename]
+
+
+
+def formatDate(date):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        FORMATDATE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Format date of report as stored in database (non-dated reports have an
+        empty date).
+    """
+
+    return "" if date is None else lib.formatDate(date)
+
+
+
+def isDatedEntries(content):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        ISDATEDENTRIES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Check whether given content is a (non-empty) dict of dated entries,
+        i.e. a dict in which all keys are formatted timestamps.
+    """
+
+    return (type(content) is dict and len(content) > 0 and
+            all([TIMESTAMP.match(key) for key in content]))
+
+
+
+def split(content, branch = None, entries = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        SPLIT
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Split report's content into its serialized skeleton, from which dicts
+        of dated entries are removed, and a list of (branch, timestamp, value)
+        rows for said entries.
+    """
+
+    # Start
+    if branch is None:
+        entries = []
+        skeleton = split(content, [], entries)
+
+        return (json.dumps(skeleton), entries)
+
+    # Dated entries: move them out of skeleton
+    if isDatedEntries(content):
+        b = json.dumps(branch)
+
+        for timestamp, value in content.items():
+            entries += [(b, timestamp, json.dumps(value))]
+
+        return {}
+
+    # Dive deeper
+    if type(content) is dict:
+        return dict([(key, split(value, branch + [key], entries))
+            for key, value in content.items()])
+
+    # Leaf
+    return content
+
+
+
+def merge(skeleton, entries, content = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        MERGE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Put rows of dated entries back within content (decoded from given
+        serialized skeleton if needed). Branches of rows can be relative to
+        said content, by giving them as lists.
+    """
+
+    # Decode skeleton
+    if content is None:
+        content = json.loads(skeleton)
+
+    # Put back dated entries
+    for branch, timestamp, value in entries:
+
+        # Decode branch if needed
+        if type(branch) is not list:
+            branch = json.loads(branch)
+
+        # Dive in content, creating missing parts of branch
+        tip = content
+
+        for key in branch:
+            tip = tip.setdefault(key, {})
+
+        # Add entry
+        tip[timestamp] = json.loads(value)
+
+    return content
+
+
+
+def getBranchCondition(branch):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETBRANCHCONDITION
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get SQL condition (and its parameters) matching rows of dated entries
+        stored at the tip of given branch, or deeper.
+    """
+
+    # Test branch
+    if not reporter.isBranchValid(branch):
+        raise errors.InvalidBranch(branch)
+
+    # Whole report
+    if branch == []:
+        return ("1", ())
+
+    # Serialized branches of children share the same prefix
+    b = json.dumps(branch)
+    prefix = b[:-1] + ", "
+
+    return ("(branch = ? OR (branch > ? AND branch < ?))",
+            (b, prefix, prefix + u"\uffff"))
+
+
+
+def getDatedEntries(reportType, dates, branch, database = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETDATEDENTRIES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get dated entries found at the tip of given branch (or deeper) within
+        reports with given dates, using a single query.
+    """
+
+    # Test report type
+    if not issubclass(reportType, reporter.DatedReport):
+        raise TypeError("Dated report type needed.")
+
+    # Test dates
+    if not all([type(d) is datetime.date for d in dates]):
+        raise TypeError("Can only find dated reports with date objects.")
+
+    # Default database
+    if database is None:
+        database = getDatabase()
+
+    # No dates
+    if not dates:
+        return {}
+
+    # Get condition on branch
+    condition, parameters = getBranchCondition(branch)
+
+    # Get rows
+    rows = database.connect().execute("SELECT branch, timestamp, value " +
+        "FROM entries WHERE type = ? AND " + condition + " AND date IN (" +
+        ", ".join(["?"] * len(dates)) + ")", (reportType.name, ) +
+        parameters + tuple([lib.formatDate(d) for d in dates]))
+
+    # Merge them relatively to branch
+    return merge(None, [(json.loads(b)[len(branch):], t, v)
+        for b, t, v in rows], {})
+
+
+
+def setDatedEntries(reportType, branch, entries, database = None,
+    overwrite = False):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        SETDATEDENTRIES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Store a set of dated entries in their corresponding dated reports,
+        within a single transaction. As for reports, existing entries can only
+        be given a different value if overwriting is allowed (otherwise,
+        nothing is stored).
+    """
+
+    # Test report type
+    if not issubclass(reportType, reporter.DatedReport):
+        raise TypeError("Cannot add dated values to non dated report.")
+
+    # Test values
+    if not all([type(e) is datetime.datetime for e in entries]):
+        raise TypeError("Cannot add non dated values to dated report.")
+
+    # Test branch
+    if not reporter.isBranchValid(branch):
+        raise errors.InvalidBranch(branch)
+
+    # Default database
+    if database is None:
+        database = getDatabase()
+
+    # Serialize branch
+    b = json.dumps(branch)
+
+    # Format times of entries once
+    times = entries.keys()
+    keys = codec.encodeAll(times)
+
+    # Get all concerned dates
+    dates = lib.uniqify([lib.formatDate(e) for e in times])
+
+    # Store entries
+    connection = database.connect()
+
+    with connection:
+
+        # Overwriting not allowed: make sure existing entries keep their value
+        if not overwrite:
+            rows = connection.execute("SELECT timestamp, value FROM entries " +
+                "WHERE type = ? AND branch = ? AND date IN (" +
+                ", ".join(["?"] * len(dates)) + ")",
+                (reportType.name, b) + tuple(dates))
+
+            existing = dict(rows)
+
+            for t, key in zip(times, keys):
+                v = entries[t]
+
+                if key in existing and json.loads(existing[key]) != v:
+                    raise errors.NoOverwriting(reportType.name,
+                        branch + [key])
+
+        # Make sure reports exist
+        connection.executemany("INSERT OR IGNORE INTO reports " +
+            "(type, date, json) VALUES (?, ?, ?)",
+            [(reportType.name, d, "{}") for d in dates])
+
+        # Add entries (identical ones can be ignored)
+        connection.executemany("INSERT OR " +
+            ("REPLACE" if overwrite else "IGNORE") + " INTO entries " +
+            "(type, date, branch, timestamp, value) VALUES (?, ?, ?, ?, ?)",
+            [(reportType.name, lib.formatDate(t), b, key,
+              json.dumps(entries[t])) for t, key in zip(times, keys)])
+
+
+
+def getRecentDatedEntries(reportType, now, branch, n = 1, database = None,
+    strict = False):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        GETRECENTDATEDENTRIES
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Get and merge the dated entries at the tip of the given branch in the
+        "n" most recent reports, in which said branch exists.
+
+        If "strict" is set to "True", "n" defines the number of days from today
+        the function will try looking back for content. Otherwise, it will try
+        to find "n" reports, no matter how old they are. Either way, entries
+        are read newest first, using the (type, branch, timestamp) index.
+    """
+
+    # Test report type
+    if not issubclass(reportType, reporter.DatedReport):
+        raise TypeError("Dated report type needed.")
+
+    # Test branch
+    if not reporter.isBranchValid(branch):
+        raise errors.InvalidBranch(branch)
+
+    # Default database
+    if database is None:
+        database = getDatabase()
+
+    # Get current date
+    today = now.date()
+
+    # Entries before the end of today
+    end = lib.formatTime(datetime.datetime.combine(today +
+        datetime.timedelta(days = 1), datetime.time()))
+
+    # Strict search: do not look further than "n" days before
+    start = ""
+
+    if strict:
+        start = lib.formatTime(datetime.datetime.combine(today -
+            datetime.timedelta(days = n - 1), datetime.time()))
+
+    # Get rows, starting with the latest one
+    rows = database.connect().execute("SELECT date, timestamp, value " +
+        "FROM entries WHERE type = ? AND branch = ? AND timestamp >= ? AND " +
+        "timestamp < ? ORDER BY timestamp DESC", (reportType.name,
+        json.dumps(branch), start, end))
+
+    # Initialize dict for merged entries
+    entries = {}
+
+    # Initialize dates of reports found with given branch
+    dates = []
+
+    # Loop on rows
+    for date, timestamp, value in rows:
+
+        # New report
+        if date not in dates:
+
+            # Enough data found
+            if len(dates) == n:
+                break
+
+            dates += [date]
+
+        # Add entry
+        entries[timestamp] = json.loads(value)
+
+    # Not enough reports
+    if len(dates) < n:
+        Logger.warning("Could not find " + str(n) + " recent report(s) with " +
+            "given branch. Found: " + str(len(dates)))
+
+    # Return entries
+    return entries
+
+
+
+def migrate(src = path.REPORTS, database = None):
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        MIGRATE
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Import all JSON reports found in given source directory into database.
+        Return number of imported reports.
+    """
+
+    # Default database
+    if database is None:
+        database = getDatabase(src.path + DATABASE)
+
+    # Info
+    Logger.info("Migrating reports from '" + src.path + "' to " +
+        repr(database))
+
+    # Initialize number of imported reports
+    n = 0
+
+    # Loop on report types
+    for reportType in REPORT_TYPES:
+
+        # Instanciate JSON reports
+        if issubclass(reportType, reporter.DatedReport):
+            reports = [reportType(d, src)
+                for d in reporter.getReportDates(reportType, src)]
+        else:
+            reports = [reportType(src)]
+
+        # Import existing ones
+        for report in reports:
+            if report.exists():
+                report.load()
+
+                SQLiteReport(reportType, report.date, database,
+                    report.json).store()
+                n += 1
+
+    # Info
+    Logger.info("Migrated " + str(n) + " report(s).")
+
+    return n
+
+
+
+def main():
+
+    """
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        MAIN
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Usage: python storage.py migrate [SRC] [DATABASE]
+    """
+
+    # Get arguments
+    args = sys.argv[1:]
+
+    # Check them
+    if not 1 <= len(args) <= 3 or args[0] != "migrate":
+        print "Usage: python storage.py migrate [SRC] [DATABASE]"
+        sys.exit(1)
+
+    # Get source directory
+    src = path.Path(args[1]) if len(args) > 1 else path.REPORTS
+
+    # Get database
+    database = Database(args[2]) if len(args) > 2 else None
+
+    # Migrate
+    migrate(src, database)
+
+
+
+# Initialize databases
+DATABASES = {}
+
+
+
+# Run this when script is called from terminal
+if __name__ == "__main__":
+    main()